@@ -16,11 +16,22 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-import sys, pathlib 
+import os, sys, pathlib 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))  # project root
-from src.data.database_models import Base
+from src.data.database_models import Base, INGREDIENTS_FTS_TABLE
 target_metadata = Base.metadata
 
+# migrate the database the app is configured to use (see src/infrastructure/db.py)
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"])
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # FTS5 virtual table + its shadow tables are managed by hand-written migrations
+    if type_ == "table" and name.startswith(INGREDIENTS_FTS_TABLE):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +59,7 @@ def run_migrations_offline() -> None:
         compare_type=True, 
         compare_server_default=True, 
         render_as_batch=is_sqlite,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -74,6 +86,7 @@ def run_migrations_online() -> None:
             compare_type=True, 
             compare_server_default=True,
             render_as_batch=(connection.dialect.name == 'sqlite'),
+            include_object=include_object,
         )
 
         with context.begin_transaction():
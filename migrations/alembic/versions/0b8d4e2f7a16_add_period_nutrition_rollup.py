@@ -0,0 +1,53 @@
+"""add period_nutrition_rollup (week / month / year)
+
+Revision ID: 0b8d4e2f7a16
+Revises: f1a6c09b3e27
+Create Date: 2026-10-16 16:32:44.580311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b8d4e2f7a16'
+down_revision: Union[str, Sequence[str], None] = 'f1a6c09b3e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PERIOD_START = {
+    'week': "date(day, printf('-%d days', (strftime('%w', day) + 6) % 7))",
+    'month': "date(day, 'start of month')",
+    'year': "date(day, 'start of year')",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('period_nutrition_rollup',
+    sa.Column('level', sa.String(length=5), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('kcal', sa.Float(), server_default='0', nullable=False),
+    sa.Column('protein_g', sa.Float(), server_default='0', nullable=False),
+    sa.Column('carbs_g', sa.Float(), server_default='0', nullable=False),
+    sa.Column('fat_g', sa.Float(), server_default='0', nullable=False),
+    sa.CheckConstraint("level IN ('week', 'month', 'year')", name='ck_period_rollup_level'),
+    sa.PrimaryKeyConstraint('level', 'period_start')
+    )
+
+    # one-off backfill from the daily rollup; MealRepo keeps it current from here on
+    for level, start in PERIOD_START.items():
+        op.execute(f"""
+            INSERT INTO period_nutrition_rollup (level, period_start, meal_count, kcal, protein_g, carbs_g, fat_g)
+            SELECT '{level}', {start}, SUM(meal_count), SUM(kcal), SUM(protein_g), SUM(carbs_g), SUM(fat_g)
+            FROM daily_nutrition_rollup
+            GROUP BY {start}
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('period_nutrition_rollup')
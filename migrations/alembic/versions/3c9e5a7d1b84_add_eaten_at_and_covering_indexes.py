@@ -0,0 +1,38 @@
+"""add eaten_at index and covering meal_entry indexes
+
+Revision ID: 3c9e5a7d1b84
+Revises: 0b8d4e2f7a16
+Create Date: 2026-10-16 18:05:12.417902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5a7d1b84'
+down_revision: Union[str, Sequence[str], None] = '0b8d4e2f7a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_history_meals_eaten_at_totals', 'history_meals', ['eaten_at', 'total_kcal', 'total_protein_g', 'total_carbs_g', 'total_fat_g'], unique=False)
+
+    # the composites lead with the same columns, so the single-column indexes go
+    op.create_index('ix_meal_entry_meal_id_ingredient_id_grams', 'meal_entry', ['meal_id', 'ingredient_id', 'grams'], unique=False)
+    op.create_index('ix_meal_entry_ingredient_id_meal_id', 'meal_entry', ['ingredient_id', 'meal_id'], unique=False)
+    op.drop_index(op.f('ix_meal_entry_meal_id'), table_name='meal_entry')
+    op.drop_index(op.f('ix_meal_entry_ingredient_id'), table_name='meal_entry')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_meal_entry_ingredient_id'), 'meal_entry', ['ingredient_id'], unique=False)
+    op.create_index(op.f('ix_meal_entry_meal_id'), 'meal_entry', ['meal_id'], unique=False)
+    op.drop_index('ix_meal_entry_ingredient_id_meal_id', table_name='meal_entry')
+    op.drop_index('ix_meal_entry_meal_id_ingredient_id_grams', table_name='meal_entry')
+    op.drop_index('ix_history_meals_eaten_at_totals', table_name='history_meals')
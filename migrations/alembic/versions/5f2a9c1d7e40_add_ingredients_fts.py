@@ -0,0 +1,53 @@
+"""add FTS5 trigram index over ingredient names
+
+Revision ID: 5f2a9c1d7e40
+Revises: 14dbb10a2efd
+Create Date: 2026-10-16 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a9c1d7e40'
+down_revision: Union[str, Sequence[str], None] = '14dbb10a2efd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS ingredients_fts USING fts5(
+            name, content = 'ingredients', content_rowid = 'id', tokenize = 'trigram'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_ai AFTER INSERT ON ingredients BEGIN
+            INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_ad AFTER DELETE ON ingredients BEGIN
+            INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS ingredients_fts_au AFTER UPDATE OF name ON ingredients BEGIN
+            INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    # index the rows that already exist
+    op.execute("INSERT INTO ingredients_fts(ingredients_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS ingredients_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS ingredients_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS ingredients_fts_ai")
+    op.execute("DROP TABLE IF EXISTS ingredients_fts")
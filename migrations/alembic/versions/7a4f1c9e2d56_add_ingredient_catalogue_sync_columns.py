@@ -0,0 +1,35 @@
+"""add catalogue sync columns to ingredients
+
+Revision ID: 7a4f1c9e2d56
+Revises: 3c9e5a7d1b84
+Create Date: 2026-10-16 19:42:37.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f1c9e2d56'
+down_revision: Union[str, Sequence[str], None] = '3c9e5a7d1b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # plain ADD / DROP COLUMN, no batch mode: recreating `ingredients` would drop the FTS triggers
+    op.add_column('ingredients', sa.Column('source_id', sa.String(length=64), nullable=True))
+    op.add_column('ingredients', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('ingredients', sa.Column('removed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_ingredients_source_id', 'ingredients', ['source_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingredients_source_id', table_name='ingredients')
+    op.drop_column('ingredients', 'removed_at')
+    op.drop_column('ingredients', 'content_hash')
+    op.drop_column('ingredients', 'source_id')
@@ -0,0 +1,50 @@
+"""add ingredient_trigrams posting list for fuzzy search
+
+Revision ID: a83e6b0f2c51
+Revises: 5f2a9c1d7e40
+Create Date: 2026-10-16 11:03:17.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.shared.text import trigrams
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83e6b0f2c51'
+down_revision: Union[str, Sequence[str], None] = '5f2a9c1d7e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    trigram_table = op.create_table('ingredient_trigrams',
+    sa.Column('trigram', sa.String(length=3), nullable=False),
+    sa.Column('ingredient_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ),
+    sa.PrimaryKeyConstraint('trigram', 'ingredient_id')
+    )
+    op.create_index(op.f('ix_ingredient_trigrams_ingredient_id'), 'ingredient_trigrams', ['ingredient_id'], unique=False)
+
+    # backfill postings for the existing catalogue
+    conn = op.get_bind()
+    batch: list[dict] = []
+    for ingredient_id, name in conn.execute(sa.text("SELECT id, name FROM ingredients")):
+        batch.extend({"trigram": g, "ingredient_id": ingredient_id} for g in trigrams(name))
+        if len(batch) >= BATCH:
+            op.bulk_insert(trigram_table, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(trigram_table, batch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingredient_trigrams_ingredient_id'), table_name='ingredient_trigrams')
+    op.drop_table('ingredient_trigrams')
@@ -0,0 +1,47 @@
+"""add ingredient_usage aggregate
+
+Revision ID: c41d7f83a9b2
+Revises: a83e6b0f2c51
+Create Date: 2026-10-16 12:26:05.730144
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7f83a9b2'
+down_revision: Union[str, Sequence[str], None] = 'a83e6b0f2c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingredient_usage',
+    sa.Column('ingredient_id', sa.Integer(), nullable=False),
+    sa.Column('use_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ),
+    sa.PrimaryKeyConstraint('ingredient_id')
+    )
+    op.create_index(op.f('ix_ingredient_usage_use_count'), 'ingredient_usage', ['use_count'], unique=False)
+    op.create_index(op.f('ix_ingredient_usage_last_used_at'), 'ingredient_usage', ['last_used_at'], unique=False)
+
+    # one-off GROUP BY to seed the aggregate; MealRepo keeps it current from here on
+    op.execute("""
+        INSERT INTO ingredient_usage (ingredient_id, use_count, last_used_at)
+        SELECT me.ingredient_id, COUNT(*), MAX(hm.eaten_at)
+        FROM meal_entry AS me
+        JOIN history_meals AS hm ON hm.id = me.meal_id
+        GROUP BY me.ingredient_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingredient_usage_last_used_at'), table_name='ingredient_usage')
+    op.drop_index(op.f('ix_ingredient_usage_use_count'), table_name='ingredient_usage')
+    op.drop_table('ingredient_usage')
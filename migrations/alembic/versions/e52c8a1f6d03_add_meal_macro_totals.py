@@ -0,0 +1,50 @@
+"""add materialized macro totals to history_meals
+
+Revision ID: e52c8a1f6d03
+Revises: d7b3e2a4f915
+Create Date: 2026-10-16 14:58:20.406133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e52c8a1f6d03'
+down_revision: Union[str, Sequence[str], None] = 'd7b3e2a4f915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOTALS = {
+    'total_kcal': 'kcal_per_100g',
+    'total_protein_g': 'proteins_per_100g',
+    'total_carbs_g': 'carbs_per_100g',
+    'total_fat_g': 'fats_per_100g',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in TOTALS:
+        op.add_column('history_meals', sa.Column(name, sa.Float(), server_default='0', nullable=False))
+
+    # one-off backfill; MealRepo keeps the totals current from here on
+    assignments = ",\n".join(
+        f"""{name} = (
+            SELECT COALESCE(SUM(i.{per_100g} * me.grams / 100.0), 0.0)
+            FROM meal_entry AS me
+            JOIN ingredients AS i ON i.id = me.ingredient_id
+            WHERE me.meal_id = history_meals.id
+        )"""
+        for name, per_100g in TOTALS.items()
+    )
+    op.execute(f"UPDATE history_meals SET {assignments}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('history_meals') as batch_op:
+        for name in reversed(TOTALS):
+            batch_op.drop_column(name)
@@ -0,0 +1,45 @@
+"""add daily_nutrition_rollup
+
+Revision ID: f1a6c09b3e27
+Revises: e52c8a1f6d03
+Create Date: 2026-10-16 15:47:09.213554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c09b3e27'
+down_revision: Union[str, Sequence[str], None] = 'e52c8a1f6d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_nutrition_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('kcal', sa.Float(), server_default='0', nullable=False),
+    sa.Column('protein_g', sa.Float(), server_default='0', nullable=False),
+    sa.Column('carbs_g', sa.Float(), server_default='0', nullable=False),
+    sa.Column('fat_g', sa.Float(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # one-off backfill from the per-meal totals; MealRepo keeps it current from here on
+    # (later repairs: python -m src.infrastructure.maintenance rebuild-rollup)
+    op.execute("""
+        INSERT INTO daily_nutrition_rollup (day, meal_count, kcal, protein_g, carbs_g, fat_g)
+        SELECT date(eaten_at), COUNT(*), SUM(total_kcal), SUM(total_protein_g), SUM(total_carbs_g), SUM(total_fat_g)
+        FROM history_meals
+        GROUP BY date(eaten_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_nutrition_rollup')
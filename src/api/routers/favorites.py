@@ -4,7 +4,8 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query
 from starlette import status
 
-from src.infrastructure.db import db_dependency
+from src.infrastructure.db import db_dependency, read_db_dependency
+from src.infrastructure.group_commit import run_write
 from src.services.favorites import FavoriteService
 from src.services.errors import ValidationError
 from src.api.schemas import FavoriteCreate, FavoriteRead
@@ -41,25 +42,29 @@ def add_favorite(payload: FavoriteCreate, db: db_dependency):
     Star a meal. Returns the created favorite row.
     NOTE: 'name' in FavoriteCreate is currently ignored; favorite name = meal.name.
     """
-    svc = FavoriteService(db)
-    try:
+    def add(session):
+        svc = FavoriteService(session)
         # repo/service contract: add() returns the Meal domain object
         svc.add(meal_id=payload.meal_id)
 
         # We don't have a 'get favorite row by id/meal' method in repo,
         # so we read recent favorites and pick the one for this meal_id.
+        # Same unit of work as the write, so `db` never takes the (single) writer connection.
         rows = svc.list_all(limit=200)
         match = next((r for r in rows if r.meal_id == payload.meal_id), None)
         if match is None:
             # Should not happen unless a race/transaction issue
             raise HTTPException(status_code=500, detail="Favorite created but not found")
         return _to_read(match)
+
+    try:
+        return run_write(db, add)
     except Exception as exc:
         _handle(exc)
 
 
 @router.get("", response_model=list[FavoriteRead])
-def list_favorites(db: db_dependency, limit: int = Query(100, ge=1, le=500)):
+def list_favorites(db: read_db_dependency, limit: int = Query(100, ge=1, le=500)):
     svc = FavoriteService(db)
     try:
         rows = svc.list_all(limit=limit)
@@ -70,7 +75,7 @@ def list_favorites(db: db_dependency, limit: int = Query(100, ge=1, le=500)):
 
 @router.get("/search", response_model=list[FavoriteRead])
 def search_favorites(
-    db: db_dependency,
+    db: read_db_dependency,
     q: str = Query(..., min_length=1, description="Substring of the favorite name (mirrors meal name)"),
     limit: int = Query(50, ge=1, le=500),
 ):
@@ -83,7 +88,7 @@ def search_favorites(
 
 
 @router.get("/{favorite_id}", response_model=FavoriteRead)
-def get_favorite(favorite_id: int, db: db_dependency):
+def get_favorite(favorite_id: int, db: read_db_dependency):
     """
     Return a favorite row by id.
     (Repo lacks a 'get row' method; we search in a recent window.)
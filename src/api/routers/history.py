@@ -4,7 +4,7 @@ from typing import Optional, Literal
 from fastapi import APIRouter, Query
 from starlette import status
 
-from src.infrastructure.db import db_dependency
+from src.infrastructure.db import read_db_dependency
 from src.services.history import HistoryService, _ensure_utc_bounds, _period_to_date
 from src.api.schemas import HistoryRead
 
@@ -14,7 +14,7 @@ PeriodLiteral = Literal["this_week", "this_month", "last_7_days", "last_30_days"
 
 @router.get("", response_model=HistoryRead, status_code=status.HTTP_200_OK)
 def get_history(
-    db: db_dependency,
+    db: read_db_dependency,
     start_date: Optional[date] = Query(None, description="Inclusive start (YYYY-MM-DD)"),
     end_date: Optional[date]   = Query(None, description="Inclusive end (YYYY-MM-DD)"),
     period: Optional[PeriodLiteral] = Query(
@@ -28,8 +28,6 @@ def get_history(
     Either provide start_date & end_date, or a `period` like 'this_week'.
     Interval must include at least one calendar day.
     """
-    svc = HistoryService(db)
-
     if start_date and end_date:
         # use explicit dates
         pass
@@ -42,7 +40,7 @@ def get_history(
         now_local = datetime.now(ZoneInfo(tz)).date()
         start_date, end_date = _period_to_date(period, now_local, ZoneInfo(tz))
 
-    result = svc.list_grouped_by_day(
+    result = HistoryService(db).list_grouped_by_day(
         start_date=start_date,
         end_date=end_date,
         tz_name=tz,
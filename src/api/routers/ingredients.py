@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from fastapi import APIRouter, HTTPException, Query
 from starlette import status
 from starlette.responses import Response
 
-from src.infrastructure.db import db_dependency
+from src.infrastructure.db import async_read_db_dependency, db_dependency, read_db_dependency
+from src.infrastructure.repositories.async_repos import AsyncIngredientRepo
 from src.services.ingredients import IngredientService
 from src.services.errors import ValidationError
 from src.domain.errors import IngredientNotFound
@@ -14,6 +17,8 @@ from src.api.schemas import (
     IngredientCreate,
     IngredientRead,
     IngredientUpdate,
+    IngredientSuggestionRead,
+    IngredientUsageRead,
 )
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
@@ -37,6 +42,9 @@ def _handle_service_exc(exc: Exception):
     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 # ------------ Endpoints --------
+# Search is async on the aiosqlite session: its queries take no locks and little CPU, so awaiting
+# them doesn't hold a threadpool worker. Autocomplete (index build under a lock), the cached
+# lookups and the writes stay plain `def` and run in the threadpool.
 @router.post("", response_model=IngredientRead, status_code=status.HTTP_201_CREATED)
 def create_ingredient(payload: IngredientCreate, db: db_dependency):
     svc = IngredientService(db)
@@ -53,19 +61,54 @@ def create_ingredient(payload: IngredientCreate, db: db_dependency):
         _handle_service_exc(e)
 
 @router.get("/search", response_model=list[IngredientRead])
-def serach_ingredient(db: db_dependency, q: str = Query(..., min_length=1, description = "Substring of the ingredient name"), limit: int = Query(10, ge=1, le=100)):
-    svc = IngredientService(db)
+async def serach_ingredient(
+        db: async_read_db_dependency,
+        q: str = Query(..., min_length=1, description = "Substring of the ingredient name"),
+        limit: int = Query(10, ge=1, le=100),
+        mode: Literal["substring", "fuzzy"] = Query("substring", description = "'fuzzy' ranks by trigram similarity and tolerates typos"),
+):
     try:
-        items = svc.search(q, limit)
+        repo = AsyncIngredientRepo(db)
+        items = await (repo.find_similar(q, limit) if mode == "fuzzy" else repo.find_by_name(q, limit))
         return [_to_ing_read(x) for x in items]
     except Exception as e:
         _handle_service_exc(e)
 
+@router.get("/autocomplete", response_model=list[IngredientSuggestionRead])
+def autocomplete_ingredient(
+        db: read_db_dependency,
+        q: str = Query(..., min_length=1, description = "Prefix of any word in the ingredient name"),
+        limit: int = Query(10, ge=1, le=50),
+):
+    try:
+        suggestions = IngredientService(db).autocomplete(q, limit)
+        return [IngredientSuggestionRead(id = s.id, name = s.name) for s in suggestions]
+    except Exception as e:
+        _handle_service_exc(e)
+
+@router.get("/frequent", response_model=list[IngredientUsageRead])
+def frequent_ingredients(
+        db: read_db_dependency,
+        sort: Literal["count", "recent"] = Query("count", description = "'count' = most eaten, 'recent' = most recently eaten"),
+        limit: int = Query(10, ge=1, le=100),
+):
+    try:
+        usage = IngredientService(db).frequent(limit, sort)
+        return [
+            IngredientUsageRead(
+                **_to_ing_read(u.ingredient).model_dump(),
+                use_count = u.use_count,
+                last_used_at = u.last_used_at,
+            )
+            for u in usage
+        ]
+    except Exception as e:
+        _handle_service_exc(e)
+
 @router.get("/{ingredient_id}", response_model=IngredientRead)
-def get_ingredient(ingredient_id: int, db: db_dependency):
-    svc = IngredientService(db)
+def get_ingredient(ingredient_id: int, db: read_db_dependency):
     try:
-        ing = svc.get(ingredient_id)
+        ing = IngredientService(db).get(ingredient_id)
         return _to_ing_read(ing)
     except Exception as e:
         _handle_service_exc(e)
@@ -5,7 +5,8 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query, Path
 from starlette import status
 
-from src.infrastructure.db import db_dependency
+from src.infrastructure.db import db_dependency, read_db_dependency
+from src.infrastructure.group_commit import run_write
 from src.services.meals import MealService
 from src.services.errors import ValidationError
 from src.domain.errors import MealNotFound
@@ -55,20 +56,19 @@ def _handle_service_exc(exc: Exception):
 # --------- Endpoints ---------
 @router.post("", response_model = MealRead, status_code=status.HTTP_201_CREATED)
 def create_meal(payload: MealCreate, db: db_dependency):
-    svc = MealService(db)
     try:
-        meal = svc.create(
+        meal = run_write(db, lambda session: MealService(session).create(
             name=payload.name,
             eaten_at=payload.eaten_at,
             entries=[e.model_dump() for e in payload.entries], # {'ingredient_id': int, 'grams': float}
-        )
+        ))
         return _to_meal_read(meal)
     except Exception as exc:
         _handle_service_exc(exc)
 
 @router.get("/search", response_model=list[MealRead])
 def search_meals(
-        db: db_dependency,
+        db: read_db_dependency,
         q: str = Query(..., min_length=1, description = "Substring of the meal name"),
         limit: int = Query(10, ge=1, le=100),
 ):
@@ -80,7 +80,7 @@ def search_meals(
         _handle_service_exc(exc)
 
 @router.get("/{meal_id}", response_model=MealRead)
-def get_meal(meal_id: int, db: db_dependency):
+def get_meal(meal_id: int, db: read_db_dependency):
     svc = MealService(db)
     try:
         meal = svc.get(meal_id)
@@ -125,7 +125,7 @@ def delete_meal(meal_id: int, db: db_dependency):
 
 
 @router.get("/{meal_id}/entries", response_model=list[MealEntryRead])
-def get_meal_entries(meal_id: int, db: db_dependency):
+def get_meal_entries(meal_id: int, db: read_db_dependency):
     svc = MealService(db)
     try:
         entries = svc.list_entries(meal_id)
@@ -141,27 +141,20 @@ def patch_entry(meal_id: int, entry_id: int, payload: MealEntryUpdate, db: db_de
     - ingredient_id
     One or both may be provided; if both are present, we apply both.
     """
-    svc = MealService(db)
-    try:
-        print("here is ok!0")
+    def apply(session):
+        svc = MealService(session)
         if payload.ingredient_id is not None:
             svc.update_entry_ingredient(meal_id=meal_id, entry_id=entry_id, ingredient_id=payload.ingredient_id)
-        print("here is ok!1")
         if payload.grams is not None:
             svc.update_entry_quantity(meal_id=meal_id, entry_id=entry_id, grams=payload.grams)
-        print("here is ok!2")
-        updated_list = svc.list_entries(meal_id)
-        print("here is ok!3")
-        updated_element = None
-        for e in updated_list:
-            if getattr(e, "id", None) == entry_id:
-                updated_element = e
-                break
-        print("here is ok!4")
-
+        # read back in the same unit of work, so `db` never takes the (single) writer connection
+        updated_element = next((e for e in svc.list_entries(meal_id) if getattr(e, "id", None) == entry_id), None)
         if updated_element is None:
             raise MealNotFound("Entry not found")
         return _to_entry_read(updated_element)
+
+    try:
+        return run_write(db, apply)
     except Exception as exc:
         _handle_service_exc(exc)
 
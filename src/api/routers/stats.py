@@ -6,18 +6,25 @@ from fastapi import APIRouter, Query, HTTPException
 from starlette import status
 
 from src.domain.domain import DataRange
-from src.infrastructure.db import db_dependency
-from src.services.stats import StatsService, StatsResult
-from src.api.schemas import StatsRead, DayCaloriesRead, MacroPercentagesRead
+from src.infrastructure.db import read_db_dependency
+from src.domain.domain import PeriodTotals
+from src.services.stats import StatsService, StatsResult, PeriodSeries, TrendResult
+from src.api.schemas import (
+    StatsRead, DayCaloriesRead, MacroPercentagesRead, PeriodStatsRead, PeriodTotalsRead, TrendRead, MetricTrendRead,
+    StatsBatchRequest, StatsBatchRead,
+)
 from src.services.errors import ValidationError
 router = APIRouter(prefix='/stats', tags=['stats'])
 
+# Plain `def` on the read-only session: the NumPy series work runs in the threadpool, not on the event loop.
+
 @router.get("/daily-and-macros", response_model=StatsRead)
 def get_daily_and_macro_stats(
-    db: db_dependency,
+    db: read_db_dependency,
     start_date: date = Query(..., description ="Inclusive start (YYYY-MM-DD)"),
     end_date: date = Query(..., description = "Inclusive end (YYYY-MM-DD)"),
     macro_basis: Literal["kcal", "grams"] = Query("kcal", description = "Pie basis"),
+    tz: str = Query("UTC", description = "IANA timezone the days are counted in (e.g., Europe/Chisinau)"),
 ):
     try:
         dr = DataRange(
@@ -27,11 +34,106 @@ def get_daily_and_macro_stats(
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    svc = StatsService(db)
-    result: StatsResult = svc.daily_calories_and_macro_split(dr, macro_basis=macro_basis)
+    try:
+        result: StatsResult = StatsService(db).daily_calories_and_macro_split(dr, macro_basis=macro_basis, tz_name=tz)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return _to_stats_read(result)
+
 
+def _to_stats_read(result: StatsResult) -> StatsRead:
     return StatsRead(
         days=[DayCaloriesRead(day=d.day, calories=d.calories) for d in result.days],
         macro_pct=MacroPercentagesRead(**result.macro_pct.__dict__),
         basis=result.basis
-    )
\ No newline at end of file
+    )
+
+@router.post("/daily-and-macros/batch", response_model=StatsBatchRead)
+def get_daily_and_macro_stats_batch(payload: StatsBatchRequest, db: read_db_dependency):
+    """
+    /daily-and-macros for several ranges at once (e.g. this week, last week, this month, last month).
+    The rows are read once for the range covering all of them.
+    """
+    try:
+        ranges = [
+            DataRange(
+                start=datetime.combine(r.start, time.min, tzinfo=timezone.utc),
+                end=datetime.combine(r.end, time.max, tzinfo=timezone.utc),
+            )
+            for r in payload.ranges
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        results = StatsService(db).daily_calories_and_macro_split_many(ranges, macro_basis=payload.macro_basis, tz_name=payload.tz)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StatsBatchRead(results=[_to_stats_read(r) for r in results])
+
+
+def _to_period_read(p: PeriodTotals) -> PeriodTotalsRead:
+    return PeriodTotalsRead(
+        start=p.start,
+        end=p.end,
+        meal_count=p.meal_count,
+        kcal=round(p.totals.kcal, 1),
+        protein_g=round(p.totals.proteins, 1),
+        carbs_g=round(p.totals.carbs, 1),
+        fat_g=round(p.totals.fats, 1),
+    )
+
+@router.get("/periods", response_model=PeriodStatsRead)
+def get_period_stats(
+    db: read_db_dependency,
+    start_date: date = Query(..., description ="Inclusive start (YYYY-MM-DD)"),
+    end_date: date = Query(..., description = "Inclusive end (YYYY-MM-DD)"),
+    level: Literal["day", "week", "month", "year"] = Query("month", description = "Bucket size (UTC days, ISO weeks)"),
+):
+    try:
+        dr = DataRange(
+            start=datetime.combine(start_date, time.min, tzinfo=timezone.utc),
+            end=datetime.combine(end_date, time.max, tzinfo=timezone.utc),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    series: PeriodSeries = StatsService(db).period_series(dr, level)
+    return PeriodStatsRead(
+        level=series.level,
+        periods=[_to_period_read(p) for p in series.periods],
+        total=_to_period_read(series.total),
+    )
+
+
+@router.get("/trend", response_model=TrendRead)
+def get_trend(
+    db: read_db_dependency,
+    start_date: date = Query(..., description ="Inclusive start (YYYY-MM-DD)"),
+    end_date: date = Query(..., description = "Inclusive end (YYYY-MM-DD)"),
+    windows: list[int] = Query([7, 14, 30], description = "Moving-average windows in days"),
+    tz: str = Query("UTC", description = "IANA timezone the days are counted in (e.g., Europe/Chisinau)"),
+):
+    try:
+        dr = DataRange(
+            start=datetime.combine(start_date, time.min, tzinfo=timezone.utc),
+            end=datetime.combine(end_date, time.max, tzinfo=timezone.utc),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        result: TrendResult = StatsService(db).trend(dr, windows=tuple(sorted(set(windows))), tz_name=tz)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return TrendRead(
+        days=result.days,
+        windows=list(result.windows),
+        metrics=[
+            MetricTrendRead(metric=name, daily=m.daily, moving_averages=m.moving_averages, slope_per_day=m.slope_per_day)
+            for name, m in result.metrics.items()
+        ],
+    )
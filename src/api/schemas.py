@@ -3,6 +3,8 @@ from datetime import datetime, date
 from pydantic import BaseModel, Field, confloat, ConfigDict
 from typing import Optional, List, Literal, Dict
 
+MAX_BATCH_RANGES = 16
+
 
 # --------------------
 # Utility
@@ -42,6 +44,14 @@ class IngredientRead(BaseModel):
     fats_per_100g: float = Field(...)
     proteins_per_100g: float = Field(...)
 
+class IngredientUsageRead(IngredientRead):
+    use_count: int = Field(..., description="Number of meal entries using this ingredient")
+    last_used_at: Optional[datetime] = Field(default=None, description="When it was last eaten (UTC)")
+
+class IngredientSuggestionRead(BaseModel):
+    id: int = Field(...)
+    name: str = Field(...)
+
 # --------------------
 # Meals
 # --------------------
@@ -114,6 +124,39 @@ class StatsRead(BaseModel):
     macro_pct: MacroPercentagesRead = Field(..., description="Macro split over the whole range")
     basis: Literal["kcal", "grams"] = Field("kcal", description="What the macro percetanges are based on: 'kcal' or 'grams'")
 
+class StatsBatchRequest(BaseModel):
+    ranges: list[DateRange] = Field(..., min_length=1, max_length=MAX_BATCH_RANGES, description="Inclusive date ranges, answered in order")
+    macro_basis: Literal["kcal", "grams"] = Field("kcal", description="Pie basis")
+    tz: str = Field("UTC", description="IANA timezone the days are counted in (e.g., Europe/Chisinau)")
+
+class StatsBatchRead(BaseModel):
+    results: list[StatsRead] = Field(..., description="One entry per requested range, in request order")
+
+class PeriodTotalsRead(BaseModel):
+    start: date = Field(..., description="First day of the period (clipped to the range)")
+    end: date = Field(..., description="Last day of the period (clipped to the range)")
+    meal_count: int
+    kcal: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+
+class PeriodStatsRead(BaseModel):
+    level: Literal["day", "week", "month", "year"]
+    periods: list[PeriodTotalsRead] = Field(..., description="One entry per period overlapping the range, zeros included")
+    total: PeriodTotalsRead
+
+class MetricTrendRead(BaseModel):
+    metric: Literal["kcal", "protein_g", "carbs_g", "fat_g"]
+    daily: list[float] = Field(..., description="Zero-filled daily values, aligned with `days`")
+    moving_averages: Dict[int, list[float]] = Field(..., description="Window (days) -> trailing average per day")
+    slope_per_day: float = Field(..., description="Least-squares trend of the daily values, per day")
+
+class TrendRead(BaseModel):
+    days: list[date]
+    windows: list[int]
+    metrics: list[MetricTrendRead]
+
 # ----------------------------
 # History
 # ----------------------------
@@ -1,6 +1,7 @@
 from sqlalchemy import (
     Column, Integer, String, Float, func,
-    DateTime, ForeignKey, CheckConstraint, UniqueConstraint
+    Date, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index,
+    DDL, event, table, column
 )
 from sqlalchemy.orm import declarative_base, relationship 
 
@@ -17,6 +18,13 @@ class MealModel(Base):
     eaten_at = Column(DateTime(timezone=True), server_default=func.now(), nullable = False)
     name      = Column(String(512), nullable = False)
 
+    # macro totals over all entries, denormalized so history/stats reads never touch entries;
+    # MealRepo keeps them in step on every write (see recompute_meal_totals)
+    total_kcal      = Column(Float, nullable = False, default = 0.0, server_default = '0')
+    total_protein_g = Column(Float, nullable = False, default = 0.0, server_default = '0')
+    total_carbs_g   = Column(Float, nullable = False, default = 0.0, server_default = '0')
+    total_fat_g     = Column(Float, nullable = False, default = 0.0, server_default = '0')
+
     # one meal -> many entries
     entries = relationship(
         'MealEntryModel', 
@@ -32,6 +40,15 @@ class MealModel(Base):
         cascade = 'all, delete-orphan'
     )
 
+    __table_args__ = (
+        # range filter of history and stats; the stored totals ride along so the
+        # per-day sums are answered from the index alone
+        Index(
+            'ix_history_meals_eaten_at_totals',
+            'eaten_at', 'total_kcal', 'total_protein_g', 'total_carbs_g', 'total_fat_g',
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<Meal id={self.id} name = '{self.name}'>"
 
@@ -42,8 +59,8 @@ class MealEntryModel(Base):
     __tablename__ = 'meal_entry'
 
     id            = Column(Integer, primary_key = True)
-    meal_id       = Column(Integer, ForeignKey('history_meals.id'), nullable = False, index = True)
-    ingredient_id = Column(Integer, ForeignKey('ingredients.id'), nullable = False, index = True)
+    meal_id       = Column(Integer, ForeignKey('history_meals.id'), nullable = False)
+    ingredient_id = Column(Integer, ForeignKey('ingredients.id'), nullable = False)
     grams         = Column(Float, nullable = False)
 
     meal       = relationship('MealModel', back_populates = 'entries')
@@ -51,6 +68,10 @@ class MealEntryModel(Base):
 
     __table_args__ = (
         CheckConstraint('grams > 0', name = 'GRAMS_NOT_NEGATIVE'),
+        # covering: a meal's entries and their totals subquery never touch the table
+        Index('ix_meal_entry_meal_id_ingredient_id_grams', 'meal_id', 'ingredient_id', 'grams'),
+        # covering: "meals using these ingredients" (meals_filter, ingredient FK checks)
+        Index('ix_meal_entry_ingredient_id_meal_id', 'ingredient_id', 'meal_id'),
     ) 
 
     def __repr__(self) -> str:
@@ -85,9 +106,15 @@ class IngredientModel(Base):
     fats_per_100g        = Column(Float, nullable = False)
     proteins_per_100g    = Column(Float, nullable = False)
 
+    # catalogue sync (catalogue_sync.py); all NULL for ingredients created in the app
+    source_id            = Column(String(64), nullable = True)                  # id of the row in the catalogue TSV
+    content_hash         = Column(String(64), nullable = True)                  # of the normalized values last synced
+    removed_at           = Column(DateTime(timezone=True), nullable = True)     # tombstone: gone from the catalogue
+
     meal_entries   = relationship('MealEntryModel', back_populates = 'ingredient')
 
     __table_args__ = (
+        Index('ix_ingredients_source_id', 'source_id', unique = True),
         CheckConstraint('kcal_per_100g >= 0', name = 'KCAL_NOT_NEGATIVE'),
         CheckConstraint('carbs_per_100g >= 0', name = 'CARBS_NOT_NEGATIVE'),
         CheckConstraint('fats_per_100g >= 0', name = 'FATS_NOT_NEGATIVE'),
@@ -95,4 +122,144 @@ class IngredientModel(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<Ingredient id = {self.id} name = '{self.name}'>"
\ No newline at end of file
+        return f"<Ingredient id = {self.id} name = '{self.name}'>"
+
+class IngredientTrigramModel(Base):
+    """
+    Trigram posting list over ingredient names (one row per distinct trigram of a name).
+    Used for typo-tolerant similarity search.
+    """
+    __tablename__ = 'ingredient_trigrams'
+
+    trigram       = Column(String(3), primary_key = True)
+    ingredient_id = Column(Integer, ForeignKey('ingredients.id'), primary_key = True, index = True)
+
+    def __repr__(self) -> str:
+        return f"<IngredientTrigram '{self.trigram}' ingredient_id = {self.ingredient_id}>"
+
+class IngredientUsageModel(Base):
+    """
+    Running usage aggregate per ingredient, maintained by MealRepo on every entry write.
+    Answers "what do I usually eat" without a GROUP BY over meal_entry.
+    """
+    __tablename__ = 'ingredient_usage'
+
+    ingredient_id = Column(Integer, ForeignKey('ingredients.id'), primary_key = True)
+    use_count     = Column(Integer, nullable = False, server_default = '0', index = True)
+    last_used_at  = Column(DateTime(timezone=True), nullable = True, index = True)
+
+    def __repr__(self) -> str:
+        return f"<IngredientUsage ingredient_id = {self.ingredient_id} count = {self.use_count}>"
+
+class ChangeLogModel(Base):
+    """
+    Append-only log of repository writes. Other worker processes tail it
+    to evict exactly the cache entries that went stale.
+    """
+    __tablename__ = 'change_log'
+
+    seq        = Column(Integer, primary_key = True)   # AUTOINCREMENT: never reused, so it only grows
+    entity     = Column(String(32), nullable = False)   # "ingredient", "meal", "favorite"
+    entity_id  = Column(Integer, nullable = False)
+    op         = Column(String(8), nullable = False)    # "upsert" | "delete"
+    changed_at = Column(DateTime(timezone=True), server_default = func.now(), nullable = False)
+
+    __table_args__ = (
+        {'sqlite_autoincrement': True},
+    )
+
+    def __repr__(self) -> str:
+        return f"<ChangeLog seq = {self.seq} {self.op} {self.entity} {self.entity_id}>"
+
+class DailyNutritionRollupModel(Base):
+    """
+    Macro totals per UTC day over history_meals, maintained incrementally by MealRepo.
+    Stats read one row per day instead of grouping every meal.
+    """
+    __tablename__ = 'daily_nutrition_rollup'
+
+    day        = Column(Date, primary_key = True)   # date(eaten_at), UTC
+    meal_count = Column(Integer, nullable = False, server_default = '0')
+    kcal       = Column(Float, nullable = False, server_default = '0')
+    protein_g  = Column(Float, nullable = False, server_default = '0')
+    carbs_g    = Column(Float, nullable = False, server_default = '0')
+    fat_g      = Column(Float, nullable = False, server_default = '0')
+
+    def __repr__(self) -> str:
+        return f"<DailyNutritionRollup {self.day} kcal = {self.kcal}>"
+
+class PeriodNutritionRollupModel(Base):
+    """
+    Coarser levels over daily_nutrition_rollup: ISO week, month and year (UTC days),
+    each row keyed by the first day of its period. Maintained alongside the daily rows.
+    """
+    __tablename__ = 'period_nutrition_rollup'
+
+    level        = Column(String(5), primary_key = True)   # "week" | "month" | "year"
+    period_start = Column(Date, primary_key = True)
+    meal_count   = Column(Integer, nullable = False, server_default = '0')
+    kcal         = Column(Float, nullable = False, server_default = '0')
+    protein_g    = Column(Float, nullable = False, server_default = '0')
+    carbs_g      = Column(Float, nullable = False, server_default = '0')
+    fat_g        = Column(Float, nullable = False, server_default = '0')
+
+    __table_args__ = (
+        CheckConstraint("level IN ('week', 'month', 'year')", name = 'ck_period_rollup_level'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<PeriodNutritionRollup {self.level} {self.period_start} kcal = {self.kcal}>"
+
+# ----------------------------
+# Full-text search over ingredient names
+# ----------------------------
+
+# FTS5 external-content table: stores only the trigram index, rows live in `ingredients`.
+# The trigram tokenizer keeps the old LIKE '%q%' substring semantics (case-insensitive),
+# but answers them from the index instead of scanning the whole catalogue.
+INGREDIENTS_FTS_TABLE = 'ingredients_fts'
+
+INGREDIENTS_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ingredients_fts USING fts5(
+        name, content = 'ingredients', content_rowid = 'id', tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ingredients_fts_ai AFTER INSERT ON ingredients BEGIN
+        INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ingredients_fts_ad AFTER DELETE ON ingredients BEGIN
+        INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ingredients_fts_au AFTER UPDATE OF name ON ingredients BEGIN
+        INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+)
+
+INGREDIENTS_FTS_DROP = (
+    "DROP TRIGGER IF EXISTS ingredients_fts_au",
+    "DROP TRIGGER IF EXISTS ingredients_fts_ad",
+    "DROP TRIGGER IF EXISTS ingredients_fts_ai",
+    "DROP TABLE IF EXISTS ingredients_fts",
+)
+
+# lightweight handle for queries; the table itself is not part of Base.metadata
+ingredients_fts = table(
+    INGREDIENTS_FTS_TABLE,
+    column('rowid', Integer),
+    column('name', String),
+    column('rank', Float),
+)
+
+# Alembic creates the FTS table in a migration; these hooks do the same for create_all() (tests, fresh DBs)
+for _stmt in INGREDIENTS_FTS_DDL:
+    event.listen(IngredientModel.__table__, 'after_create', DDL(_stmt).execute_if(dialect = 'sqlite'))
+for _stmt in INGREDIENTS_FTS_DROP:
+    event.listen(IngredientModel.__table__, 'before_drop', DDL(_stmt).execute_if(dialect = 'sqlite'))
@@ -1,6 +1,6 @@
 from __future__ import annotations 
 from dataclasses import dataclass
-from datetime import datetime 
+from datetime import date, datetime 
 
 # ---------- Entities ----------
 @dataclass
@@ -17,6 +17,12 @@ class Ingredient:
             return NotImplemented
         return (self.id is not None and other.id is not None and self.id == other.id)
 
+@dataclass(frozen = True)
+class IngredientUsage:
+    ingredient: Ingredient
+    use_count: int
+    last_used_at: datetime | None = None
+
 @dataclass
 class Meal:
     name: str
@@ -36,6 +42,22 @@ class Meal:
             total = total + e.compute_macros()
         return total
 
+@dataclass(frozen = True)
+class MealSummary:
+    """A meal without its entries, carrying the stored macro totals instead."""
+    id: int
+    name: str
+    eaten_at: datetime
+    totals: MacroTotals
+
+@dataclass(frozen = True)
+class PeriodTotals:
+    """Summed macros of the meals eaten in [start, end] (inclusive days)."""
+    start: date
+    end: date
+    meal_count: int
+    totals: MacroTotals
+
 # ---------- Value Objects ----------
 @dataclass
 class MealEntry:
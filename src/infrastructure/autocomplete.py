@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.data.database_models import IngredientModel
+from src.shared.text import normalize_name
+
+# a key packs (row, word offset) into one int; names are <= 512 chars so 10 bits hold the offset
+_OFFSET_BITS = 10
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+# sorts after every key that starts with a given term (normalized names never contain it)
+_MAX_CHAR = "\U0010ffff"
+
+# > any normalized name length (<= 512), so (not a name prefix, length) packs into one int
+_LENGTH_SPAN = 1024
+
+# pending single-row edits kept on top of the snapshot before a full rebuild is forced
+_MAX_PENDING = 1000
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    ids: array          # row -> ingredient id
+    names: list[str]    # row -> display name
+    norm: list[str]     # row -> normalized name
+    keys: array         # packed (row, offset) sorted by norm[row][offset:]
+
+
+class IngredientNameIndex:
+    """
+    Per-process autocomplete index over ingredient names.
+
+    Every word start of every normalized name is a key in one sorted flat array,
+    so the keys of a prefix are one contiguous range found by two bisects, with no SQLite involved.
+
+    Refreshing:
+    - upsert()/remove() record single-row edits made by this process (IngredientRepo writes);
+      lookups apply them on top of the snapshot, so no rebuild and no query is needed.
+    - invalidate() bumps a generation counter for changes we can't describe row by row.
+      The next lookup sees the snapshot was built for an older generation and rebuilds it
+      from the given session. Too many pending edits trigger the same rebuild.
+    """
+
+    def __init__(self):
+        self._build_lock = threading.Lock()
+        self._generation_lock = threading.Lock()
+        self._generation = 0
+        self._built_generation = -1
+        self._snapshot: _Snapshot | None = None
+        self._pending: dict[int, str | None] = {}   # id -> current name, None when deleted
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Mark the index stale; it is rebuilt lazily on the next lookup."""
+        with self._generation_lock:
+            self._generation += 1
+
+    def upsert(self, ingredient_id: int, name: str) -> None:
+        """Record a created or renamed ingredient."""
+        self._record(ingredient_id, name)
+
+    def remove(self, ingredient_id: int) -> None:
+        """Record a deleted ingredient."""
+        self._record(ingredient_id, None)
+
+    def search(self, session: Session, query: str, limit: int = 10) -> list[Suggestion]:
+        """
+        Names having a word that starts with each query term.
+        Names that start with the query come first, then shorter names.
+        Only the key range of the most selective term is walked, all of it, so no match is
+        missed; the other terms filter the names found there. Only the best candidates are
+        kept while walking, so a one-letter query costs no sort of every match.
+        """
+        terms = normalize_name(query).split()
+        if not terms:
+            return []
+        snap = self._current(session)
+
+        head = terms[0]
+        pending = dict(self._pending)
+
+        ranges = [self._key_range(snap, t) for t in terms]
+        driver = min(range(len(terms)), key = lambda t: ranges[t][1] - ranges[t][0])
+        lo, hi = ranges[driver]
+        rest = terms[:driver] + terms[driver + 1:]
+
+        # bounded top-k: at most 2 * limit candidates are held; whenever the buffer fills it is cut
+        # back to the best `limit`, and the (prefix, length) of the last one becomes a cut-off
+        # that most of the remaining keys fail on a plain int compare
+        kept: list[tuple[tuple, int, str]] = []
+        cutoff = None
+        norm, ids, term = snap.norm, snap.ids, terms[driver]
+        for k in snap.keys[lo:hi]:
+            normalized = norm[k >> _OFFSET_BITS]
+            score = (not normalized.startswith(head)) * _LENGTH_SPAN + len(normalized)
+            if cutoff is not None and score > cutoff:
+                continue
+            # a name with several words starting with the term has several keys here: count the first
+            if (k & _OFFSET_MASK) != _first_word_start(normalized, term):
+                continue
+            row = k >> _OFFSET_BITS
+            if ids[row] in pending or not _matches_rest(normalized, rest):
+                continue
+            kept.append((_rank(normalized, head), ids[row], snap.names[row]))
+            if len(kept) >= 2 * limit:
+                kept.sort()
+                del kept[limit:]
+                best = kept[-1][0]
+                cutoff = best[0] * _LENGTH_SPAN + best[1]
+
+        for ingredient_id, name in pending.items():
+            if name is None:
+                continue
+            normalized = normalize_name(name)
+            if all(_first_word_start(normalized, t) >= 0 for t in terms):
+                kept.append((_rank(normalized, head), ingredient_id, name))
+
+        kept.sort()
+        return [Suggestion(id = ingredient_id, name = name) for _, ingredient_id, name in kept[:limit]]
+
+    # ——— Internals ———
+
+    @staticmethod
+    def _key_range(snap: _Snapshot, term: str) -> tuple[int, int]:
+        """[lo, hi) of the keys whose word starts with `term`."""
+        suffix = lambda k: snap.norm[k >> _OFFSET_BITS][k & _OFFSET_MASK:]
+        lo = bisect_left(snap.keys, term, key = suffix)
+        return lo, bisect_left(snap.keys, term + _MAX_CHAR, lo = lo, key = suffix)
+
+    def _record(self, ingredient_id: int, name: str | None) -> None:
+        with self._generation_lock:
+            self._pending[ingredient_id] = name
+            if len(self._pending) > _MAX_PENDING:
+                self._generation += 1
+
+    def _current(self, session: Session) -> _Snapshot:
+        snap = self._snapshot
+        if snap is not None and self._built_generation == self._generation:
+            return snap
+        with self._build_lock:
+            if self._snapshot is None or self._built_generation != self._generation:
+                generation = self._generation
+                applied = dict(self._pending)
+                self._snapshot = self._build(session)
+                self._built_generation = generation
+                # edits seen before the build are in the snapshot now; keep any that raced with it
+                with self._generation_lock:
+                    for ingredient_id, name in applied.items():
+                        if self._pending.get(ingredient_id, name) == name:
+                            self._pending.pop(ingredient_id, None)
+            return self._snapshot
+
+    @staticmethod
+    def _build(session: Session) -> _Snapshot:
+        ids = array('q')
+        names: list[str] = []
+        norm: list[str] = []
+        keys = array('q')
+
+        rows = session.execute(
+            select(IngredientModel.id, IngredientModel.name).where(IngredientModel.removed_at.is_(None))
+        ).yield_per(10_000)
+        for ingredient_id, name in rows:
+            row = len(names)
+            normalized = normalize_name(name)
+            ids.append(ingredient_id)
+            names.append(name)
+            norm.append(normalized)
+            # one key per word start
+            offset = 0
+            for word in normalized.split(" "):
+                keys.append((row << _OFFSET_BITS) | offset)
+                offset += len(word) + 1
+
+        ordered = sorted(keys, key = lambda k: norm[k >> _OFFSET_BITS][k & _OFFSET_MASK:])
+        return _Snapshot(ids = ids, names = names, norm = norm, keys = array('q', ordered))
+
+
+def _rank(normalized: str, head: str) -> tuple[bool, int, str]:
+    """Names that start with the query first, then shorter names, then alphabetically."""
+    return not normalized.startswith(head), len(normalized), normalized
+
+
+def _first_word_start(normalized: str, term: str) -> int:
+    """Offset of the first word of `normalized` that starts with `term`, or -1."""
+    if normalized.startswith(term):
+        return 0
+    at = normalized.find(" " + term)
+    return at + 1 if at >= 0 else -1
+
+
+def _matches_rest(normalized: str, rest: list[str]) -> bool:
+    """Every remaining query term must prefix some word of the name."""
+    if not rest:
+        return True
+    words = normalized.split()
+    return all(any(w.startswith(t) for w in words) for t in rest)
+
+
+# one index per worker process
+ingredient_name_index = IngredientNameIndex()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe, size-bounded LRU map with an optional time-to-live.
+    Values are shared between callers, so cache immutable data or treat it as read-only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None, clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()   # key -> (value, stored_at)
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """Return the cached subset of `keys`; every absent key counts as a miss."""
+        found: dict[K, V] = {}
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key)
+                if value is None:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+                    found[key] = value
+        return found
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (value, self._clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, size=len(self._data), maxsize=self.maxsize)
+
+    def _lookup(self, key: K) -> V | None:
+        # caller holds the lock
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, stored_at = item
+        if self.ttl is not None and self._clock() - stored_at > self.ttl:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.data.database_models import IngredientModel, IngredientTrigramModel
+from src.infrastructure.invalidation import log_changes
+from src.infrastructure.repositories.meal_repo import meals_filter, recompute_meal_totals
+from src.infrastructure.repositories.rollup_repo import updating_rollups
+from src.shared.text import trigrams
+
+# ids / keys per IN (...), well under SQLite's bound-parameter limit
+CHUNK = 500
+
+# (source_id, content_hash, name, kcal, carbs, fats, proteins): daparser.parse_rows with keys
+SyncRow = tuple[str, str, str, float, float, float, float]
+
+
+@dataclass
+class SyncReport:
+    inserted: int = 0
+    updated: int = 0        # values changed, or back in the catalogue after a removal
+    unchanged: int = 0
+    removed: int = 0        # tombstoned: no longer in the catalogue
+    duplicates: int = 0     # repeated source ids; the first row wins
+    skipped: int = 0        # names over 512 chars
+
+
+def _chunks(values: list, size: int = CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i+size]
+
+
+def _values(row: SyncRow) -> dict:
+    source_id, content_hash, name, kcal, carbs, fats, proteins = row
+    return dict(
+        source_id = source_id, content_hash = content_hash, name = name,
+        kcal_per_100g = kcal, carbs_per_100g = carbs, fats_per_100g = fats, proteins_per_100g = proteins,
+    )
+
+
+def _index_trigrams(session: Session, names: dict[int, str]) -> None:
+    """Replace the trigram postings of these ingredients (mirrors IngredientRepo._index_trigrams, in bulk)."""
+    ids = list(names)
+    for chunk in _chunks(ids):
+        session.execute(delete(IngredientTrigramModel).where(IngredientTrigramModel.ingredient_id.in_(chunk)))
+    postings = [{"trigram": g, "ingredient_id": iid} for iid, name in names.items() for g in trigrams(name)]
+    if postings:
+        session.execute(insert(IngredientTrigramModel), postings)
+
+
+def sync_chunk(session: Session, rows: list[SyncRow], seen: set[str], report: SyncReport) -> None:
+    """
+    Bring the ingredients of one parsed chunk in line with it: insert unknown source ids,
+    update rows whose content hash changed (or that come back after a removal), keep their ids.
+    Meal totals and rollups follow macro changes. Adds the chunk's source ids to `seen`.
+    The caller commits.
+    """
+    fresh = []
+    for row in rows:
+        if row[0] in seen:
+            report.duplicates += 1
+            continue
+        seen.add(row[0])
+        fresh.append(row)
+
+    existing = {}
+    for keys in _chunks([row[0] for row in fresh]):
+        stmt = select(
+            IngredientModel.source_id, IngredientModel.id, IngredientModel.name,
+            IngredientModel.content_hash, IngredientModel.removed_at,
+        ).where(IngredientModel.source_id.in_(keys))
+        existing.update((r.source_id, r) for r in session.execute(stmt))
+
+    new: list[SyncRow] = []
+    changed: list[dict] = []
+    renamed: dict[int, str] = {}
+    for row in fresh:
+        current = existing.get(row[0])
+        if current is None:
+            new.append(row)
+        elif current.content_hash != row[1] or current.removed_at is not None:
+            changed.append({"id": current.id, **_values(row), "removed_at": None})
+            if current.name != row[2] or current.removed_at is not None:
+                renamed[current.id] = row[2]     # removal dropped its postings
+        else:
+            report.unchanged += 1
+
+    if new:
+        session.execute(insert(IngredientModel), [_values(row) for row in new])
+        names: dict[int, str] = {}
+        for keys in _chunks([row[0] for row in new]):
+            names.update(session.execute(
+                select(IngredientModel.id, IngredientModel.name).where(IngredientModel.source_id.in_(keys))
+            ).tuples().all())
+        _index_trigrams(session, names)
+        log_changes(session, "ingredient", list(names), "upsert")
+        report.inserted += len(new)
+
+    for batch in _chunks(changed):
+        ids = [values["id"] for values in batch]
+        # the content hash covers the macros, so every changed row may move its meals' totals
+        with updating_rollups(session, *meals_filter(ingredient_ids = ids)):
+            session.execute(update(IngredientModel), batch)
+            recompute_meal_totals(session, ingredient_ids = ids)
+        log_changes(session, "ingredient", ids, "upsert")
+        report.updated += len(batch)
+    _index_trigrams(session, renamed)
+
+
+def tombstone_missing(session: Session, seen: set[str], report: SyncReport, now: datetime | None = None) -> None:
+    """
+    Mark catalogue ingredients whose source id was not `seen` as removed. They keep their row
+    (meal entries reference them) but leave search and autocomplete. The caller commits.
+    """
+    now = now or datetime.now(timezone.utc)
+    live = session.execute(
+        select(IngredientModel.id, IngredientModel.source_id)
+        .where(IngredientModel.source_id.is_not(None), IngredientModel.removed_at.is_(None))
+    ).tuples()
+    gone = [iid for iid, source_id in live if source_id not in seen]
+    for ids in _chunks(gone):
+        session.execute(update(IngredientModel).where(IngredientModel.id.in_(ids)).values(removed_at = now))
+        session.execute(delete(IngredientTrigramModel).where(IngredientTrigramModel.ingredient_id.in_(ids)))
+    log_changes(session, "ingredient", gone, "delete")
+    report.removed += len(gone)
+
+
+def sync_catalogue(session: Session, parsed: Iterable[tuple[list[SyncRow], list[str], int]]) -> SyncReport:
+    """
+    Delta-sync the live ingredients table with a full catalogue, given as daparser.parsed_chunks
+    with source keys. One transaction per chunk; the removals commit last, once the whole source
+    has been seen. Other workers pick the changes up from change_log.
+    """
+    report = SyncReport()
+    seen: set[str] = set()
+    for rows, too_long, _ in parsed:
+        sync_chunk(session, rows, seen, report)
+        report.skipped += len(too_long)
+        session.commit()
+    tombstone_missing(session, seen, report)
+    session.commit()
+    return report
@@ -1,23 +1,63 @@
 # build_foods_v2.py
 # Usage:
-#   python build_foods_v2.py /path/to/opennutrition_foods.tsv /path/to/foods_v2.sqlite
+#   python build_foods_v2.py /path/to/opennutrition_foods.tsv /path/to/foods_v2.sqlite [--workers N] [--chunksize N]
 #
-# Table: ingredients
-#   id INTEGER PRIMARY KEY,
-#   name TEXT NOT NULL CHECK(length(name) <= 512),
-#   kcal_per_100g REAL NOT NULL CHECK(kcal_per_100g >= 0),
-#   carbs_per_100g REAL NOT NULL CHECK(carbs_per_100g >= 0),
-#   fats_per_100g REAL NOT NULL CHECK(fats_per_100g >= 0),
-#   proteins_per_100g REAL NOT NULL CHECK(proteins_per_100g >= 0)
+# The TSV must hold one record per line: chunks are cut at line breaks (that is what lets --resume
+# seek to a byte offset), so a quoted field with an embedded newline would be split across two chunks.
+# TSV chunks are parsed and normalized in a process pool (--workers, default: all cores);
+# this process is the single writer and inserts each parsed chunk with one executemany.
+# The CSV and the skip log are written chunk by chunk, so memory stays bounded by --chunksize.
+# Every chunk commits a checkpoint (import_checkpoint); --resume continues an interrupted run from it.
+#
+# With --sync, DB is the live app database instead: its ingredients are brought in line with the TSV
+# in place (insert new / update changed / tombstone removed, ids kept), see catalogue_sync.py.
+#
+# The database gets the application schema itself (Base.metadata, FTS included, stamped at Alembic's head).
+# It is built as DB.partial and renamed over DB once complete, so an existing DB stays usable until then;
+# run the swap while the app is stopped (its open connections would keep reading the old file).
 
-import sqlite3, json, pandas as pd, os, math, re, csv, sys
+import json, pandas as pd, os, math, re, csv, sys, pathlib, argparse, io, itertools, hashlib
+try:
+    import resource                 # Unix only; used for the memory report
+except ImportError:
+    resource = None
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-SRC = sys.argv[1] if len(sys.argv) > 1 else "opennutrition_foods.tsv"
-DB  = sys.argv[2] if len(sys.argv) > 2 else "foods.sqlite"
-CSV = os.path.splitext(DB)[0].replace(".sqlite","") + ".csv"
-SKIP_LOG = os.path.splitext(DB)[0].replace(".sqlite","") + "_names_over_512.csv"
+from sqlalchemy import Column, Integer, MetaData, Table, Text, create_engine, delete, event, exc, func, insert, select
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))  # project root
+from src.data.database_models import (
+    Base, IngredientModel, IngredientTrigramModel, INGREDIENTS_FTS_DDL, INGREDIENTS_FTS_TABLE,
+)
+from src.shared.text import trigrams
 
 COMMIT_EVERY = 5000  # commit periodically for speed
+CHUNKSIZE = 20000    # TSV rows per parse task / insert transaction
+KEY_COLUMN = "id"    # stable row id in the OpenNutrition TSV; --sync matches ingredients on it
+
+ingredients = IngredientModel.__table__
+ingredient_trigrams = IngredientTrigramModel.__table__
+
+# importer bookkeeping: one row, rewritten in the same transaction as every chunk.
+# Not in Base.metadata (Alembic doesn't know it); dropped once the import completes.
+import_checkpoint = Table(
+    "import_checkpoint", MetaData(),
+    Column("id", Integer, primary_key=True),            # always 1
+    Column("source", Text, nullable=False),
+    Column("byte_offset", Integer, nullable=False),     # TSV offset just past the last committed chunk
+    Column("last_rowid", Integer, nullable=False),      # highest ingredients.id committed
+    Column("skipped", Integer, nullable=False),         # names over 512 chars so far
+    Column("sink_state", Text),                         # JSON from on_chunk (main: CSV / skip log offsets)
+)
+
+# maintained row by row they are most of a bulk insert's cost: dropped for the load, built after it.
+# The unique source id index stays: the load looks each chunk's ids up in it to drop repeats.
+SOURCE_ID_INDEX = next(ix for ix in ingredients.indexes if list(ix.columns) == [ingredients.c.source_id])
+DEFERRED_INDEXES = [ix for t in (ingredients, ingredient_trigrams) for ix in t.indexes if ix is not SOURCE_ID_INDEX]
+KEY_LOOKUP = 500      # source ids per IN (...), well under SQLite's bound-parameter limit
+FTS_INSERT_TRIGGER = "ingredients_fts_ai"
 
 # ---------- helpers ----------
 def to_float(x):
@@ -48,122 +88,354 @@ def first_number(n, keys):
             return to_float(n[k])
     return None
 
-def create_db(conn):
-    conn.executescript("""
-    PRAGMA journal_mode=WAL;
-    PRAGMA synchronous=NORMAL;
-    PRAGMA temp_store=MEMORY;
-
-    CREATE TABLE IF NOT EXISTS ingredients (
-      id INTEGER PRIMARY KEY,                                 -- auto-assigned rowid
-      name TEXT NOT NULL
-        CHECK (length(name) <= 512),
-      kcal_per_100g REAL NOT NULL
-        CONSTRAINT KCAL_NOT_NEGATIVE CHECK (kcal_per_100g >= 0),
-      carbs_per_100g REAL NOT NULL
-        CONSTRAINT CARBS_NOT_NEGATIVE CHECK (carbs_per_100g >= 0),
-      fats_per_100g REAL NOT NULL
-        CONSTRAINT FATS_NOT_NEGATIVE CHECK (fats_per_100g >= 0),
-      proteins_per_100g REAL NOT NULL
-        CONSTRAINT PROTEINS_NOT_NEGATIVE CHECK (proteins_per_100g >= 0)
-    );
-    """)
-    conn.commit()
-
-def main():
-    # clean outputs
-    for p in (DB, CSV, SKIP_LOG):
+def build_engine(db):
+    engine = create_engine(f"sqlite:///{os.path.abspath(db)}")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY"):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    return engine
+
+def create_db(engine):
+    """The application schema (FTS table and triggers included) plus the checkpoint table."""
+    Base.metadata.create_all(engine)
+    import_checkpoint.create(engine, checkfirst=True)
+
+def defer_indexes(conn):
+    for index in DEFERRED_INDEXES:
+        index.drop(conn, checkfirst=True)
+    SOURCE_ID_INDEX.create(conn, checkfirst=True)
+    conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FTS_INSERT_TRIGGER}")
+
+def rebuild_indexes(conn):
+    for index in DEFERRED_INDEXES:
+        index.create(conn, checkfirst=True)
+    # one pass over the content table instead of one FTS insert per row, then the trigger is back
+    conn.exec_driver_sql(f"INSERT INTO {INGREDIENTS_FTS_TABLE}({INGREDIENTS_FTS_TABLE}) VALUES ('rebuild')")
+    for stmt in INGREDIENTS_FTS_DDL:
+        conn.exec_driver_sql(stmt)
+
+def build_trigram_index(engine):
+    """Fill the fuzzy-search posting list from the loaded ingredients (mirrors IngredientRepo)."""
+    with engine.begin() as conn:
+        conn.execute(delete(ingredient_trigrams))   # a resumed run may have died halfway through this
+        names = conn.execute(select(ingredients.c.id, ingredients.c.name))
+        for rows in names.partitions(COMMIT_EVERY):
+            conn.execute(
+                insert(ingredient_trigrams),
+                [{"trigram": g, "ingredient_id": rid} for rid, nm in rows for g in trigrams(nm)],
+            )
+
+def stamp_head(conn):
+    """Record the schema as Alembic's head, so the file can stand in for app.db as is."""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "migrations" / "alembic"))
+    MigrationContext.configure(conn).stamp(ScriptDirectory.from_config(config), "head")
+
+def content_hash(row):
+    """Stable hash of a normalized (name, kcal, carbs, fats, proteins) row: only real value changes alter it."""
+    return hashlib.sha256(json.dumps(row, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+# ---------- parsing (runs in the worker processes) ----------
+def parse_rows(names, blobs, keys=None):
+    """
+    Normalize one chunk: returns (rows, too_long) where rows are
+    (name, kcal, carbs, fats, proteins) tuples that satisfy the schema
+    and too_long are the names over 512 chars that were skipped.
+    With source `keys` (for --sync) rows are (key, content_hash, name, kcal, carbs, fats, proteins).
+    """
+    rows, too_long = [], []
+    for i, (name, nutr_json) in enumerate(zip(names, blobs)):
+        if not name or not nutr_json:
+            continue
+
+        # Skip/collect overlong names BEFORE touching the DB
+        nm = name.strip()
+        if len(nm) > 512:
+            too_long.append(nm)
+            continue
+
+        try:
+            n = json.loads(nutr_json)
+        except Exception:
+            continue
+
+        kcal_100      = energy_kcal_per_100(n)
+        carbs_100     = first_number(n, ["carbohydrates", "carbs"])
+        fats_100      = first_number(n, ["total_fat", "fats", "fat"])
+        proteins_100  = first_number(n, ["protein", "proteins"])
+
+        # enforce NOT NULL + non-negative as per schema
+        if None in (kcal_100, carbs_100, fats_100, proteins_100):
+            continue
+        if any(v < 0 for v in (kcal_100, carbs_100, fats_100, proteins_100)):
+            continue
+
+        row = (nm, kcal_100, carbs_100, fats_100, proteins_100)
+        rows.append(row if keys is None else (keys[i], content_hash(row)) + row)
+    return rows, too_long
+
+def read_chunks(src, chunksize=CHUNKSIZE, offset=None, key_column=None):
+    """
+    (names, nutrition_100g blobs, keys, end_offset) per `chunksize` TSV lines, the columns as plain
+    lists so they pickle cheaply. keys is the `key_column` column (the name when the TSV has no such
+    column), or None without a key_column. end_offset is the byte offset just past the chunk; pass
+    it back as `offset` to continue from there. Chunks are cut at line breaks, so `src` must hold one
+    record per line: a quoted field spanning lines would be split across chunks.
+    """
+    with open(src, "rb") as f:
+        header = f.readline()
+        if offset:
+            f.seek(offset)
+        while True:
+            lines = list(itertools.islice(f, chunksize))
+            if not lines:
+                return
+            chunk = pd.read_csv(
+                io.BytesIO(header + b"".join(lines)),
+                sep="\t",          # real tab keeps fast C engine
+                engine="c",
+                dtype=str,
+                keep_default_na=False,
+                on_bad_lines="skip",
+            )
+            keys = None
+            if key_column is not None:
+                keys = chunk[key_column if key_column in chunk.columns else "name"].tolist()
+            yield chunk["name"].tolist(), chunk["nutrition_100g"].tolist(), keys, f.tell()
+
+def parsed_chunks(chunks, workers):
+    """
+    parse_rows over the chunks as (rows, too_long, end_offset), in input order. With workers > 1 the
+    chunks fan out to a process pool; at most 2 * workers are in flight, so the TSV is never fully in memory.
+    """
+    if workers <= 1:
+        for names, blobs, keys, end_offset in chunks:
+            yield (*parse_rows(names, blobs, keys), end_offset)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for names, blobs, keys, end_offset in chunks:
+            pending.append((pool.submit(parse_rows, names, blobs, keys), end_offset))
+            if len(pending) >= 2 * workers:
+                future, end_offset = pending.popleft()
+                yield (*future.result(), end_offset)
+        while pending:
+            future, end_offset = pending.popleft()
+            yield (*future.result(), end_offset)
+
+# ---------- checkpoints ----------
+def _checkpoint(conn):
+    row = conn.execute(select(import_checkpoint).where(import_checkpoint.c.id == 1)).mappings().first()
+    if row is None:
+        return None
+    cp = dict(row)
+    del cp["id"]
+    cp["sink_state"] = json.loads(cp["sink_state"]) if cp["sink_state"] else None
+    return cp
+
+def _save_checkpoint(conn, cp):
+    """Stage the checkpoint in the current transaction; the caller commits."""
+    conn.execute(
+        insert(import_checkpoint).prefix_with("OR REPLACE"),
+        dict(cp, id=1, sink_state=json.dumps(cp["sink_state"]) if cp["sink_state"] is not None else None),
+    )
+
+def read_checkpoint(db):
+    """The last committed checkpoint of the import into `db`, or None if there is nothing to resume."""
+    if not os.path.exists(db):
+        return None
+    engine = create_engine(f"sqlite:///{os.path.abspath(db)}")
+    try:
+        with engine.connect() as conn:
+            return _checkpoint(conn)
+    except exc.OperationalError:     # no import_checkpoint table: not an unfinished import
+        return None
+    finally:
+        engine.dispose()
+
+# ---------- loading (single writer) ----------
+def first_occurrences(conn, rows):
+    """The keyed rows whose source id is neither loaded already nor repeated earlier in the chunk."""
+    keys = list({row[0] for row in rows})
+    loaded = set()
+    for i in range(0, len(keys), KEY_LOOKUP):
+        loaded.update(conn.execute(
+            select(ingredients.c.source_id).where(ingredients.c.source_id.in_(keys[i:i+KEY_LOOKUP]))
+        ).scalars())
+    fresh = []
+    for row in rows:
+        if row[0] not in loaded:
+            loaded.add(row[0])
+            fresh.append(row)
+    return fresh
+
+def load(engine, parsed, cp, on_chunk=None):
+    """
+    Insert the parsed (keyed) chunks, one Core insert executemany per chunk, committed together
+    with the advanced checkpoint `cp`. Ids are assigned here, in input order, exactly as
+    autoincrement would (so the CSV can list them). Before each commit on_chunk(batch, too_long)
+    gets the inserted (id, name, kcal, carbs, fats, proteins) rows and the skipped names;
+    whatever it returns is checkpointed as sink_state. A repeated source id keeps its first row and
+    the repeats are dropped, as catalogue_sync does (see first_occurrences). Nothing is kept beyond
+    the current chunk.
+    """
+    for rows, too_long, end_offset in parsed:
+        with engine.begin() as conn:
+            rows = first_occurrences(conn, rows)
+            batch = [(cp["last_rowid"] + 1 + i,) + row[2:] for i, row in enumerate(rows)]
+            if batch:
+                conn.execute(insert(ingredients), [
+                    dict(id=iid, name=name, kcal_per_100g=kcal, carbs_per_100g=carbs, fats_per_100g=fats,
+                         proteins_per_100g=proteins, source_id=row[0], content_hash=row[1])
+                    for (iid, name, kcal, carbs, fats, proteins), row in zip(batch, rows)
+                ])
+            sink_state = on_chunk(batch, too_long) if on_chunk is not None else None
+            cp = dict(cp, byte_offset=end_offset, last_rowid=cp["last_rowid"] + len(batch),
+                      skipped=cp["skipped"] + len(too_long), sink_state=sink_state)
+            _save_checkpoint(conn, cp)
+    return cp
+
+def import_catalogue(src, db, workers=None, chunksize=CHUNKSIZE, on_chunk=None, resume=False):
+    """
+    Build the catalogue database at `db` from the TSV at `src` (see load for on_chunk).
+    With resume=True an interrupted import continues after its last committed chunk.
+    Returns (inserted, skipped) over the whole import.
+    """
+    source = os.path.abspath(src)
+    engine = build_engine(db)
+    try:
+        create_db(engine)
+        with engine.begin() as conn:
+            cp = _checkpoint(conn) if resume else None
+            if cp is not None and cp["source"] != source:
+                raise ValueError(f"{db} is an import of {cp['source']}, not {source}")
+            if cp is None:
+                last_rowid = conn.execute(select(func.coalesce(func.max(ingredients.c.id), 0))).scalar_one()
+                cp = dict(source=source, byte_offset=0, last_rowid=last_rowid, skipped=0, sink_state=None)
+            defer_indexes(conn)
+
+        chunks = read_chunks(src, chunksize, cp["byte_offset"], key_column=KEY_COLUMN)
+        cp = load(engine, parsed_chunks(chunks, workers or os.cpu_count() or 1), cp, on_chunk)
+
+        build_trigram_index(engine)
+        with engine.begin() as conn:
+            rebuild_indexes(conn)
+            stamp_head(conn)
+            import_checkpoint.drop(conn)
+    finally:
+        engine.dispose()
+    return cp["last_rowid"], cp["skipped"]
+
+def peak_memory_mib():
+    """
+    High-water marks of resident memory as (this process, largest finished child) in MiB,
+    or None where the resource module is missing. ru_maxrss is KiB on Linux, bytes on macOS.
+    """
+    if resource is None:
+        return None
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return tuple(resource.getrusage(who).ru_maxrss / unit for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the ingredients catalogue from the OpenNutrition TSV.")
+    parser.add_argument("src", nargs="?", default="opennutrition_foods.tsv",
+                        help="tab-separated, one record per line (no newlines inside quoted fields)")
+    parser.add_argument("db", nargs="?", default="foods.sqlite")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: all cores; 1 = no pool)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="TSV rows per parse task / insert transaction")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted import (DB.partial) from its last checkpoint")
+    parser.add_argument("--sync", action="store_true",
+                        help="DB is the live app database (path or URL): update its ingredients in place by content hash")
+    args = parser.parse_args(argv)
+
+    if args.sync:
+        return sync(args)
+
+    DB = args.db
+    CSV = os.path.splitext(DB)[0].replace(".sqlite","") + ".csv"
+    SKIP_LOG = os.path.splitext(DB)[0].replace(".sqlite","") + "_names_over_512.csv"
+
+    PARTIAL = DB + ".partial"
+
+    cp = read_checkpoint(PARTIAL) if args.resume else None
+    if cp is None:
+        # clean outputs (DB itself is only replaced once the new one is complete)
+        for p in (PARTIAL, PARTIAL + "-wal", PARTIAL + "-shm", CSV, SKIP_LOG):
+            try: os.remove(p)
+            except FileNotFoundError: pass
+    elif cp["sink_state"] is not None:
+        # drop whatever was written after the last committed chunk
+        for p, offset in ((CSV, cp["sink_state"]["csv"]), (SKIP_LOG, cp["sink_state"]["skip"])):
+            with open(p, "r+b") as f:
+                f.truncate(offset)
+    mode = "w" if cp is None else "a"
+
+    # Stream the CSV and the skip log (and echo ALL skipped long names) chunk by chunk
+    print("\n=== Skipped names longer than 512 chars ===")
+    with open(CSV, mode, newline="", encoding="utf-8") as f_csv, \
+         open(SKIP_LOG, mode, newline="", encoding="utf-8") as f_skip:
+        rows_out = csv.writer(f_csv)
+        skipped_out = csv.writer(f_skip)
+        if cp is None:
+            rows_out.writerow(["id","name","kcal_per_100g","carbs_per_100g","fats_per_100g","proteins_per_100g"])
+            skipped_out.writerow(["name_over_512_chars"])
+
+        def write_chunk(batch, too_long):
+            rows_out.writerows(batch)
+            skipped_out.writerows([nm] for nm in too_long)
+            for nm in too_long:
+                print(nm)
+            # flushed before the chunk commits, so the checkpointed offsets are on disk
+            f_csv.flush()
+            f_skip.flush()
+            return {"csv": f_csv.tell(), "skip": f_skip.tell()}
+
+        inserted, skipped = import_catalogue(
+            args.src, PARTIAL, workers=args.workers, chunksize=args.chunksize, on_chunk=write_chunk,
+            resume=cp is not None,
+        )
+
+    # the old file's WAL must not be replayed into the new one
+    for p in (DB + "-wal", DB + "-shm"):
         try: os.remove(p)
         except FileNotFoundError: pass
+    os.replace(PARTIAL, DB)
+
+    print(f"\nDone.\nSQLite: {DB}\nCSV: {CSV}\nSkipped-names log: {SKIP_LOG}\nRows inserted: {inserted}\nNames skipped (> 512 chars): {skipped}")
+    peak = peak_memory_mib()
+    if peak is not None:
+        print(f"Peak memory (RSS): writer {peak[0]:.1f} MiB, largest parser process {peak[1]:.1f} MiB")
+
+def sync(args):
+    # imported here: the parser processes only need the parsing half of this module
+    from dataclasses import replace
+    from sqlalchemy.orm import sessionmaker
+    from src.infrastructure.db import DatabaseSettings, make_engine
+    from src.infrastructure.catalogue_sync import sync_catalogue
+
+    url = args.db if "://" in args.db else f"sqlite:///{os.path.abspath(args.db)}"
+    engine = make_engine(replace(DatabaseSettings.from_env(), url=url))
+    try:
+        chunks = read_chunks(args.src, args.chunksize, key_column=KEY_COLUMN)
+        with sessionmaker(bind=engine)() as session:
+            report = sync_catalogue(session, parsed_chunks(chunks, args.workers or os.cpu_count() or 1))
+    finally:
+        engine.dispose()
 
-    conn = sqlite3.connect(DB)
-    create_db(conn)
-    cur = conn.cursor()
-
-    inserted = 0
-    rows_for_csv = []
-    skipped_long_names = []  # collect ALL names > 512 chars
-
-    for chunk in pd.read_csv(
-        SRC,
-        sep="\t",          # real tab keeps fast C engine
-        engine="c",
-        chunksize=20000,
-        dtype=str,
-        keep_default_na=False,
-        on_bad_lines="skip",
-    ):
-        name_col = chunk.get("name")
-        nutr_col = chunk.get("nutrition_100g")
-
-        cur.execute("BEGIN")
-        for name, nutr_json in zip(name_col, nutr_col):
-            if not name or not nutr_json:
-                continue
-
-            # Skip/collect overlong names BEFORE touching the DB
-            nm = name.strip()
-            if len(nm) > 512:
-                skipped_long_names.append(nm)
-                continue
-
-            try:
-                n = json.loads(nutr_json)
-            except Exception:
-                continue
-
-            kcal_100      = energy_kcal_per_100(n)
-            carbs_100     = first_number(n, ["carbohydrates", "carbs"])
-            fats_100      = first_number(n, ["total_fat", "fats", "fat"])
-            proteins_100  = first_number(n, ["protein", "proteins"])
-
-            # enforce NOT NULL + non-negative as per schema
-            if None in (kcal_100, carbs_100, fats_100, proteins_100):
-                continue
-            if any(v < 0 for v in (kcal_100, carbs_100, fats_100, proteins_100)):
-                continue
-
-            cur.execute("""
-              INSERT INTO ingredients(
-                name, kcal_per_100g, carbs_per_100g, fats_per_100g, proteins_per_100g
-              ) VALUES (?, ?, ?, ?, ?)
-            """, (nm, kcal_100, carbs_100, fats_100, proteins_100))
-
-            rid = cur.lastrowid
-            rows_for_csv.append((rid, nm, kcal_100, carbs_100, fats_100, proteins_100))
-            inserted += 1
-
-            if inserted % COMMIT_EVERY == 0:
-                conn.commit()
-                cur.execute("BEGIN")
-
-        conn.commit()
-
-    # Index after load
-    cur.executescript("""CREATE INDEX IF NOT EXISTS idx_ingredients_name ON ingredients(name);""")
-    conn.commit()
-    conn.close()
-
-    # Write main CSV
-    with open(CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["id","name","kcal_per_100g","carbs_per_100g","fats_per_100g","proteins_per_100g"])
-        w.writerows(rows_for_csv)
-
-    # Print ALL skipped long names
-    print(f"\n=== Skipped names longer than 512 chars: {len(skipped_long_names)} ===")
-    for nm in skipped_long_names:
-        print(nm)
-    
-
-    # Save skipped names to CSV as well (for auditing)
-    with open(SKIP_LOG, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["name_over_512_chars"])
-        for nm in skipped_long_names:
-            w.writerow([nm])
-
-    print(f"\nDone.\nSQLite: {DB}\nCSV: {CSV}\nSkipped-names log: {SKIP_LOG}\nRows inserted: {inserted}")
+    print(f"\nSynced {args.src} into {url}\nInserted: {report.inserted}\nUpdated: {report.updated}"
+          f"\nUnchanged: {report.unchanged}\nRemoved (tombstoned): {report.removed}"
+          f"\nDuplicate source ids: {report.duplicates}\nNames skipped (> 512 chars): {report.skipped}")
+    return report
 
 if __name__ == "__main__":
     main()
@@ -1,24 +1,189 @@
-from sqlalchemy import create_engine 
+import os
+from dataclasses import dataclass, replace
+from typing import Annotated, Mapping
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Annotated
 from fastapi import Depends
 
-DATABASE_URL = 'sqlite:///./app.db'
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args = {'check_same_thread': False}
-)
+
+@dataclass(frozen = True)
+class DatabaseSettings:
+    """
+    Engine configuration, read from the environment (see from_env):
+
+        DATABASE_URL             sqlite:///./app.db
+        DB_POOL_SIZE             5      connections kept open (SQLite: per read pool; the writer has one)
+        DB_MAX_OVERFLOW          10     extra connections under load (read pools)
+        DB_POOL_TIMEOUT          30     seconds to wait for a free connection
+        DB_BUSY_TIMEOUT_MS       5000   how long SQLite waits on a locked database
+        SQLITE_MMAP_SIZE         268435456  bytes of the file mapped into memory
+        SQLITE_CACHE_SIZE_KIB    65536  page cache per connection
+        DB_GROUP_COMMIT_MS       0      > 0: batch meal / favorite writes per this window (group_commit.py)
+    """
+    url: str = 'sqlite:///./app.db'
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    group_commit_ms: float = 0.0
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "DatabaseSettings":
+        default = cls()
+        return cls(
+            url             = env.get('DATABASE_URL', default.url),
+            pool_size       = int(env.get('DB_POOL_SIZE', default.pool_size)),
+            max_overflow    = int(env.get('DB_MAX_OVERFLOW', default.max_overflow)),
+            pool_timeout    = float(env.get('DB_POOL_TIMEOUT', default.pool_timeout)),
+            busy_timeout_ms = int(env.get('DB_BUSY_TIMEOUT_MS', default.busy_timeout_ms)),
+            mmap_size       = int(env.get('SQLITE_MMAP_SIZE', default.mmap_size)),
+            cache_size_kib  = int(env.get('SQLITE_CACHE_SIZE_KIB', default.cache_size_kib)),
+            group_commit_ms = float(env.get('DB_GROUP_COMMIT_MS', default.group_commit_ms)),
+        )
+
+    def sqlite_pragmas(self, *, read_only: bool = False) -> dict[str, str | int]:
+        # WAL lets readers run while a writer commits; NORMAL only fsyncs at checkpoints,
+        # which WAL keeps crash-safe (a power cut can lose the last commits, not corrupt the file)
+        pragmas = {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'temp_store': 'MEMORY',
+            'mmap_size': self.mmap_size,
+            'cache_size': -self.cache_size_kib,     # negative = KiB rather than pages
+            'busy_timeout': self.busy_timeout_ms,
+        }
+        if read_only:
+            # last, so journal_mode above may still switch the file to WAL
+            pragmas['query_only'] = 'ON'
+        return pragmas
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url.startswith('sqlite') and (url.rstrip('/') in ('sqlite:', 'sqlite+pysqlite:', 'sqlite+aiosqlite:') or ':memory:' in url)
+
+
+def _engine_args(settings: DatabaseSettings, read_only: bool) -> dict:
+    pool = dict(pool_size = settings.pool_size, max_overflow = settings.max_overflow, pool_timeout = settings.pool_timeout)
+    if not settings.url.startswith('sqlite'):
+        return pool
+    args = {'connect_args': {'check_same_thread': False, 'timeout': settings.busy_timeout_ms / 1000}}
+    if _is_sqlite_memory(settings.url):
+        # in-memory databases live in a single connection, so there is no pool to size
+        return args
+    if not read_only:
+        # SQLite takes one writer at a time anyway: queue writers on the pool rather than
+        # on the file lock, where they'd spin in busy_timeout and end in "database is locked"
+        pool.update(pool_size = 1, max_overflow = 0)
+    return {**args, **pool}
+
+
+def _set_pragmas_on_connect(engine: Engine, settings: DatabaseSettings, read_only: bool) -> None:
+    pragmas = settings.sqlite_pragmas(read_only = read_only)
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def _begin_explicitly(engine: Engine) -> None:
+    # pysqlite's own transaction handling only sends BEGIN before an INSERT/UPDATE/DELETE, so a
+    # SAVEPOINT opens no transaction and its RELEASE commits on the spot. Take over, as the
+    # SQLAlchemy docs recommend: no implicit BEGIN from the driver, ours on every transaction start.
+    @event.listens_for(engine, 'connect')
+    def _no_driver_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+
+def make_engine(settings: DatabaseSettings | None = None, *, read_only: bool = False) -> Engine:
+    """
+    An engine for `settings` (the environment by default); SQLite connections get the pragmas on connect.
+    For SQLite the default engine is the single writer connection; read_only=True gives a pool of
+    query_only connections that WAL lets read alongside it.
+    """
+    settings = settings or DatabaseSettings.from_env()
+    engine = create_engine(settings.url, **_engine_args(settings, read_only))
+    if settings.url.startswith('sqlite'):
+        _set_pragmas_on_connect(engine, settings, read_only)
+        if not read_only:
+            # savepoints must nest inside a real transaction (group_commit.py relies on it)
+            _begin_explicitly(engine)
+    return engine
+
+
+def make_async_engine(settings: DatabaseSettings | None = None, *, read_only: bool = False) -> AsyncEngine:
+    """
+    make_engine's async twin. A plain SQLite URL is switched to the aiosqlite driver;
+    other URLs must already name an async driver (e.g. postgresql+asyncpg).
+    """
+    settings = settings or DatabaseSettings.from_env()
+    url = make_url(settings.url)
+    if url.get_backend_name() == 'sqlite' and url.get_driver_name() != 'aiosqlite':
+        url = url.set(drivername = 'sqlite+aiosqlite')
+        settings = replace(settings, url = url.render_as_string(hide_password = False))
+    engine = create_async_engine(settings.url, **_engine_args(settings, read_only))
+    if settings.url.startswith('sqlite'):
+        _set_pragmas_on_connect(engine.sync_engine, settings, read_only)
+    return engine
+
+
+settings = DatabaseSettings.from_env()
+DATABASE_URL = settings.url
+
+# writes (and reads that must see them in the same transaction) go through `engine`;
+# pure reads use `read_engine`, so they never wait for the writer's connection
+engine = make_engine(settings)
+# an in-memory database exists once per connection, so there readers have to share the writer's
+read_engine = engine if _is_sqlite_memory(settings.url) else make_engine(settings, read_only = True)
 
 SessionLocal = sessionmaker(bind = engine, autocommit = False, autoflush = False)
+ReadSessionLocal = sessionmaker(bind = read_engine, autocommit = False, autoflush = False)
 
 def get_db():
     db = SessionLocal()
-    try: 
-        yield db 
+    try:
+        yield db
     except:
         db.rollback()
         raise
     finally:
         db.close()
 
-db_dependency = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+db_dependency = Annotated[Session, Depends(get_db)]
+read_db_dependency = Annotated[Session, Depends(get_read_db)]
+
+
+# ——— Async ———
+# Same database, reached through aiosqlite: async routes wait on SQLite without holding
+# one of the threadpool's worker threads for the whole round trip. Read-only, like
+# read_engine: the sync engine stays the only writer.
+
+async_read_engine = make_async_engine(settings, read_only = True)
+
+AsyncReadSessionLocal = async_sessionmaker(bind = async_read_engine, autoflush = False, expire_on_commit = False)
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async_read_db_dependency = Annotated[AsyncSession, Depends(get_async_read_db)]
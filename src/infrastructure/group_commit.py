@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.infrastructure.db import engine as write_engine, settings as db_settings
+
+T = TypeVar("T")
+
+
+class _BatchSession(Session):
+    """
+    Session handed to queued writes. The repos commit inside their methods; here that only
+    flushes (and expires, like a real commit would, so follow-up reads see SQL-side updates).
+    The queue commits once per batch.
+    """
+
+    def commit(self) -> None:
+        self.flush()
+        self.expire_all()
+
+
+@dataclass
+class _Job:
+    fn: Callable[[Session], Any]
+    future: Future
+
+
+class GroupCommitQueue:
+    """
+    Write-behind queue with group commit. Requests submit a write (a function of a Session,
+    usually a service call); one writer thread runs whatever arrived within `max_delay`
+    seconds in a single transaction, each write in its own SAVEPOINT, and resolves every
+    future after the one commit. A failing write only rolls back its savepoint.
+    For SQLite the engine has to send its own BEGIN, as make_engine's writer does: under
+    pysqlite's default handling every savepoint would commit by itself.
+    """
+
+    def __init__(self, engine: Engine, *, max_delay: float = 0.002, max_batch: int = 64):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._sessions = sessionmaker(bind = engine, class_ = _BatchSession, autoflush = False)
+        self._jobs: queue.SimpleQueue[_Job] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, fn: Callable[[Session], T]) -> Future[T]:
+        job = _Job(fn, Future())
+        self._ensure_started()
+        self._jobs.put(job)
+        return job.future
+
+    def run(self, fn: Callable[[Session], T]) -> T:
+        """submit() and wait: returns fn's result once its batch has committed, or raises its error."""
+        return self.submit(fn).result()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target = self._loop, name = "group-commit", daemon = True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._jobs.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._jobs.get(timeout = remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._run_batch(batch)
+            except Exception as exc:
+                # the session itself failed (e.g. no connection); nothing of the batch was committed
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+
+    def _run_batch(self, batch: list[_Job]) -> None:
+        done: list[tuple[_Job, Any]] = []
+        with self._sessions() as session:
+            for job in batch:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with session.begin_nested():
+                        result = job.fn(session)
+                except Exception as exc:
+                    job.future.set_exception(exc)
+                    continue
+                done.append((job, result))
+
+            try:
+                Session.commit(session)
+            except Exception as exc:
+                session.rollback()
+                for job, _ in done:
+                    job.future.set_exception(exc)
+                return
+
+        for job, result in done:
+            job.future.set_result(result)
+
+
+# ——— App-wide queue ———
+
+_queue: GroupCommitQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def write_queue() -> GroupCommitQueue | None:
+    """The process-wide queue on the writer engine, or None when DB_GROUP_COMMIT_MS is 0 (the default)."""
+    global _queue
+    if db_settings.group_commit_ms <= 0:
+        return None
+    with _queue_lock:
+        if _queue is None:
+            _queue = GroupCommitQueue(write_engine, max_delay = db_settings.group_commit_ms / 1000)
+    return _queue
+
+
+def run_write(db: Session, fn: Callable[[Session], T]) -> T:
+    """
+    fn(db) right away, or through the group-commit queue when it is enabled. Call it before
+    `db` has run anything: the queue's thread needs the (single) writer connection.
+    """
+    q = write_queue()
+    if q is None:
+        return fn(db)
+    return q.run(fn)
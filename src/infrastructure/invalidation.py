@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Literal
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from src.data.database_models import ChangeLogModel
+
+ChangeOp = Literal["upsert", "delete"]
+
+
+@dataclass(frozen=True)
+class Change:
+    seq: int
+    entity: str
+    entity_id: int
+    op: ChangeOp
+
+
+ChangeHandler = Callable[[Session, list[Change]], None]
+ResetHandler = Callable[[], None]
+
+
+def log_change(session: Session, entity: str, entity_id: int, op: ChangeOp) -> None:
+    """Stage a change-log row; it commits (or rolls back) with the caller's write."""
+    session.add(ChangeLogModel(entity = entity, entity_id = entity_id, op = op))
+
+
+def log_changes(session: Session, entity: str, entity_ids: list[int], op: ChangeOp) -> None:
+    """log_change for many rows at once, as one executemany (bulk writers such as the catalogue sync)."""
+    if entity_ids:
+        session.execute(insert(ChangeLogModel), [{"entity": entity, "entity_id": i, "op": op} for i in entity_ids])
+
+
+def prune_change_log(session: Session, keep: int = 10_000) -> int:
+    """Delete all but the newest `keep` rows. Returns the number of rows removed."""
+    newest = session.execute(select(func.max(ChangeLogModel.seq))).scalar()
+    if newest is None:
+        return 0
+    result = session.execute(delete(ChangeLogModel).where(ChangeLogModel.seq <= newest - keep))
+    session.commit()
+    return result.rowcount
+
+
+class ChangeLogPoller:
+    """
+    Per-process tail of the change_log table.
+
+    poll() costs one indexed max(seq) lookup when nothing changed, and it runs
+    at most once per `min_interval` seconds. min(seq) is asked separately, because SQLite
+    only takes the index shortcut for a lone min() or max() and would scan for both.
+    PRAGMA data_version would be cheaper, but it is per connection and our sessions hop
+    between pooled connections.
+    New rows are grouped by entity and handed to the subscribed handlers,
+    which evict just those keys. If rows we never saw were pruned, or the
+    database was swapped under us, we can't know what changed, so every
+    reset handler drops its cache wholesale.
+    """
+
+    def __init__(self, min_interval: float = 0.5, clock: Callable[[], float] = time.monotonic):
+        self.min_interval = min_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_seq: int | None = None
+        self._last_poll = float("-inf")
+        self._handlers: dict[str, list[ChangeHandler]] = defaultdict(list)
+        self._reset_handlers: list[ResetHandler] = []
+
+    def subscribe(self, entity: str, handler: ChangeHandler, on_reset: ResetHandler | None = None) -> None:
+        self._handlers[entity].append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    def poll(self, session: Session, *, force: bool = False) -> int:
+        """Apply changes committed since the last poll. Returns how many were applied."""
+        now = self._clock()
+        if not force and now - self._last_poll < self.min_interval:
+            return 0
+        if not self._lock.acquire(blocking = False):
+            return 0    # another thread of this worker is already catching up
+        try:
+            self._last_poll = now
+            newest = session.execute(select(func.max(ChangeLogModel.seq))).scalar() or 0
+
+            if self._last_seq is None:
+                # first poll: caches start empty, nothing to evict
+                self._last_seq = newest
+                return 0
+            if newest == self._last_seq:
+                return 0
+            if newest < self._last_seq or self._missed_rows(session):
+                self._reset()
+                self._last_seq = newest
+                return 0
+
+            rows = session.execute(
+                select(ChangeLogModel)
+                .where(ChangeLogModel.seq > self._last_seq, ChangeLogModel.seq <= newest)
+                .order_by(ChangeLogModel.seq)
+            ).scalars().all()
+
+            by_entity: dict[str, list[Change]] = defaultdict(list)
+            for r in rows:
+                by_entity[r.entity].append(Change(seq = r.seq, entity = r.entity, entity_id = r.entity_id, op = r.op))
+            for entity, changes in by_entity.items():
+                for handler in self._handlers.get(entity, ()):
+                    handler(session, changes)
+
+            self._last_seq = newest
+            return len(rows)
+        finally:
+            self._lock.release()
+
+    def _missed_rows(self, session: Session) -> bool:
+        """Were rows after our position pruned before we read them? Only asked when something changed."""
+        lowest = session.execute(select(func.min(ChangeLogModel.seq))).scalar()
+        return lowest is not None and lowest > self._last_seq + 1
+
+    def _reset(self) -> None:
+        for on_reset in self._reset_handlers:
+            on_reset()
+
+
+# one tail per worker process; polled by the code paths that read process-local caches
+change_poller = ChangeLogPoller()
@@ -0,0 +1,89 @@
+# Usage:
+#   python -m src.infrastructure.maintenance repair-totals                    # every meal
+#   python -m src.infrastructure.maintenance repair-totals --ingredient 12 40 # meals using these ingredients
+#   python -m src.infrastructure.maintenance rebuild-rollup                   # every day, week, month, year
+#   python -m src.infrastructure.maintenance rebuild-rollup --start 2025-01-01 --end 2025-01-31
+#   python -m src.infrastructure.maintenance prune-change-log --keep 10000     # e.g. from a daily cron job
+#   python -m src.infrastructure.maintenance repair-totals --database-url sqlite:///./other.db
+#
+# Offline repairs for denormalized data. Writes through the app keep everything current;
+# these commands fix what was changed behind its back (direct SQL, catalogue reloads, ...).
+
+import argparse
+import sys
+from dataclasses import replace
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.data.database_models import MealModel
+from src.infrastructure.db import DatabaseSettings, make_engine
+from src.infrastructure.invalidation import prune_change_log
+from src.infrastructure.repositories.meal_repo import meals_filter, recompute_meal_totals
+from src.infrastructure.repositories.rollup_repo import NutritionRollupRepo, updating_rollups
+
+BATCH = 5000  # meals per transaction, so a full repair doesn't hold the write lock for long
+
+
+def repair_totals(session, ingredient_ids: list[int] | None = None, batch: int = BATCH) -> int:
+    """
+    Recompute history_meals totals from entries, in id-ordered batches, moving the
+    rollups along with them. Returns meals touched.
+    """
+    if ingredient_ids:
+        with updating_rollups(session, *meals_filter(ingredient_ids = ingredient_ids)):
+            touched = recompute_meal_totals(session, ingredient_ids = ingredient_ids)
+        session.commit()
+        return touched
+
+    touched = 0
+    last_id = session.scalar(select(func.max(MealModel.id))) or 0
+    for lo in range(0, last_id, batch):
+        ids = session.scalars(select(MealModel.id).where(MealModel.id > lo, MealModel.id <= lo + batch)).all()
+        with updating_rollups(session, *meals_filter(ids)):
+            touched += recompute_meal_totals(session, meal_ids = ids)
+        session.commit()
+    return touched
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog = "maintenance", description = "Offline repairs for denormalized data.")
+    parser.add_argument("--database-url", default = None, help = "defaults to the app database")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    totals = commands.add_parser("repair-totals", help = "recompute per-meal macro totals")
+    totals.add_argument("--ingredient", type = int, nargs = "+", metavar = "ID",
+                        help = "only meals using these ingredients (after their macros changed)")
+    totals.add_argument("--batch", type = int, default = BATCH)
+
+    rollup = commands.add_parser("rebuild-rollup", help = "backfill / rebuild the daily and period rollups from history_meals")
+    rollup.add_argument("--start", type = date.fromisoformat, default = None, metavar = "YYYY-MM-DD")
+    rollup.add_argument("--end", type = date.fromisoformat, default = None, metavar = "YYYY-MM-DD")
+
+    prune = commands.add_parser("prune-change-log", help = "trim change_log to its newest rows (the app only appends)")
+    prune.add_argument("--keep", type = int, default = 10_000,
+                       help = "rows to keep; workers that fall further behind drop their caches wholesale")
+
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        Session = sessionmaker(bind = make_engine(replace(DatabaseSettings.from_env(), url = args.database_url)))
+    else:
+        from src.infrastructure.db import SessionLocal as Session
+
+    with Session() as session:
+        if args.command == "repair-totals":
+            touched = repair_totals(session, args.ingredient, batch = args.batch)
+            print(f"recomputed totals for {touched} meal(s)")
+        elif args.command == "rebuild-rollup":
+            days = NutritionRollupRepo(session).rebuild(args.start, args.end)
+            print(f"rebuilt {days} day(s) of rollups")
+        elif args.command == "prune-change-log":
+            removed = prune_change_log(session, keep = args.keep)
+            print(f"removed {removed} change_log row(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
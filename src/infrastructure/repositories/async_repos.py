@@ -0,0 +1,43 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.domain import Ingredient
+from src.infrastructure.repositories.ingredient_repo import MIN_SIMILARITY, IngredientRepo
+
+
+class _AsyncRepo(ABC):
+    """
+    Async twins of repo read methods for an AsyncSession. Each call runs the sync repo method
+    through AsyncSession.run_sync: the statements still go out through aiosqlite and are awaited,
+    but the SQL lives in one place.
+
+    run_sync gives the event loop back at every statement, so only methods that hold no
+    threading lock across a query and do little CPU work belong here; the rest stay in
+    plain `def` routes, which run in the threadpool.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @abstractmethod
+    def _repo(self, session: Session):
+        """The sync repo to run the calls on, bound to the run_sync session."""
+
+    async def _run(self, method: str, /, *args, **kwargs):
+        return await self.session.run_sync(lambda session: getattr(self._repo(session), method)(*args, **kwargs))
+
+
+class AsyncIngredientRepo(_AsyncRepo):
+    """Ingredient search (FTS and trigram queries) for the async /ingredients/search route."""
+
+    def _repo(self, session: Session) -> IngredientRepo:
+        return IngredientRepo(session)
+
+    async def find_by_name(self, query: str, limit: int = 10) -> list[Ingredient]:
+        return await self._run("find_by_name", query, limit)
+
+    async def find_similar(self, query: str, limit: int = 10, min_similarity: float = MIN_SIMILARITY) -> list[Ingredient]:
+        return await self._run("find_similar", query, limit, min_similarity)
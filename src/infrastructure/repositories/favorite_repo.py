@@ -4,6 +4,7 @@ from src.domain.domain import Meal
 from src.data.database_models import FavoriteMealModel
 from src.domain.errors import FavoriteNotFound, FavoriteAlreadyExists
 from src.infrastructure.repositories.meal_repo import MealRepo
+from src.infrastructure.invalidation import log_change
 
 class FavoriteRepo:
     def __init__(self, session, meal_repo: MealRepo):
@@ -12,12 +13,10 @@ class FavoriteRepo:
 
     def get(self, favorite_id: int) -> Meal:
         '''Return the meal that is marked as favorite.'''
-        favorite: FavoriteMealModel | None = self.session.get(FavoriteMealModel, favorite_id)
-        if favorite is None:
+        meal: Meal | None = self._meal_repo.get_by_favorite(favorite_id)
+        if meal is None:
             raise FavoriteNotFound(message = "Favorite meal was not found!", identifier = favorite_id)
-
-        meal_id: int = favorite.meal_id
-        return self._meal_repo.get_by_id(meal_id) 
+        return meal
 
     def add(self, meal_id: int) -> Meal:    
         ''' Add a new meal to favorite.'''
@@ -29,6 +28,8 @@ class FavoriteRepo:
 
         new_favorite_meal: FavoriteMealModel = FavoriteMealModel(meal_id = meal_id, name = domain_meal.name)
         self.session.add(new_favorite_meal)
+        self.session.flush() # assign new_favorite_meal.id
+        log_change(self.session, "favorite", new_favorite_meal.id, "upsert")
         self.session.commit()
 
         return domain_meal
@@ -39,6 +40,7 @@ class FavoriteRepo:
         if favorite is None:
             raise FavoriteNotFound(message = "Favorite meal was not found!", identifier = favorite_id)
 
+        log_change(self.session, "favorite", favorite_id, "delete")
         self.session.delete(favorite) 
         self.session.commit()
 
@@ -1,8 +1,31 @@
+import math
+
 from src.domain import Ingredient
 from src.domain.errors import IngredientNotFound
-from src.data.database_models import IngredientModel
-from sqlalchemy import func, select
+from src.data.database_models import IngredientModel, IngredientTrigramModel, IngredientUsageModel, ingredients_fts
+from src.infrastructure.repositories.usage_repo import IngredientUsageRepo
+from src.infrastructure.repositories.meal_repo import meals_filter, recompute_meal_totals
+from src.infrastructure.repositories.rollup_repo import updating_rollups
+from src.infrastructure.autocomplete import ingredient_name_index
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.invalidation import Change, change_poller, log_change
+from src.shared.text import trigrams
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import aliased
+
+# the trigram tokenizer can't match terms shorter than a single trigram
+FTS_MIN_TERM = 3
+
+# pg_trgm's default cut-off for "similar enough"
+MIN_SIMILARITY = 0.3
+
+# catalogue rows almost never change, so meal writes resolve them from memory;
+# the TTL only bounds staleness from writers we don't hear about
+ingredient_cache: LRUCache[int, Ingredient] = LRUCache(maxsize = 10_000, ttl = 600)
 
+def _fts_phrase(term: str) -> str:
+    """Quote a user term as an FTS5 phrase so operators / punctuation are matched literally."""
+    return '"' + term.replace('"', '""') + '"'
 
 
 class IngredientRepo:
@@ -29,36 +52,125 @@ class IngredientRepo:
 
     def get_by_id(self, id: int) -> Ingredient:
         """Find the ingredient by id. """
+        change_poller.poll(self.session)
+        cached = ingredient_cache.get(id)
+        if cached is not None:
+            return cached
         row: IngredientModel = self.session.get(IngredientModel, id)
-        return self._to_domain(row)
+        ingredient = self._to_domain(row)
+        ingredient_cache.put(id, ingredient)
+        return ingredient
 
     def get_many(self, ids: list[int]) -> dict[int, Ingredient]:
         """Find multiple ingredients using a list of ids. """
         if not ids:
             return {}
 
-        result: dict[int, Ingredient] = {}
+        change_poller.poll(self.session)
+        result: dict[int, Ingredient] = ingredient_cache.get_many(ids)
+        missing = [i for i in ids if i not in result]
         CHUNK = 500 # to avoid N + 1 pattern, we ask for ingredient in chunks
 
-        for i in range(0, len(ids), CHUNK):
-            chunk = ids[i:i+CHUNK]
+        for i in range(0, len(missing), CHUNK):
+            chunk = missing[i:i+CHUNK]
             stmt = select(IngredientModel).where(IngredientModel.id.in_(chunk))
             rows = (self.session.execute(stmt).scalars().all())
             for r in rows:
                 result[r.id] = self._to_domain(r)
+                ingredient_cache.put(r.id, result[r.id])
         
         return result 
 
     def find_by_name(self, query: str, limit: int = 10) -> list[Ingredient]:
-        rows: list[IngredientModel] = (
-            self.session.query(IngredientModel)
-            .filter(func.lower(IngredientModel.name).like(f"%{query.lower()}%"))
-            .limit(limit)
-            .all()
+        """
+        Find ingredients whose name contains every whitespace-separated term of the query.
+        Terms are looked up in the FTS5 trigram index; see _order_by_relevance for the ranking.
+        Ingredients removed from the catalogue (removed_at) are not offered.
+        """
+        terms = query.lower().split()
+        indexed = [t for t in terms if len(t) >= FTS_MIN_TERM]
+        short = [t for t in terms if len(t) < FTS_MIN_TERM]
+
+        if not indexed:
+            # nothing the index can answer (e.g. "an") -> plain substring scan
+            stmt = (
+                select(IngredientModel)
+                .where(func.lower(IngredientModel.name).contains(query.lower(), autoescape = True))
+                .where(IngredientModel.removed_at.is_(None))
+            )
+            stmt = self._order_by_relevance(stmt, " ".join(terms)).limit(limit)
+            return [self._to_domain(r) for r in self.session.execute(stmt).scalars().all()]
+
+        stmt = (
+            select(IngredientModel)
+            .join(ingredients_fts, ingredients_fts.c.rowid == IngredientModel.id)
+            .where(ingredients_fts.c.name.match(" ".join(_fts_phrase(t) for t in indexed)))
+            .where(IngredientModel.removed_at.is_(None))
         )
+        # short terms only filter the (already small) candidate set
+        for t in short:
+            stmt = stmt.where(func.lower(IngredientModel.name).contains(t, autoescape = True))
+        stmt = self._order_by_relevance(stmt, " ".join(terms), ingredients_fts.c.rank).limit(limit)
 
+        rows: list[IngredientModel] = self.session.execute(stmt).scalars().all()
         return [self._to_domain(r) for r in rows]
 
+    def _order_by_relevance(self, stmt, query: str, *tie_breakers):
+        """
+        Rank matches in SQL so only the top `limit` rows leave SQLite:
+        exact name, then name prefix, then word-boundary match, then anything else;
+        within a tier shorter names first, then the most used ingredients (ingredient_usage).
+        """
+        name = func.lower(IngredientModel.name)
+        tier = case(
+            (name == query, 0),
+            (name.startswith(query, autoescape = True), 1),
+            (name.contains(" " + query, autoescape = True), 2),
+            else_ = 3,
+        )
+        popularity = func.coalesce(IngredientUsageModel.use_count, 0)
+        return (
+            stmt
+            .outerjoin(IngredientUsageModel, IngredientUsageModel.ingredient_id == IngredientModel.id)
+            .order_by(tier, func.length(IngredientModel.name), popularity.desc(), *tie_breakers, IngredientModel.id)
+        )
+
+    def find_similar(self, query: str, limit: int = 10, min_similarity: float = MIN_SIMILARITY) -> list[Ingredient]:
+        """
+        Typo-tolerant search: rank ingredients by trigram similarity
+        shared / (|query trigrams| + |name trigrams| - shared), best first.
+        """
+        q_grams = trigrams(query)
+        if not q_grams:
+            return []
+        n = len(q_grams)
+
+        # similarity >= t implies shared >= t * n, so weak candidates are cut before the join
+        min_shared = max(1, math.ceil(min_similarity * n))
+        hits = (
+            select(IngredientTrigramModel.ingredient_id, func.count().label("shared"))
+            .where(IngredientTrigramModel.trigram.in_(q_grams))
+            .group_by(IngredientTrigramModel.ingredient_id)
+            .having(func.count() >= min_shared)
+            .subquery()
+        )
+        name_grams = aliased(IngredientTrigramModel)
+        name_size = (
+            select(func.count())
+            .where(name_grams.ingredient_id == hits.c.ingredient_id)
+            .scalar_subquery()
+        )
+        similarity = (hits.c.shared * 1.0 / (n + name_size - hits.c.shared)).label("similarity")
+
+        stmt = (
+            select(IngredientModel)
+            .join(hits, hits.c.ingredient_id == IngredientModel.id)
+            .where(similarity >= min_similarity)
+            .order_by(similarity.desc(), func.length(IngredientModel.name), IngredientModel.id)
+            .limit(limit)
+        )
+        rows: list[IngredientModel] = self.session.execute(stmt).scalars().all()
+        return [self._to_domain(r) for r in rows]
 
     def create(self, domain_ingredient: Ingredient) -> Ingredient:
         """Create a new ingredient. """
@@ -70,8 +182,12 @@ class IngredientRepo:
                         fats_per_100g = domain_ingredient.fats_per_100g,
                     )
         self.session.add(ingredient)
+        self.session.flush() # assign ingredient.id
+        self._index_trigrams(ingredient.id, ingredient.name)
+        log_change(self.session, "ingredient", ingredient.id, "upsert")
         self.session.commit()
         self.session.refresh(ingredient)
+        ingredient_name_index.upsert(ingredient.id, ingredient.name)
         return self._to_domain(ingredient)
 
 
@@ -94,12 +210,26 @@ class IngredientRepo:
             "proteins_per_100g",
             "fats_per_100g",
         }
+        old_name = ingredient.name
+        old_macros = self._macros(ingredient)
         for key, value in kwargs.items():
             if key in updatable and value is not None:
                 setattr(ingredient, key, value)
+
+        renamed = ingredient.name != old_name
+        if renamed:
+            self._index_trigrams(ingredient.id, ingredient.name)
+        if self._macros(ingredient) != old_macros:
+            # stored meal totals (and the days they roll up into) were computed from the old values
+            with updating_rollups(self.session, *meals_filter(ingredient_ids = [ingredient.id])):
+                recompute_meal_totals(self.session, ingredient_ids = [ingredient.id])
+        log_change(self.session, "ingredient", ingredient.id, "upsert")
         
         self.session.commit()
         self.session.refresh(ingredient) # keep the object up-to date 
+        ingredient_cache.invalidate(ingredient.id)
+        if renamed:
+            ingredient_name_index.upsert(ingredient.id, ingredient.name)
         return self._to_domain(ingredient)
     
     def delete(self, id: int) -> None:
@@ -108,5 +238,55 @@ class IngredientRepo:
         if not ingredient:
             raise IngredientNotFound(f"Ingredient with ID '{id}' not found.")
 
+        self.session.execute(delete(IngredientTrigramModel).where(IngredientTrigramModel.ingredient_id == id))
+        IngredientUsageRepo(self.session).forget(id)
+        log_change(self.session, "ingredient", id, "delete")
         self.session.delete(ingredient)
-        self.session.commit()
\ No newline at end of file
+        self.session.commit()
+        ingredient_cache.invalidate(id)
+        ingredient_name_index.remove(id)
+
+    @staticmethod
+    def _macros(row: IngredientModel) -> tuple[float, float, float, float]:
+        return (row.kcal_per_100g, row.carbs_per_100g, row.proteins_per_100g, row.fats_per_100g)
+
+    # ——— Trigram index ———
+
+    def _index_trigrams(self, ingredient_id: int, name: str) -> None:
+        """Replace the trigram postings of one ingredient (caller commits)."""
+        self.session.execute(delete(IngredientTrigramModel).where(IngredientTrigramModel.ingredient_id == ingredient_id))
+        grams = trigrams(name)
+        if grams:
+            self.session.execute(
+                insert(IngredientTrigramModel),
+                [{"trigram": g, "ingredient_id": ingredient_id} for g in grams],
+            )
+
+
+# ——— Cross-worker invalidation ———
+
+def _apply_ingredient_changes(session, changes: list[Change]) -> None:
+    """Another worker (or this one) wrote ingredients: evict them and patch the name index."""
+    final_op: dict[int, str] = {}
+    for c in changes:
+        final_op[c.entity_id] = c.op   # changes arrive in seq order, the last one wins
+        ingredient_cache.invalidate(c.entity_id)
+
+    upserted = [iid for iid, op in final_op.items() if op == "upsert"]
+    for iid, op in final_op.items():
+        if op == "delete":
+            ingredient_name_index.remove(iid)
+    CHUNK = 500 # a catalogue sync can log thousands of rows at once
+    for i in range(0, len(upserted), CHUNK):
+        rows = session.execute(
+            select(IngredientModel.id, IngredientModel.name)
+            .where(IngredientModel.id.in_(upserted[i:i+CHUNK]), IngredientModel.removed_at.is_(None))
+        ).all()
+        for iid, name in rows:
+            ingredient_name_index.upsert(iid, name)
+
+def _reset_ingredient_caches() -> None:
+    ingredient_cache.clear()
+    ingredient_name_index.invalidate()
+
+change_poller.subscribe("ingredient", _apply_ingredient_changes, on_reset = _reset_ingredient_caches)
@@ -1,21 +1,89 @@
+from collections import Counter
 from datetime import datetime
+from collections.abc import Iterable
 from src.domain import Meal, MealEntry, Ingredient
+from src.domain.domain import MacroTotals, MealSummary
 from src.domain.errors import MealNotFound
-from src.data.database_models import MealModel, MealEntryModel, IngredientModel
-from sqlalchemy import func, select
-from sqlalchemy.orm import joinedload
+from src.data.database_models import MealModel, MealEntryModel, IngredientModel, FavoriteMealModel
+from src.infrastructure.repositories.usage_repo import IngredientUsageRepo
+from src.infrastructure.repositories.rollup_repo import add_to_rollups, updating_rollups
+from src.infrastructure.invalidation import log_change
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import timezone, tzinfo
 
+# Everything _to_domain touches, loaded up front: 1 query for the meals (+ favorite, one-to-one join)
+# and 1 selectin query for all their entries + ingredients, however many entries there are.
+MEAL_LOAD_OPTIONS = (
+    selectinload(MealModel.entries).joinedload(MealEntryModel.ingredient),
+    joinedload(MealModel.favorite),
+)
+
+def _entries_sum(per_100g):
+    """sum(grams * per_100g / 100) over the entries of the history_meals row being updated."""
+    return (
+        select(func.coalesce(func.sum(per_100g * MealEntryModel.grams / 100.0), 0.0))
+        .select_from(MealEntryModel)
+        .join(IngredientModel, IngredientModel.id == MealEntryModel.ingredient_id)
+        .where(MealEntryModel.meal_id == MealModel.id)
+        .scalar_subquery()
+    )
+
+def meals_filter(meal_ids: Iterable[int] | None = None, ingredient_ids: Iterable[int] | None = None) -> list:
+    """WHERE clauses selecting the given meals and/or the meals using the given ingredients."""
+    where = []
+    if meal_ids is not None:
+        where.append(MealModel.id.in_(list(meal_ids)))
+    if ingredient_ids is not None:
+        using = select(MealEntryModel.meal_id).where(MealEntryModel.ingredient_id.in_(list(ingredient_ids)))
+        where.append(MealModel.id.in_(using))
+    return where
+
+def recompute_meal_totals(
+    session,
+    *,
+    meal_ids: Iterable[int] | None = None,
+    ingredient_ids: Iterable[int] | None = None,
+) -> int:
+    """
+    Recompute the stored macro totals from entries, in SQL, for the given meals,
+    for every meal using one of the given ingredients, or for all meals when neither is given.
+    Returns the number of meals touched. The caller commits, and keeps the
+    rollups in step (wrap the call in updating_rollups(session, *meals_filter(...))).
+    """
+    stmt = update(MealModel).values(
+        total_kcal      = _entries_sum(IngredientModel.kcal_per_100g),
+        total_protein_g = _entries_sum(IngredientModel.proteins_per_100g),
+        total_carbs_g   = _entries_sum(IngredientModel.carbs_per_100g),
+        total_fat_g     = _entries_sum(IngredientModel.fats_per_100g),
+    ).where(*meals_filter(meal_ids, ingredient_ids))
+    session.flush()
+    result = session.execute(stmt, execution_options = {"synchronize_session": False})
+    return result.rowcount
+
 class MealRepo:
     def __init__(self, session):
         self.session = session
+        self._usage = IngredientUsageRepo(session)
 
     def get_by_id(self, id: int) -> Meal:
-        ent: MealModel | None = self.session.get(MealModel, id)
+        stmt = select(MealModel).where(MealModel.id == id).options(*MEAL_LOAD_OPTIONS)
+        ent: MealModel | None = self.session.execute(stmt).scalar_one_or_none()
         if ent is None:
             raise MealNotFound("This meal doesn't exist!")
         return self._to_domain(ent)
 
+    def get_by_favorite(self, favorite_id: int) -> Meal | None:
+        """The meal behind a favorite row, or None if there is no such favorite."""
+        stmt = (
+            select(MealModel)
+            .join(FavoriteMealModel, FavoriteMealModel.meal_id == MealModel.id)
+            .where(FavoriteMealModel.id == favorite_id)
+            .options(*MEAL_LOAD_OPTIONS)
+        )
+        ent: MealModel | None = self.session.execute(stmt).scalar_one_or_none()
+        return self._to_domain(ent) if ent is not None else None
+
     def list_between(self, start: datetime, end: datetime) -> list[Meal]:
         """
         List entries in range [start, end]
@@ -23,22 +91,47 @@ class MealRepo:
         stmt = (
             select(MealModel)
             .where(MealModel.eaten_at >= start, MealModel.eaten_at <= end)
-            .options(
-                joinedload(MealModel.entries)  # MealModel -> entries (collection)
-                .joinedload(MealEntryModel.ingredient)  # Entry -> ingredient (scalar rel)
-            )
+            .options(*MEAL_LOAD_OPTIONS)
             .order_by(MealModel.eaten_at.desc(), MealModel.id.desc())
         )
-        rows: list[MealModel] = self.session.execute(stmt).unique().scalars().all()  # <-- unique()
+        rows: list[MealModel] = self.session.execute(stmt).scalars().all()
         return [self._to_domain(r) for r in rows]
 
+    def list_summaries_between(self, start: datetime, end: datetime) -> list[MealSummary]:
+        """
+        Meals in range [start, end] with their stored totals; reads history_meals only.
+        """
+        stmt = (
+            select(
+                MealModel.id, MealModel.name, MealModel.eaten_at,
+                MealModel.total_kcal, MealModel.total_protein_g, MealModel.total_carbs_g, MealModel.total_fat_g,
+            )
+            .where(MealModel.eaten_at >= start, MealModel.eaten_at <= end)
+            .order_by(MealModel.eaten_at.desc(), MealModel.id.desc())
+        )
+        return [
+            MealSummary(
+                id = row.id,
+                name = row.name,
+                eaten_at = self._ensure_utc(row.eaten_at),
+                totals = MacroTotals(
+                    proteins = row.total_protein_g,
+                    fats = row.total_fat_g,
+                    carbs = row.total_carbs_g,
+                    kcal = row.total_kcal,
+                ),
+            )
+            for row in self.session.execute(stmt)
+        ]
+
     def find_by_name(self, query: str, limit: int) -> list[Meal]:
-        ents: list[MealModel] = (
-            self.session.query(MealModel)
-            .filter(func.lower(MealModel.name).like(f"%{query.lower()}%"))
+        stmt = (
+            select(MealModel)
+            .where(func.lower(MealModel.name).like(f"%{query.lower()}%"))
+            .options(*MEAL_LOAD_OPTIONS)  # selectin, so LIMIT applies to meals, not joined rows
             .limit(limit)
-            .all()
         )
+        ents: list[MealModel] = self.session.execute(stmt).scalars().all()
         return [self._to_domain(e) for e in ents]
 
     def create(self, domain_meal: Meal) -> Meal:
@@ -61,53 +154,81 @@ class MealRepo:
             )
             self.session.add(me)
 
+        self._usage.record(
+            Counter(de.ingredient.id for de in domain_meal.entries),
+            used_at = domain_meal.eaten_at,
+        )
+        recompute_meal_totals(self.session, meal_ids = [ent.id])
+        add_to_rollups(self.session, MealModel.id == ent.id)
+        log_change(self.session, "meal", ent.id, "upsert")
         self.session.commit()
-        return self._to_domain(ent)
+        return self.get_by_id(ent.id)
 
     def update(self, meal_id: int, domain_meal: Meal) -> Meal:
         ent = self.session.get(MealModel, meal_id)
         if ent is None:
             return None  # or raise NotFound
 
-        # scalars
-        ent.name = domain_meal.name
-        ent.eaten_at = domain_meal.eaten_at.astimezone(timezone.utc)
+        # totals and eaten_at may both move; the rollups follow the meal to its new day
+        with updating_rollups(self.session, MealModel.id == meal_id):
+            # scalars
+            ent.name = domain_meal.name
+            ent.eaten_at = domain_meal.eaten_at.astimezone(timezone.utc)
 
-        # replace entries wholesale
-        ent.entries.clear()              # relationship name is `entries` on MealModel
-        self.session.flush()
-        for de in domain_meal.entries:
-            ing_id = de.ingredient.id
-            if ing_id is None:
-                raise ValueError("MealEntry.ingredient.id must be set")
-            me = MealEntryModel(
-                meal_id=ent.id,
-                ingredient_id=ing_id,
-                grams=de.quantity_g,
-            )
-            self.session.add(me)
+            # replace entries wholesale
+            removed = Counter(e.ingredient_id for e in ent.entries)
+            ent.entries.clear()              # relationship name is `entries` on MealModel
+            self.session.flush()
+            for de in domain_meal.entries:
+                ing_id = de.ingredient.id
+                if ing_id is None:
+                    raise ValueError("MealEntry.ingredient.id must be set")
+                me = MealEntryModel(
+                    meal_id=ent.id,
+                    ingredient_id=ing_id,
+                    grams=de.quantity_g,
+                )
+                self.session.add(me)
 
+            self._usage.record(
+                Counter(de.ingredient.id for de in domain_meal.entries),
+                removed,
+                used_at = domain_meal.eaten_at,
+            )
+            recompute_meal_totals(self.session, meal_ids = [ent.id])
+        log_change(self.session, "meal", ent.id, "upsert")
         self.session.commit()
-        return self._to_domain(ent)
+        return self.get_by_id(ent.id)
 
     def update_entry_quantity(self, *, meal_id: int, entry_id: int, grams: float) -> None:
         ent = self._get_entry(meal_id, entry_id)
         if ent is None:
             raise MealNotFound("Entry not found for this meal")
-        ent.grams = grams
+        with updating_rollups(self.session, MealModel.id == meal_id):
+            ent.grams = grams
+            recompute_meal_totals(self.session, meal_ids = [meal_id])
+        log_change(self.session, "meal", meal_id, "upsert")
         self.session.commit()
 
     def update_entry_ingredient(self, *, meal_id: int, entry_id: int, ingredient_id: int) -> None:
         ent = self._get_entry(meal_id, entry_id)
         if ent is None:
             raise MealNotFound("Entry not found for this meal")
-        ent.ingredient_id = ingredient_id
+        if ent.ingredient_id != ingredient_id:
+            self._usage.record(Counter([ingredient_id]), Counter([ent.ingredient_id]), used_at = ent.meal.eaten_at)
+        with updating_rollups(self.session, MealModel.id == meal_id):
+            ent.ingredient_id = ingredient_id
+            recompute_meal_totals(self.session, meal_ids = [meal_id])
+        log_change(self.session, "meal", meal_id, "upsert")
         self.session.commit()
 
     def delete(self, meal_id: int) -> None:
         ent = self.session.get(MealModel, meal_id)
         if ent is None:
             return  # or raise NotFound
+        self._usage.record(Counter(), Counter(e.ingredient_id for e in ent.entries))
+        log_change(self.session, "meal", meal_id, "delete")
+        add_to_rollups(self.session, MealModel.id == meal_id, sign = -1)
         self.session.delete(ent)
         self.session.commit()
 
@@ -115,8 +236,20 @@ class MealRepo:
         ent = self._get_entry(meal_id, entry_id)
         if ent is None:
             return
-        self.session.delete(ent)
+        self._usage.record(Counter(), Counter([ent.ingredient_id]))
+        log_change(self.session, "meal", meal_id, "upsert")
+        with updating_rollups(self.session, MealModel.id == meal_id):
+            self.session.delete(ent)
+            recompute_meal_totals(self.session, meal_ids = [meal_id])
+        self.session.commit()
+
+    def recompute_totals(self, *, meal_ids: Iterable[int] | None = None, ingredient_ids: Iterable[int] | None = None) -> int:
+        """Repair stored totals in bulk (all meals by default); see recompute_meal_totals."""
+        meal_ids = list(meal_ids) if meal_ids is not None else None
+        with updating_rollups(self.session, *meals_filter(meal_ids, ingredient_ids)):
+            touched = recompute_meal_totals(self.session, meal_ids = meal_ids, ingredient_ids = ingredient_ids)
         self.session.commit()
+        return touched
     # ——— Conversion helpers ———
 
     def _to_domain_ingredient(self, row: IngredientModel) -> Ingredient:
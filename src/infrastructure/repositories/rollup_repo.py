@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import delete, func, literal, select, true, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.data.database_models import DailyNutritionRollupModel, MealModel, PeriodNutritionRollupModel
+from src.domain.domain import MacroTotals, PeriodTotals
+from src.shared.periods import PERIOD_LEVELS, Bucket, Level, period_end, period_start
+
+_DAILY = DailyNutritionRollupModel.__table__
+_PERIODS = PeriodNutritionRollupModel.__table__
+_MEASURES = ("meal_count", "kcal", "protein_g", "carbs_g", "fat_g")
+
+
+def _period_start_sql(level: Level, day):
+    """SQL twin of periods.period_start over a 'YYYY-MM-DD' expression."""
+    if level == "week":
+        # strftime('%w') is 0 for Sunday; step back to Monday
+        return func.date(day, func.printf("-%d days", (func.strftime("%w", day) + 6) % 7))
+    if level == "month":
+        return func.date(day, "start of month")
+    return func.date(day, "start of year")
+
+
+def _meal_sums(sign: int):
+    return (
+        sign * func.count(),
+        sign * func.sum(MealModel.total_kcal),
+        sign * func.sum(MealModel.total_protein_g),
+        sign * func.sum(MealModel.total_carbs_g),
+        sign * func.sum(MealModel.total_fat_g),
+    )
+
+
+def _upsert(table, keys: tuple[str, ...], source):
+    stmt = sqlite_insert(table).from_select(keys + _MEASURES, source)
+    return stmt.on_conflict_do_update(
+        index_elements = [table.c[k] for k in keys],
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in _MEASURES},
+    )
+
+
+def add_to_rollups(session, *where, sign: int = 1) -> None:
+    """
+    Add (sign=1) or take out (sign=-1) the stored totals of the meals matching `where`
+    at every rollup level: their UTC day, ISO week, month and year. The caller commits.
+    """
+    # an INSERT ... SELECT upsert needs a WHERE, or SQLite parses ON CONFLICT as a join
+    where = where or (true(),)
+    day = func.date(MealModel.eaten_at)
+    session.execute(_upsert(
+        _DAILY, ("day",),
+        select(day, *_meal_sums(sign)).where(*where).group_by(day),
+    ))
+    for level in PERIOD_LEVELS:
+        start = _period_start_sql(level, day)
+        session.execute(_upsert(
+            _PERIODS, ("level", "period_start"),
+            select(literal(level), start, *_meal_sums(sign)).where(*where).group_by(start),
+        ))
+
+
+@contextmanager
+def updating_rollups(session, *where):
+    """
+    Keep the rollups in step with a write to the meals matching `where`:
+    their stored totals are taken out of their periods on entry and added back (to their
+    possibly new periods) on exit, once the block has updated them. The caller commits.
+    """
+    session.flush()
+    add_to_rollups(session, *where, sign = -1)
+    yield
+    session.flush()
+    add_to_rollups(session, *where)
+
+
+class NutritionRollupRepo:
+    """
+    Reads and rebuilds daily_nutrition_rollup and period_nutrition_rollup. Incremental upkeep
+    happens through add_to_rollups / updating_rollups inside the meal writers' own transactions.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def fetch(self, buckets: set[Bucket]) -> dict[Bucket, PeriodTotals]:
+        """Stored totals of whole buckets (see periods.plan_range); empty buckets are absent."""
+        days = {b.start: b for b in buckets if b.level == "day"}
+        periods = {(b.level, b.start): b for b in buckets if b.level != "day"}
+        found: dict[Bucket, PeriodTotals] = {}
+
+        if days:
+            t = _DAILY.c
+            rows = self.session.execute(select(t.day, *(t[m] for m in _MEASURES)).where(t.day.in_(list(days))))
+            for row in rows:
+                bucket = days[row.day]
+                found[bucket] = _to_totals(bucket, row)
+        if periods:
+            t = _PERIODS.c
+            stmt = (
+                select(t.level, t.period_start, *(t[m] for m in _MEASURES))
+                .where(tuple_(t.level, t.period_start).in_(list(periods)))
+            )
+            for row in self.session.execute(stmt):
+                bucket = periods[(row.level, row.period_start)]
+                found[bucket] = _to_totals(bucket, row)
+        return found
+
+    def rebuild(self, start_date: date | None = None, end_date: date | None = None) -> int:
+        """
+        Recompute the daily rows for [start_date, end_date] (everything by default) from history_meals,
+        then every week / month / year overlapping it from the daily rows. Returns the number of days written.
+        """
+        clear = delete(_DAILY)
+        where = []
+        if start_date is not None:
+            clear = clear.where(_DAILY.c.day >= start_date)
+            where.append(MealModel.eaten_at >= datetime.combine(start_date, time.min, tzinfo = timezone.utc))
+        if end_date is not None:
+            clear = clear.where(_DAILY.c.day <= end_date)
+            end_excl = datetime.combine(end_date + timedelta(days = 1), time.min, tzinfo = timezone.utc)
+            where.append(MealModel.eaten_at < end_excl)
+
+        self.session.execute(clear)
+        day = func.date(MealModel.eaten_at)
+        written = self.session.execute(
+            sqlite_insert(_DAILY).from_select(
+                ("day",) + _MEASURES,
+                select(day, *_meal_sums(1)).where(*where).group_by(day),
+            )
+        ).rowcount
+
+        for level in PERIOD_LEVELS:
+            self._rebuild_level(level, start_date, end_date)
+        self.session.commit()
+        return written
+
+    def _rebuild_level(self, level: Level, start_date: date | None, end_date: date | None) -> None:
+        # whole periods touching the range; their days outside it are already current
+        first = period_start(level, start_date) if start_date is not None else None
+        last = period_end(level, end_date) if end_date is not None else None
+
+        clear = delete(_PERIODS).where(_PERIODS.c.level == level)
+        days = [true()]
+        if first is not None:
+            clear = clear.where(_PERIODS.c.period_start >= first)
+            days.append(_DAILY.c.day >= first)
+        if last is not None:
+            clear = clear.where(_PERIODS.c.period_start <= last)
+            days.append(_DAILY.c.day <= last)
+        self.session.execute(clear)
+
+        start = _period_start_sql(level, _DAILY.c.day)
+        sums = (func.sum(_DAILY.c[m]) for m in _MEASURES)
+        self.session.execute(
+            sqlite_insert(_PERIODS).from_select(
+                ("level", "period_start") + _MEASURES,
+                select(literal(level), start, *sums).where(*days).group_by(start),
+            )
+        )
+
+
+def _to_totals(bucket: Bucket, row) -> PeriodTotals:
+    return PeriodTotals(
+        start = bucket.start,
+        end = bucket.end,
+        meal_count = row.meal_count,
+        totals = MacroTotals(proteins = row.protein_g, fats = row.fat_g, carbs = row.carbs_g, kcal = row.kcal),
+    )
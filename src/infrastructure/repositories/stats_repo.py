@@ -1,15 +1,18 @@
 from __future__ import annotations
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone, tzinfo
 from typing import TypedDict
 
 from sqlalchemy import (
+        case,
+        literal,
         select,
         func              # func is just a namespace for an SQL function
     )
 
 from sqlalchemy.orm import Session
 
-from src.data.database_models import MealModel, MealEntryModel, IngredientModel
+from src.data.database_models import DailyNutritionRollupModel, MealModel
+from src.shared.timezones import local_day_bounds, utc_offset_segments
 
 class DayAggRow(TypedDict):
     day: str          # e.g. "2025-08-30"
@@ -23,6 +26,10 @@ def _to_utc(dt: datetime) -> datetime:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
 
+def _naive_utc(dt: datetime) -> datetime:
+    # eaten_at is stored as naive UTC text, so bounds are compared in the same form
+    return _to_utc(dt).replace(tzinfo=None)
+
 class StatsRepo:
     """
     Read-model style repo for aggregated nutrition stats.
@@ -34,47 +41,82 @@ class StatsRepo:
     def daily_aggregate(
             self,
             start_date: date,
-            end_date: date
+            end_date: date,
+            tz: tzinfo | None = None,
     ) -> list[DayAggRow]:
         """
         Returns one row per day within [start_date, end_date] that has data:
-        - day (YYYY-MM-DD)
+        - day (YYYY-MM-DD), a local calendar day in `tz` (UTC when not given)
         - kcal, protein_g, carbs_g, fat_g (summed per each day)
         Note: Missing days are handled in the service (filled with zero).
         """
-
-        start_dt = _to_utc(datetime.combine(start_date, datetime.min.time()))
-        end_dt_excl = _to_utc(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
-
-        # We'll use the following approach
-        # - filter by raw timestamp for index usage
-        # - group by func.date()
-        day_expr = func.date(MealModel.eaten_at) # collapses all times on the same date in the same group
-
-        stmt = (
-            select(
-                day_expr.label("day"),
-                func.sum(IngredientModel.kcal_per_100g * (MealEntryModel.grams / 100.0)).label("kcal"),
-                func.sum(IngredientModel.proteins_per_100g * (MealEntryModel.grams / 100.0)).label("protein_g"),
-                func.sum(IngredientModel.carbs_per_100g * (MealEntryModel.grams / 100.0)).label("carbs_g"),
-                func.sum(IngredientModel.fats_per_100g * (MealEntryModel.grams / 100.0)).label("fat_g"),
-            )
-            .join(MealEntryModel, MealEntryModel.meal_id == MealModel.id)
-            .join(IngredientModel, IngredientModel.id == MealEntryModel.ingredient_id)
-            .where(MealModel.eaten_at >= start_dt, MealModel.eaten_at < end_dt_excl)
-            .group_by(day_expr)
-            .order_by(day_expr.asc())
-        )
+        if tz is None:
+            stmt = self._utc_days(start_date, end_date)
+        else:
+            start_dt, end_dt_excl = local_day_bounds(start_date, end_date, tz)
+            segments = utc_offset_segments(tz, start_dt, end_dt_excl)
+            if all(offset == timedelta(0) for _, offset in segments):
+                stmt = self._utc_days(start_date, end_date)
+            else:
+                stmt = self._local_days(start_dt, end_dt_excl, segments)
 
         rows = self.db.execute(stmt).mappings().all()
         # rows are MappingResult; convert to TypedDict
         return [
             {
-                "day": row["day"],
+                "day": row["day"] if isinstance(row["day"], str) else row["day"].isoformat(),
                 "kcal": float(row["kcal"] or 0.0),
                 "protein_g": float(row["protein_g"] or 0.0),
                 "carbs_g": float(row["carbs_g"] or 0.0),
                 "fat_g": float(row["fat_g"] or 0.0),
             }
             for row in rows
-        ]
\ No newline at end of file
+        ]
+
+    @staticmethod
+    def _utc_days(start_date: date, end_date: date):
+        # one pre-aggregated row per day (daily_nutrition_rollup), kept current by MealRepo
+        return (
+            select(
+                DailyNutritionRollupModel.day,
+                DailyNutritionRollupModel.kcal,
+                DailyNutritionRollupModel.protein_g,
+                DailyNutritionRollupModel.carbs_g,
+                DailyNutritionRollupModel.fat_g,
+            )
+            .where(
+                DailyNutritionRollupModel.day >= start_date,
+                DailyNutritionRollupModel.day <= end_date,
+                DailyNutritionRollupModel.meal_count > 0,
+            )
+            .order_by(DailyNutritionRollupModel.day.asc())
+        )
+
+    @staticmethod
+    def _local_days(start_dt: datetime, end_dt_excl: datetime, segments: list[tuple[datetime, timedelta]]):
+        """
+        The rollup is keyed by UTC day, so other zones group the per-meal totals instead.
+        Each meal is shifted by the UTC offset in force at its own instant: one CASE arm per
+        offset segment, so DST switches inside the range land meals on the right local day.
+        """
+        shift = lambda offset: f"{int(offset.total_seconds()):+d} seconds"
+        modifier = case(
+            *((MealModel.eaten_at < _naive_utc(seg_end), shift(offset))
+              for (_, offset), (seg_end, _) in zip(segments, segments[1:])),
+            else_ = shift(segments[-1][1]),
+        ) if len(segments) > 1 else literal(shift(segments[0][1]))
+        day_expr = func.date(MealModel.eaten_at, modifier)
+
+        return (
+            select(
+                day_expr.label("day"),
+                func.sum(MealModel.total_kcal).label("kcal"),
+                func.sum(MealModel.total_protein_g).label("protein_g"),
+                func.sum(MealModel.total_carbs_g).label("carbs_g"),
+                func.sum(MealModel.total_fat_g).label("fat_g"),
+            )
+            # filter by raw timestamp for index usage
+            .where(MealModel.eaten_at >= _naive_utc(start_dt), MealModel.eaten_at < _naive_utc(end_dt_excl))
+            .group_by(day_expr)
+            .order_by(day_expr.asc())
+        )
@@ -0,0 +1,105 @@
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.domain.domain import Ingredient, IngredientUsage
+from src.data.database_models import IngredientModel, IngredientUsageModel
+
+
+class IngredientUsageRepo:
+    """
+    Maintains the ingredient_usage aggregate (how often / how recently each ingredient was eaten).
+    Writers only stage changes; the caller's repo commits them with its own transaction.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def record(self, added: Counter[int], removed: Counter[int] | None = None, used_at: datetime | None = None) -> None:
+        """
+        Apply entry deltas: `added` / `removed` map ingredient_id -> number of entries.
+        `used_at` moves last_used_at forward for the added ingredients; removals never move it back.
+        """
+        used_at = _ensure_utc(used_at).astimezone(timezone.utc) if used_at is not None else None
+        rows = [
+            {"ingredient_id": iid, "use_count": n, "last_used_at": used_at}
+            for iid, n in (added or {}).items() if n > 0
+        ]
+        if rows:
+            stmt = sqlite_insert(IngredientUsageModel).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements = [IngredientUsageModel.ingredient_id],
+                set_ = {
+                    "use_count": IngredientUsageModel.use_count + stmt.excluded.use_count,
+                    # scalar max() is NULL if either side is NULL, hence the coalesce
+                    "last_used_at": func.coalesce(
+                        func.max(IngredientUsageModel.last_used_at, stmt.excluded.last_used_at),
+                        stmt.excluded.last_used_at,
+                        IngredientUsageModel.last_used_at,
+                    ),
+                },
+            )
+            self.session.execute(stmt)
+
+        params = [{"iid": iid, "n": n} for iid, n in (removed or {}).items() if n > 0]
+        if params:
+            table = IngredientUsageModel.__table__
+            stmt = (
+                update(table)
+                .where(table.c.ingredient_id == bindparam("iid"))
+                .values(use_count = func.max(table.c.use_count - bindparam("n"), 0))
+            )
+            self.session.execute(stmt, params)
+
+    def forget(self, ingredient_id: int) -> None:
+        """Drop the aggregate of a deleted ingredient (caller commits)."""
+        self.session.query(IngredientUsageModel).filter_by(ingredient_id = ingredient_id).delete()
+
+    def most_frequent(self, limit: int = 10) -> list[IngredientUsage]:
+        """Ingredients with the most meal entries, ties broken by recency."""
+        return self._list(
+            limit,
+            IngredientUsageModel.use_count.desc(),
+            IngredientUsageModel.last_used_at.desc(),
+        )
+
+    def most_recent(self, limit: int = 10) -> list[IngredientUsage]:
+        """Ingredients ordered by the last meal they were eaten in."""
+        return self._list(
+            limit,
+            IngredientUsageModel.last_used_at.desc(),
+            IngredientUsageModel.use_count.desc(),
+        )
+
+    def _list(self, limit: int, *order_by) -> list[IngredientUsage]:
+        stmt = (
+            select(IngredientUsageModel, IngredientModel)
+            .join(IngredientModel, IngredientModel.id == IngredientUsageModel.ingredient_id)
+            .where(IngredientUsageModel.use_count > 0, IngredientModel.removed_at.is_(None))   # not tombstoned by a sync
+            .order_by(*order_by, IngredientUsageModel.ingredient_id)
+            .limit(limit)
+        )
+        return [
+            IngredientUsage(
+                ingredient = Ingredient(
+                    id=ing.id,
+                    name=ing.name,
+                    fats_per_100g=ing.fats_per_100g,
+                    proteins_per_100g=ing.proteins_per_100g,
+                    carbs_per_100g=ing.carbs_per_100g,
+                    kcal_per_100g=ing.kcal_per_100g,
+                ),
+                use_count = usage.use_count,
+                last_used_at = _ensure_utc(usage.last_used_at),
+            )
+            for usage, ing in self.session.execute(stmt).all()
+        ]
+
+
+def _ensure_utc(dt: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes; we only ever store UTC
+    if dt is None or dt.tzinfo is not None:
+        return dt
+    return dt.replace(tzinfo=timezone.utc)
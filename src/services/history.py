@@ -8,7 +8,7 @@ from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session
 
 from src.infrastructure.repositories.meal_repo import MealRepo
-from src.domain.domain import Meal, DataRange
+from src.domain.domain import MealSummary, DataRange
 from src.services.errors import ValidationError
 
 
@@ -64,11 +64,11 @@ class HistoryService:
         # Compute inclusive UTC bounds for the date interval
         dr = _ensure_utc_bounds(start_date, end_date)
 
-        # Fetch meals in [dr.start, dr.end] (repo should eager-load relations and order by eaten_at)
-        meals: list[Meal] = self.meals.list_between(dr.start, dr.end)
+        # Fetch meals in [dr.start, dr.end] with their stored totals (no entries needed here)
+        meals: list[MealSummary] = self.meals.list_summaries_between(dr.start, dr.end)
 
         # Group by local day
-        grouped: dict[date, list[Meal]] = {}
+        grouped: dict[date, list[MealSummary]] = {}
         total_kcal: float = 0.0
 
         for m in meals:
@@ -81,9 +81,7 @@ class HistoryService:
             day = eaten_local.date()
             grouped.setdefault(day, []).append(m)
 
-            kcal = getattr(m, "kcal", None)
-            if kcal is not None:
-                total_kcal += float(kcal)
+            total_kcal += m.totals.kcal
 
         # Build response blocks
         days_out = []
@@ -99,9 +97,8 @@ class HistoryService:
             for m in day_meals:
                 meal_count += 1
 
-                kcal = getattr(m, "kcal", None)
-                if kcal is not None:
-                    day_kcal += float(kcal)
+                kcal = m.totals.kcal
+                day_kcal += kcal
 
                 # Normalize and compute local again for payload
                 ea = m.eaten_at
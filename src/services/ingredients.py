@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 from sqlalchemy.orm import Session
 
 from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+from src.infrastructure.repositories.usage_repo import IngredientUsageRepo
+from src.infrastructure.autocomplete import ingredient_name_index, Suggestion
+from src.infrastructure.invalidation import change_poller
 from src.domain import Ingredient
+from src.domain.domain import IngredientUsage
 from src.domain.errors import IngredientNotFound  # make sure this exists; mirror MealNotFound
 from src.services.errors import ValidationError
 
@@ -32,6 +36,7 @@ class IngredientService:
     def __init__(self, db: Session):
         self.db = db
         self.ingredients = IngredientRepo(db)
+        self.usage = IngredientUsageRepo(db)
 
     # ---------- Commands / Queries ----------
 
@@ -66,9 +71,30 @@ class IngredientService:
     def get(self, ingredient_id: int) -> Ingredient:
         return self.ingredients.get_by_id(ingredient_id)
 
-    def search(self, q: str, limit: int = 10) -> List[Ingredient]:
+    def search(self, q: str, limit: int = 10, mode: Literal["substring", "fuzzy"] = "substring") -> List[Ingredient]:
+        """
+        mode="substring": every term must appear in the name (FTS index).
+        mode="fuzzy": rank by trigram similarity, tolerates typos like "bananna".
+        """
+        if mode == "fuzzy":
+            return self.ingredients.find_similar(q, limit)
+        if mode != "substring":
+            raise ValidationError(message=f"Unsupported search mode: {mode}", entity="Ingredient")
         return self.ingredients.find_by_name(q, limit)
 
+    def autocomplete(self, q: str, limit: int = 10) -> List[Suggestion]:
+        """Keystroke-rate name suggestions, served from the in-process name index."""
+        change_poller.poll(self.db)
+        return ingredient_name_index.search(self.db, q, limit)
+
+    def frequent(self, limit: int = 10, sort: Literal["count", "recent"] = "count") -> List[IngredientUsage]:
+        """The user's usual ingredients, by entry count or by last time eaten."""
+        if sort == "recent":
+            return self.usage.most_recent(limit)
+        if sort != "count":
+            raise ValidationError(message=f"Unsupported sort: {sort}", entity="Ingredient")
+        return self.usage.most_frequent(limit)
+
     def update(
         self,
         ingredient_id: int,
@@ -2,14 +2,21 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, timedelta
 from typing import Literal
+from zoneinfo import ZoneInfo
 
+import numpy as np
 from sqlalchemy.orm import Session
 from src.infrastructure.repositories.stats_repo import StatsRepo
+from src.infrastructure.repositories.rollup_repo import NutritionRollupRepo
+from src.services.stats_engine import MACROS, DailySeries, linear_slope, load_daily, rolling_mean
 
-from src.domain.domain import DataRange, MacroTotals
+from src.domain.domain import DataRange, MacroTotals, PeriodTotals
+from src.shared.periods import Bucket, Level, periods_between, plan_range
 from src.services.errors import ValidationError
 
 
+MAX_TREND_WINDOW = 365
+
 @dataclass(frozen=True)
 class DayCalories:
     day: date
@@ -27,6 +34,24 @@ class StatsResult:
     macro_pct: MacroPercentages
     basis: Literal["kcal", "grams"] # either one or another
 
+@dataclass(frozen=True)
+class MetricTrend:
+    daily: list[float]
+    moving_averages: dict[int, list[float]]   # window (days) -> trailing average per day
+    slope_per_day: float                      # least-squares trend of `daily`
+
+@dataclass(frozen=True)
+class TrendResult:
+    days: list[date]
+    windows: tuple[int, ...]
+    metrics: dict[str, MetricTrend]           # "kcal", "protein_g", "carbs_g", "fat_g"
+
+@dataclass(frozen=True)
+class PeriodSeries:
+    level: Level
+    periods: list[PeriodTotals]   # one per period overlapping the range, clipped to it
+    total: PeriodTotals
+
 class StatsService:
     """
     Computes daily calories and macro split for a date range
@@ -34,14 +59,54 @@ class StatsService:
 
     def __init__(self, db: Session):
         self.repo = StatsRepo(db)
+        self.rollups = NutritionRollupRepo(db)
 
     def daily_calories_and_macro_split(
             self,
             dr: DataRange,
             *,
             macro_basis: Literal["kcal", "grams"] = "kcal",
-            round_to: int = 1
+            round_to: int = 1,
+            tz_name: str = "UTC",
     ) -> StatsResult:
+        """Days are calendar days in `tz_name` (IANA name); dr's dates are taken as local dates."""
+        series = self.daily_series(dr, tz_name=tz_name)
+        return self._split(series, macro_basis=macro_basis, round_to=round_to)
+
+    def daily_calories_and_macro_split_many(
+            self,
+            ranges: list[DataRange],
+            *,
+            macro_basis: Literal["kcal", "grams"] = "kcal",
+            round_to: int = 1,
+            tz_name: str = "UTC",
+    ) -> list[StatsResult]:
+        """
+        daily_calories_and_macro_split for several ranges, in order, with a single query:
+        the series of the range covering them all is loaded once and sliced per range.
+        """
+        if not ranges:
+            return []
+        for dr in ranges:
+            if dr.end.date() < dr.start.date():
+                raise ValidationError("DataRange.end must be >= start")
+        covering = DataRange(start=min(dr.start for dr in ranges), end=max(dr.end for dr in ranges))
+        series = self.daily_series(covering, tz_name=tz_name)
+        return [
+            self._split(series.between(dr.start.date(), dr.end.date()), macro_basis=macro_basis, round_to=round_to)
+            for dr in ranges
+        ]
+
+    def _split(self, series: DailySeries, *, macro_basis: Literal["kcal", "grams"], round_to: int) -> StatsResult:
+        days = [
+            DayCalories(day=d, calories=round(kcal, round_to))
+            for d, kcal in zip(series.days.tolist(), series.kcal.tolist())
+        ]
+        macro_pct = self._percentages_from_totals(series.totals(), basis=macro_basis, round_to=round_to)
+        return StatsResult(days=days, macro_pct=macro_pct, basis=macro_basis)
+
+    def daily_series(self, dr: DataRange, *, tz_name: str = "UTC") -> DailySeries:
+        """Zero-filled per-day kcal / macro arrays over dr's dates (local days in `tz_name`)."""
         start_date = dr.start.date()
         end_date = dr.end.date()
 
@@ -49,32 +114,82 @@ class StatsService:
             # we double-check here:)
             raise ValidationError("DataRange.end must be >= start")
 
-        rows = self.repo.daily_aggregate(start_date, end_date)
-        by_day = {date.fromisoformat(r["day"]): r for r in rows}
-
-        totals = MacroTotals.zero()
-
-        days: list[DayCalories] = []
-        cursor = start_date
-        while cursor <= end_date:
-            r = by_day.get(cursor)
-            kcal = float(r["kcal"] if r else 0.0)
-            prot_g = float(r["protein_g"] if r else 0.0)
-            carb_g = float(r["carbs_g"] if r else 0.0)
-            fat_g = float(r["fat_g"] if r else 0.0)
-
-            totals = MacroTotals(
-                proteins = totals.proteins + prot_g,
-                fats     = totals.fats      + fat_g,
-                carbs    = totals.carbs     + carb_g,
-                kcal     = totals.kcal      + kcal,
+        try:
+            tz = ZoneInfo(tz_name)
+        except Exception:
+            raise ValidationError(f"Invalid timezone: {tz_name}")
+
+        rows = self.repo.daily_aggregate(start_date, end_date, tz)
+        return load_daily(rows, start_date, end_date)
+
+    def trend(
+            self,
+            dr: DataRange,
+            *,
+            windows: tuple[int, ...] = (7, 14, 30),
+            tz_name: str = "UTC",
+            round_to: int = 1,
+    ) -> TrendResult:
+        """
+        Moving averages and a linear slope per metric, from one zero-filled daily series.
+        The series starts max(windows) - 1 days early, so even the first day's averages
+        cover a full window; each average is one cumulative-sum pass over the series.
+        """
+        if not windows or any(w < 1 or w > MAX_TREND_WINDOW for w in windows):
+            raise ValidationError(f"windows must be between 1 and {MAX_TREND_WINDOW} days")
+        warmup = max(windows) - 1
+        extended = DataRange(start=dr.start - timedelta(days=warmup), end=dr.end)
+        series = self.daily_series(extended, tz_name=tz_name)
+
+        metrics: dict[str, MetricTrend] = {}
+        for name in MACROS:
+            values = series.column(name)
+            shown = values[warmup:]
+            metrics[name] = MetricTrend(
+                daily=np.round(shown, round_to).tolist(),
+                moving_averages={
+                    w: np.round(rolling_mean(values, w)[warmup:], round_to).tolist() for w in windows
+                },
+                slope_per_day=round(linear_slope(shown), round_to + 2),
             )
+        return TrendResult(days=series.days[warmup:].tolist(), windows=tuple(windows), metrics=metrics)
 
-            days.append(DayCalories(day=cursor, calories=round(kcal, round_to)))
-            cursor = cursor + timedelta(days=1)
+    def totals_for_range(self, dr: DataRange) -> PeriodTotals:
+        """Macro totals over the UTC days of dr, read from the coarsest rollup buckets that fit."""
+        return self.period_series(dr, "year").total
 
-        macro_pct = self._percentages_from_totals(totals, basis=macro_basis, round_to=round_to)
-        return StatsResult(days=days, macro_pct=macro_pct, basis=macro_basis)
+    def period_series(self, dr: DataRange, level: Level) -> PeriodSeries:
+        """
+        Totals per day / ISO week / month / year over the UTC days of dr; the first and last
+        periods are clipped to the range. Every period is answered from the rollups through
+        plan_range, so partial edges cost a few daily rows and whole periods one row each.
+        """
+        start_date, end_date = dr.start.date(), dr.end.date()
+        if end_date < start_date:
+            raise ValidationError("DataRange.end must be >= start")
+
+        periods = periods_between(level, start_date, end_date)
+        plans = [plan_range(p.start, p.end) for p in periods]
+        stored = self.rollups.fetch({b for plan in plans for b in plan})
+
+        series = [self._sum_buckets(p, plan, stored) for p, plan in zip(periods, plans)]
+        total = PeriodTotals(
+            start=start_date,
+            end=end_date,
+            meal_count=sum(p.meal_count for p in series),
+            totals=sum((p.totals for p in series), MacroTotals.zero()),
+        )
+        return PeriodSeries(level=level, periods=series, total=total)
+
+    @staticmethod
+    def _sum_buckets(period: Bucket, plan: list[Bucket], stored: dict[Bucket, PeriodTotals]) -> PeriodTotals:
+        meal_count, totals = 0, MacroTotals.zero()
+        for b in plan:
+            hit = stored.get(b)
+            if hit is not None:
+                meal_count += hit.meal_count
+                totals = totals + hit.totals
+        return PeriodTotals(start=period.start, end=period.end, meal_count=meal_count, totals=totals)
 
     @staticmethod
     def _percentages_from_totals(
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+from operator import itemgetter
+from typing import Sequence
+
+import numpy as np
+
+from src.domain.domain import MacroTotals
+from src.infrastructure.repositories.stats_repo import DayAggRow
+
+MACROS = ("kcal", "protein_g", "carbs_g", "fat_g")
+
+
+@dataclass(frozen=True)
+class DailySeries:
+    """
+    Zero-filled per-day aggregates for [start, end] as parallel float64 arrays;
+    index i is day start + i.
+    """
+    start: date
+    end: date
+    kcal: np.ndarray
+    protein_g: np.ndarray
+    carbs_g: np.ndarray
+    fat_g: np.ndarray
+
+    @property
+    def days(self) -> np.ndarray:
+        return np.arange(np.datetime64(self.start, "D"), np.datetime64(self.end, "D") + 1)
+
+    def __len__(self) -> int:
+        return len(self.kcal)
+
+    def column(self, name: str) -> np.ndarray:
+        return getattr(self, name)
+
+    def between(self, start: date, end: date) -> DailySeries:
+        """The sub-series for [start, end], which must lie inside this one; arrays are views."""
+        lo, hi = (start - self.start).days, (end - self.start).days + 1
+        if lo < 0 or hi > len(self) or lo >= hi:
+            raise ValueError(f"{start}..{end} is not inside {self.start}..{self.end}")
+        return DailySeries(start, end, *(self.column(m)[lo:hi] for m in MACROS))
+
+    def totals(self) -> MacroTotals:
+        return MacroTotals(
+            proteins = float(self.protein_g.sum()),
+            fats     = float(self.fat_g.sum()),
+            carbs    = float(self.carbs_g.sum()),
+            kcal     = float(self.kcal.sum()),
+        )
+
+
+def load_daily(rows: Sequence[DayAggRow], start: date, end: date) -> DailySeries:
+    """Scatter the sparse repo rows into dense arrays; missing days stay 0."""
+    n = (end - start).days + 1
+    if not rows:
+        return DailySeries(start, end, *np.zeros((len(MACROS), n)))
+
+    days = np.array([r["day"] for r in rows], dtype = "datetime64[D]")
+    idx = (days - np.datetime64(start, "D")).astype(np.int64)
+    values = np.array(list(map(itemgetter(*MACROS), rows)), dtype = np.float64)
+    keep = (idx >= 0) & (idx < n)
+    idx, values = idx[keep], values[keep]
+    # bincount sums weights per index: zero-fills the gaps and tolerates repeated days
+    dense = [np.bincount(idx, weights = values[:, i], minlength = n) for i in range(len(MACROS))]
+    return DailySeries(start, end, *dense)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing moving average via a cumulative sum: out[i] = mean(values[i-window+1 : i+1]).
+    The first window-1 days average over the days available so far.
+    """
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    i = np.arange(1, len(values) + 1)
+    lo = np.maximum(i - window, 0)
+    return (csum[i] - csum[lo]) / (i - lo)
+
+
+def day_over_day(values: np.ndarray) -> np.ndarray:
+    """values[i] - values[i-1]; the first day has no predecessor and gets 0."""
+    return np.diff(values, prepend = values[:1])
+
+
+def linear_slope(values: np.ndarray) -> float:
+    """Least-squares slope of values against day index (units per day); 0 for fewer than 2 days."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    x = np.arange(n, dtype = np.float64) - (n - 1) / 2.0   # centred, so the intercept drops out
+    return float(x @ (values - values.mean()) / (x @ x))
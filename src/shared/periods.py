@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Literal
+
+Level = Literal["day", "week", "month", "year"]
+
+# levels kept in period_nutrition_rollup, coarsest first; days live in daily_nutrition_rollup
+PERIOD_LEVELS: tuple[Level, ...] = ("year", "month", "week")
+
+
+@dataclass(frozen = True)
+class Bucket:
+    level: Level
+    start: date
+    end: date       # inclusive
+
+
+def period_start(level: Level, d: date) -> date:
+    """First day of the `level` period containing d (weeks are ISO weeks, starting Monday)."""
+    if level == "day":
+        return d
+    if level == "week":
+        return d - timedelta(days = d.weekday())
+    if level == "month":
+        return d.replace(day = 1)
+    if level == "year":
+        return d.replace(month = 1, day = 1)
+    raise ValueError(f"Unknown level: {level}")
+
+
+def period_end(level: Level, d: date) -> date:
+    """Last day of the `level` period containing d."""
+    start = period_start(level, d)
+    if level == "day":
+        return start
+    if level == "week":
+        return start + timedelta(days = 6)
+    if level == "month":
+        following = start.replace(year = start.year + 1, month = 1) if start.month == 12 else start.replace(month = start.month + 1)
+        return following - timedelta(days = 1)
+    return start.replace(month = 12, day = 31)
+
+
+def periods_between(level: Level, start: date, end: date) -> list[Bucket]:
+    """The `level` periods overlapping [start, end], clipped to it."""
+    out: list[Bucket] = []
+    cursor = start
+    while cursor <= end:
+        last = min(period_end(level, cursor), end)
+        out.append(Bucket(level, cursor, last))
+        cursor = last + timedelta(days = 1)
+    return out
+
+
+def plan_range(start: date, end: date) -> list[Bucket]:
+    """
+    Cover [start, end] with as few stored buckets as possible, like a segment tree over time:
+    whole years and months where they fit, whole ISO weeks inside the remaining partial
+    months, single days at the ragged edges. A multi-year range costs a few dozen buckets.
+    """
+    plan: list[Bucket] = []
+    cursor = start
+    while cursor <= end:
+        bucket = None
+        for level in ("year", "month"):
+            if cursor == period_start(level, cursor) and period_end(level, cursor) <= end:
+                bucket = Bucket(level, cursor, period_end(level, cursor))
+                break
+        if bucket is None:
+            # weeks never cross a month boundary here, so month alignment can resume after it
+            limit = min(end, period_end("month", cursor))
+            if cursor.weekday() == 0 and cursor + timedelta(days = 6) <= limit:
+                bucket = Bucket("week", cursor, cursor + timedelta(days = 6))
+            else:
+                bucket = Bucket("day", cursor, cursor)
+        plan.append(bucket)
+        cursor = bucket.end + timedelta(days = 1)
+    return plan
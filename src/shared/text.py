@@ -0,0 +1,24 @@
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form used by the search indexes:
+    lower-case, accents stripped, punctuation collapsed to single spaces.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    ascii_only = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", ascii_only).strip()
+
+def trigrams(name: str) -> set[str]:
+    """
+    pg_trgm-style trigram set: every word is padded with two leading
+    and one trailing space, so short words and word starts still produce trigrams.
+    """
+    grams: set[str] = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
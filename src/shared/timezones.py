@@ -0,0 +1,38 @@
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+
+
+def local_day_bounds(start_date: date, end_date: date, tz: tzinfo) -> tuple[datetime, datetime]:
+    """UTC instants of local midnight on start_date and on the day after end_date: [start, end)."""
+    start = datetime.combine(start_date, time.min, tzinfo = tz).astimezone(timezone.utc)
+    end = datetime.combine(end_date + timedelta(days = 1), time.min, tzinfo = tz).astimezone(timezone.utc)
+    return start, end
+
+
+def utc_offset_segments(tz: tzinfo, start: datetime, end: datetime) -> list[tuple[datetime, timedelta]]:
+    """
+    Split the UTC interval [start, end) into runs with a constant UTC offset in `tz`.
+    Returns (segment start, offset) pairs; each segment ends where the next one starts.
+    Offsets are sampled once a day and transitions located by bisection, so a year costs
+    a few hundred utcoffset() calls however many DST switches it has.
+    """
+    offset_at = lambda instant: instant.astimezone(tz).utcoffset()
+
+    segments = [(start, offset_at(start))]
+    probe = start
+    while probe < end:
+        nxt = min(probe + timedelta(days = 1), end)
+        current = segments[-1][1]
+        if offset_at(nxt) != current:
+            # the offset switched somewhere in (probe, nxt]: find the first second with the new one
+            lo, hi = 0, int((nxt - probe).total_seconds())
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if offset_at(probe + timedelta(seconds = mid)) == current:
+                    lo = mid
+                else:
+                    hi = mid
+            switch = probe + timedelta(seconds = hi)
+            segments.append((switch, offset_at(switch)))
+        probe = nxt
+    # an offset switching right at `end` belongs to the next interval
+    return [seg for seg in segments if seg[0] < end] or segments[:1]
@@ -0,0 +1,48 @@
+# Usage:
+#   python -m src.tests.bench_stats_engine [years]
+#
+# Compares the NumPy stats engine with the per-day Python loop it replaced
+# (kept in src/tests/helpers.py as the reference) on synthetic daily rows. Not collected by pytest.
+
+import sys
+import timeit
+from datetime import date, timedelta
+
+from src.services.stats import DayCalories, StatsService
+from src.services.stats_engine import load_daily
+from src.tests.helpers import loop_split, make_rows
+
+
+def engine_split(rows, start_date: date, end_date: date, basis="kcal", round_to=1):
+    """What StatsService does now after the query."""
+    series = load_daily(rows, start_date, end_date)
+    days = [
+        DayCalories(day=d, calories=round(kcal, round_to))
+        for d, kcal in zip(series.days.tolist(), series.kcal.tolist())
+    ]
+    return days, StatsService._percentages_from_totals(series.totals(), basis=basis, round_to=round_to)
+
+
+def engine_totals_only(rows, start_date: date, end_date: date):
+    """Engine without materializing per-day objects (totals, rolling windows, deltas)."""
+    series = load_daily(rows, start_date, end_date)
+    return series.totals()
+
+
+def main(years: int = 10) -> None:
+    end = date(2025, 12, 31)
+    start = end - timedelta(days=365 * years)
+    rows = make_rows(start, end)
+    print(f"{years} years: {(end - start).days + 1} days, {len(rows)} rows with data")
+
+    for name, fn in [
+        ("python loop", lambda: loop_split(rows, start, end)),
+        ("numpy engine", lambda: engine_split(rows, start, end)),
+        ("numpy totals only", lambda: engine_totals_only(rows, start, end)),
+    ]:
+        runs, total = timeit.Timer(fn).autorange()
+        print(f"  {name:<18} {total / runs * 1000:8.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -8,6 +8,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker 
 
 from src.data.database_models import Base, IngredientModel
+from src.infrastructure.autocomplete import ingredient_name_index
+from src.infrastructure.repositories.ingredient_repo import ingredient_cache
 
 @pytest.fixture
 def session(tmp_path, request):
@@ -20,6 +22,10 @@ def session(tmp_path, request):
 
     SessionLocal = sessionmaker(bind = engine, future = True)
 
+    # process-wide indexes must not leak rows between per-test databases
+    ingredient_name_index.invalidate()
+    ingredient_cache.clear()
+
     with SessionLocal() as s:
         yield s 
 
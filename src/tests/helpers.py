@@ -0,0 +1,100 @@
+"""Plain helpers shared by several test modules (fixtures live in conftest.py)."""
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from src.data.database_models import IngredientModel
+from src.domain import Ingredient, Meal, MealEntry
+from src.domain.domain import MacroTotals
+from src.services.stats import DayCalories, StatsService
+
+
+@contextmanager
+def count_queries(session):
+    """Collect the SQL statements `session`'s engine sends while the block runs."""
+    statements: list[str] = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def to_domain_ingredient(im: IngredientModel) -> Ingredient:
+    # Convert DB row -> domain Ingredient (enum conversion included)
+    return Ingredient(
+        id=im.id,
+        name=im.name,
+        fats_per_100g=im.fats_per_100g,
+        proteins_per_100g=im.proteins_per_100g,
+        carbs_per_100g=im.carbs_per_100g,
+        kcal_per_100g=im.kcal_per_100g,
+    )
+
+
+def make_meal(
+    name: str = "Test Meal",
+    eaten_at: datetime | None = None,
+    entries: list[MealEntry] | None = None,
+    is_favorite: bool = False,
+) -> Meal:
+    if eaten_at is None:
+        eaten_at = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)  # tz-aware (domain requires)
+    if entries is None:
+        # placeholder entry; tests usually override with seeded ingredients
+        fake_ing = Ingredient(
+            id=1, name="X", fats_per_100g=0, proteins_per_100g=0,
+            carbs_per_100g=0, kcal_per_100g=0
+        )
+        entries = [MealEntry(ingredient=fake_ing, quantity_g=100)]
+    return Meal(
+        id=None,
+        name=name,
+        eaten_at=eaten_at,
+        is_favorite=is_favorite,
+        entries=entries,
+    )
+
+
+def make_rows(start: date, end: date, fill: float = 0.8, seed: int = 7) -> list[dict]:
+    """Sparse repo-shaped rows: about `fill` of the days have meals."""
+    rnd = random.Random(seed)
+    rows, cursor = [], start
+    while cursor <= end:
+        if rnd.random() < fill:
+            rows.append({
+                "day": cursor.isoformat(),
+                "kcal": rnd.uniform(1200, 3200),
+                "protein_g": rnd.uniform(40, 180),
+                "carbs_g": rnd.uniform(100, 400),
+                "fat_g": rnd.uniform(30, 140),
+            })
+        cursor += timedelta(days=1)
+    return rows
+
+
+def loop_split(rows, start_date: date, end_date: date, basis="kcal", round_to=1):
+    """The original StatsService.daily_calories_and_macro_split body after the query."""
+    by_day = {date.fromisoformat(r["day"]): r for r in rows}
+    totals = MacroTotals.zero()
+    days: list[DayCalories] = []
+    cursor = start_date
+    while cursor <= end_date:
+        r = by_day.get(cursor)
+        kcal = float(r["kcal"] if r else 0.0)
+        prot_g = float(r["protein_g"] if r else 0.0)
+        carb_g = float(r["carbs_g"] if r else 0.0)
+        fat_g = float(r["fat_g"] if r else 0.0)
+        totals = MacroTotals(
+            proteins = totals.proteins + prot_g,
+            fats     = totals.fats      + fat_g,
+            carbs    = totals.carbs     + carb_g,
+            kcal     = totals.kcal      + kcal,
+        )
+        days.append(DayCalories(day=cursor, calories=round(kcal, round_to)))
+        cursor = cursor + timedelta(days=1)
+    return days, StatsService._percentages_from_totals(totals, basis=basis, round_to=round_to)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from src.api.app import app
+from src.infrastructure import db
+from src.infrastructure.autocomplete import ingredient_name_index
+from src.infrastructure.db import DatabaseSettings, make_async_engine
+from src.infrastructure.repositories.async_repos import AsyncIngredientRepo, _AsyncRepo
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+
+
+@pytest.fixture
+def async_sessions(session):
+    """AsyncSession factory on the same database file as `session`."""
+    engine = make_async_engine(DatabaseSettings(url = session.get_bind().url.render_as_string(hide_password = False)))
+    yield async_sessionmaker(bind = engine, expire_on_commit = False)
+    asyncio.run(engine.dispose())
+
+
+def run_async(async_sessions, fn):
+    async def main():
+        async with async_sessions() as s:
+            return await fn(s)
+    return asyncio.run(main())
+
+
+def test_async_ingredient_search_matches_the_sync_repo(session, seed_ingredients, async_sessions):
+    async def scenario(s):
+        repo = AsyncIngredientRepo(s)
+        return await repo.find_by_name("an"), await repo.find_similar("bananna")
+
+    by_name, similar = run_async(async_sessions, scenario)
+    assert by_name == IngredientRepo(session).find_by_name("an")
+    assert similar == IngredientRepo(session).find_similar("bananna")
+    assert {i.name for i in by_name} == {"Banana", "Mango"}
+
+
+def test_async_repo_needs_a_sync_repo():
+    with pytest.raises(TypeError):
+        _AsyncRepo(None)
+
+
+def test_search_and_cold_autocomplete_routes_run_side_by_side(session, seed_ingredients, async_sessions):
+    """The autocomplete index builds under a threading lock: it must not run on the event loop."""
+    ReadSessionLocal = sessionmaker(bind = session.get_bind(), autoflush = False)
+
+    def read_db():
+        with ReadSessionLocal() as s:
+            yield s
+
+    async def async_read_db():
+        async with async_sessions() as s:
+            yield s
+
+    ingredient_name_index.invalidate()
+    app.dependency_overrides[db.get_read_db] = read_db
+    app.dependency_overrides[db.get_async_read_db] = async_read_db
+    results: list[tuple[str, int, list[str]]] = []
+    try:
+        with TestClient(app) as client:    # one event loop for every request, as under uvicorn
+            def call(path):
+                resp = client.get(path, params = {"q": "ban"})
+                results.append((path, resp.status_code, [i["name"] for i in resp.json()]))
+
+            threads = [
+                threading.Thread(target = call, args = (path,))
+                for _ in range(4) for path in ("/ingredients/autocomplete", "/ingredients/search")
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout = 30)
+            assert not any(t.is_alive() for t in threads)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert sorted(results) == [("/ingredients/autocomplete", 200, ["Banana"])] * 4 + [("/ingredients/search", 200, ["Banana"])] * 4
@@ -0,0 +1,86 @@
+from src.infrastructure.autocomplete import IngredientNameIndex
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+from src.domain.domain import Ingredient
+
+
+def _names(suggestions):
+    return [s.name for s in suggestions]
+
+def test_prefix_of_any_word(session, seed_ingredients):
+    index = IngredientNameIndex()
+    assert _names(index.search(session, "bre")) == ["Chicken Breast"]
+    assert _names(index.search(session, "MIL")) == ["almond milk"]
+    assert index.search(session, "zzz") == []
+
+def test_name_prefix_and_shorter_names_rank_first(session):
+    repo = IngredientRepo(session)
+    for name in ["Eggplant parmesan", "Scrambled egg", "Egg", "Egg noodles"]:
+        repo.create(Ingredient(name=name, kcal_per_100g=1, carbs_per_100g=1, proteins_per_100g=1, fats_per_100g=1))
+
+    index = IngredientNameIndex()
+    assert _names(index.search(session, "egg")) == ["Egg", "Egg noodles", "Eggplant parmesan", "Scrambled egg"]
+    assert _names(index.search(session, "egg", limit=2)) == ["Egg", "Egg noodles"]
+
+def test_multiple_terms_must_all_match(session, seed_ingredients):
+    index = IngredientNameIndex()
+    assert _names(index.search(session, "chick brea")) == ["Chicken Breast"]
+    assert index.search(session, "chick milk") == []
+
+def test_matches_past_a_long_run_of_same_prefix_keys(session):
+    repo = IngredientRepo(session)
+    for i in range(600):
+        repo.create(Ingredient(name=f"Chia {i:03}", kcal_per_100g=1, carbs_per_100g=1, proteins_per_100g=1, fats_per_100g=1))
+    repo.create(Ingredient(name="Chives with bread", kcal_per_100g=1, carbs_per_100g=1, proteins_per_100g=1, fats_per_100g=1))
+
+    index = IngredientNameIndex()
+    # every "chi" key sorts before "chives"; the match still has to be found
+    assert _names(index.search(session, "chi bre")) == ["Chives with bread"]
+    assert _names(index.search(session, "chi wit")) == ["Chives with bread"]
+    assert len(index.search(session, "chi", limit=1000)) == 601
+    assert _names(index.search(session, "chi", limit=2)) == ["Chia 000", "Chia 001"]
+
+def test_top_k_matches_a_full_sort(session):
+    repo = IngredientRepo(session)
+    names = [f"{w} pot {n}" for n, w in enumerate(["Sweet", "Potato", "Pot roast", "Spotted dick", "Hot pot"] * 30)]
+    for name in names:
+        repo.create(Ingredient(name=name, kcal_per_100g=1, carbs_per_100g=1, proteins_per_100g=1, fats_per_100g=1))
+
+    index = IngredientNameIndex()
+    everything = _names(index.search(session, "pot", limit=1000))
+    assert len(everything) == len(set(everything)) == 150     # "Hot pot pot 4" listed once
+    for limit in (1, 3, 7, 50):
+        assert _names(index.search(session, "pot", limit=limit)) == everything[:limit]
+
+def test_lookup_does_not_query_until_invalidated(session, seed_ingredients):
+    index = IngredientNameIndex()
+    index.search(session, "app")
+
+    # rename behind the index's back (no repo call, so no invalidate())
+    row = seed_ingredients[0]["Apple"]
+    row.name = "Apricot"
+    session.commit()
+    # built snapshot is served as-is ...
+    assert _names(index.search(session, "apr")) == []
+
+    # ... until a writer bumps the generation
+    index.invalidate()
+    assert _names(index.search(session, "apr")) == ["Apricot"]
+
+def test_repo_writes_are_visible_without_rebuild(session, seed_ingredients, monkeypatch):
+    from src.infrastructure import autocomplete
+    index = autocomplete.ingredient_name_index
+    index.search(session, "app")  # build the snapshot
+
+    builds = []
+    monkeypatch.setattr(IngredientNameIndex, "_build", staticmethod(lambda s: builds.append(s)))
+
+    repo = IngredientRepo(session)
+    created = repo.create(Ingredient(name="Apple pie", kcal_per_100g=1, carbs_per_100g=1, proteins_per_100g=1, fats_per_100g=1))
+    assert _names(index.search(session, "app")) == ["Apple", "Apple pie"]
+
+    repo.update(created.id, name="Cherry pie")
+    assert _names(index.search(session, "pie")) == ["Cherry pie"]
+
+    repo.delete(seed_ingredients[0]["Apple"].id)
+    assert _names(index.search(session, "app")) == []
+    assert builds == []
@@ -0,0 +1,58 @@
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo, ingredient_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"      # 2 is now the oldest
+    cache.put(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get_many([1, 3]) == {1: "a", 3: "c"}
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (3, 1, 2)
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LRUCache(maxsize=10, ttl=5, clock=clock)
+    cache.put("k", 1)
+    clock.now = 5
+    assert cache.get("k") == 1
+    clock.now = 5.1
+    assert cache.get("k") is None
+    assert cache.stats().size == 0
+
+def test_repo_serves_repeated_lookups_from_cache(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    repo = IngredientRepo(session)
+    apple, banana = by_name["Apple"].id, by_name["Banana"].id
+
+    repo.get_many([apple, banana])
+    before = ingredient_cache.stats()
+    assert repo.get_by_id(apple).name == "Apple"
+    assert set(repo.get_many([apple, banana])) == {apple, banana}
+    after = ingredient_cache.stats()
+    assert after.hits - before.hits == 3
+    assert after.misses == before.misses
+
+def test_repo_update_and_delete_invalidate(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    repo = IngredientRepo(session)
+    apple = by_name["Apple"].id
+
+    repo.get_by_id(apple)
+    repo.update(apple, kcal_per_100g=52.0)
+    assert repo.get_by_id(apple).kcal_per_100g == 52.0
+
+    repo.delete(apple)
+    assert repo.get_many([apple]) == {}
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.data.database_models import (
+    ChangeLogModel, DailyNutritionRollupModel, IngredientModel, IngredientTrigramModel, MealModel,
+)
+from src.domain import Ingredient, Meal, MealEntry
+from src.infrastructure.catalogue_sync import sync_catalogue
+from src.infrastructure.daparser import parse_rows
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+from src.infrastructure.repositories.meal_repo import MealRepo
+
+
+def _source(*rows):
+    """One parsed chunk, as daparser.parsed_chunks yields it with source keys."""
+    keys = [key for key, _, _ in rows]
+    names = [name for _, name, _ in rows]
+    blobs = [
+        '{"calories": %s, "carbohydrates": 10, "total_fat": 1, "protein": 2}' % kcal for _, _, kcal in rows
+    ]
+    return [(*parse_rows(names, blobs, keys), 0)]
+
+
+def _by_source(session) -> dict[str, IngredientModel]:
+    session.expire_all()
+    rows = session.execute(select(IngredientModel).where(IngredientModel.source_id.is_not(None))).scalars()
+    return {r.source_id: r for r in rows}
+
+
+def _postings(session, ingredient_id: int) -> int:
+    return len(session.execute(
+        select(IngredientTrigramModel).where(IngredientTrigramModel.ingredient_id == ingredient_id)
+    ).all())
+
+
+def test_sync_inserts_updates_and_tombstones_in_place(session):
+    mine = IngredientRepo(session).create(Ingredient(
+        name="Grandma's jam", kcal_per_100g=250, carbs_per_100g=60, fats_per_100g=0, proteins_per_100g=0,
+    ))
+
+    report = sync_catalogue(session, _source(("a", "Apple", 50), ("b", "Bread", 250), ("c", "Cheese", 400)))
+    assert (report.inserted, report.updated, report.removed) == (3, 0, 0)
+    first = _by_source(session)
+    assert _postings(session, first["a"].id) > 0
+
+    apple = IngredientRepo(session).get_by_id(first["a"].id)
+    meal = MealRepo(session).create(Meal(
+        name="snack", eaten_at=datetime(2025, 1, 1, 12, tzinfo=timezone.utc),
+        entries=[MealEntry(ingredient=apple, quantity_g=200)],
+    ))
+
+    # apple's kcal changed, bread unchanged, cheese gone, dates new; a repeated key is ignored
+    report = sync_catalogue(session, _source(("a", "Apple", 60), ("b", "Bread", 250), ("d", "Dates", 280), ("d", "Dupe", 1)))
+    assert (report.inserted, report.updated, report.unchanged, report.removed, report.duplicates) == (1, 1, 1, 1, 1)
+
+    second = _by_source(session)
+    assert {k: r.id for k, r in second.items() if k != "d"} == {k: r.id for k, r in first.items()}   # ids kept
+    assert second["a"].kcal_per_100g == 60
+    assert second["c"].removed_at is not None
+    assert second["d"].name == "Dates"
+
+    # the meal and its day follow the new macros
+    assert session.get(MealModel, meal.id).total_kcal == pytest.approx(120)
+    assert session.execute(select(DailyNutritionRollupModel.kcal)).scalar_one() == pytest.approx(120)
+
+    # removed: still resolvable for history, gone from search
+    repo = IngredientRepo(session)
+    assert repo.get_by_id(second["c"].id).name == "Cheese"
+    assert repo.find_by_name("cheese") == []
+    assert repo.find_similar("chese") == []
+    assert session.get(IngredientModel, mine.id).removed_at is None   # created in the app: never synced
+
+    ops = session.execute(
+        select(ChangeLogModel.entity_id, ChangeLogModel.op).where(ChangeLogModel.entity_id == second["c"].id)
+    ).all()
+    assert ops[-1] == (second["c"].id, "delete")
+
+    # back in the catalogue: revived under the same id, searchable again
+    report = sync_catalogue(session, _source(("a", "Apple", 60), ("b", "Bread", 250), ("c", "Cheese", 400), ("d", "Dates", 280)))
+    assert (report.updated, report.unchanged, report.removed) == (1, 3, 0)
+    third = _by_source(session)
+    assert third["c"].id == first["c"].id and third["c"].removed_at is None
+    assert [i.id for i in IngredientRepo(session).find_by_name("cheese")] == [first["c"].id]
+    assert _postings(session, first["c"].id) > 0
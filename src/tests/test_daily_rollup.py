@@ -0,0 +1,310 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import func, select
+
+from src.data.database_models import DailyNutritionRollupModel, MealModel, PeriodNutritionRollupModel
+from src.domain import Ingredient, Meal, MealEntry
+from src.domain.domain import DataRange
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+from src.infrastructure.repositories.meal_repo import MealRepo
+from src.infrastructure.repositories.rollup_repo import NutritionRollupRepo
+from src.infrastructure.repositories.stats_repo import StatsRepo
+from src.shared.periods import period_end, period_start, plan_range
+from src.shared.timezones import local_day_bounds, utc_offset_segments
+from src.tests.helpers import count_queries
+from src.services.stats import StatsService
+
+
+def _ingredient(model) -> Ingredient:
+    return Ingredient(
+        id=model.id, name=model.name,
+        fats_per_100g=model.fats_per_100g, proteins_per_100g=model.proteins_per_100g,
+        carbs_per_100g=model.carbs_per_100g, kcal_per_100g=model.kcal_per_100g,
+    )
+
+
+def _meal(when: datetime, *entries: tuple[Ingredient, float]) -> Meal:
+    return Meal(name="m", eaten_at=when, entries=[MealEntry(ingredient=i, quantity_g=g) for i, g in entries])
+
+
+def _rollup(session) -> dict[str, tuple[int, float]]:
+    session.expire_all()
+    rows = session.execute(select(DailyNutritionRollupModel).where(DailyNutritionRollupModel.meal_count > 0))
+    return {r.day.isoformat(): (r.meal_count, pytest.approx(r.kcal)) for r in rows.scalars()}
+
+
+def _grouped(session) -> dict[str, tuple[int, float]]:
+    day = func.date(MealModel.eaten_at)
+    rows = session.execute(select(day, func.count(), func.sum(MealModel.total_kcal)).group_by(day))
+    return {d: (n, kcal) for d, n, kcal in rows}
+
+
+def test_rollup_follows_meal_writes(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple, banana = _ingredient(by_name["Apple"]), _ingredient(by_name["Banana"])
+    repo = MealRepo(session)
+    jan1 = datetime(2025, 1, 1, 8, tzinfo=timezone.utc)
+    jan2 = datetime(2025, 1, 2, 8, tzinfo=timezone.utc)
+
+    first = repo.create(_meal(jan1, (apple, 100)))
+    second = repo.create(_meal(jan1, (banana, 50)))
+    assert _rollup(session) == {"2025-01-01": (2, 180.0)}
+
+    # moving a meal to another day moves its totals with it
+    repo.update(second.id, _meal(jan2, (banana, 100)))
+    assert _rollup(session) == {"2025-01-01": (1, 100.0), "2025-01-02": (1, 160.0)}
+
+    entry = repo.get_by_id(first.id).entries[0]
+    repo.update_entry_quantity(meal_id=first.id, entry_id=entry.id, grams=200)
+    repo.update_entry_ingredient(meal_id=first.id, entry_id=entry.id, ingredient_id=banana.id)
+    assert _rollup(session) == {"2025-01-01": (1, 320.0), "2025-01-02": (1, 160.0)}
+
+    repo.delete_entry(meal_id=first.id, entry_id=entry.id)
+    assert _rollup(session) == {"2025-01-01": (1, 0.0), "2025-01-02": (1, 160.0)}
+
+    repo.delete(first.id)
+    assert _rollup(session) == {"2025-01-02": (1, 160.0)}
+    assert _rollup(session) == _grouped(session)
+
+
+def test_rollup_follows_ingredient_macro_change(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])
+    MealRepo(session).create(_meal(datetime(2025, 1, 1, 8, tzinfo=timezone.utc), (apple, 100)))
+
+    IngredientRepo(session).update(apple.id, kcal_per_100g=40.0)
+
+    assert _rollup(session) == {"2025-01-01": (1, 40.0)}
+
+
+def test_rebuild_matches_incremental_upkeep(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple, banana = _ingredient(by_name["Apple"]), _ingredient(by_name["Banana"])
+    repo = MealRepo(session)
+    for day in (1, 1, 3, 7):
+        repo.create(_meal(datetime(2025, 1, day, 12, tzinfo=timezone.utc), (apple, 100), (banana, 25)))
+    incremental = _rollup(session)
+
+    session.query(DailyNutritionRollupModel).delete()
+    session.commit()
+    assert NutritionRollupRepo(session).rebuild() == 3
+    assert _rollup(session) == incremental
+
+    # a partial rebuild only rewrites its own days
+    session.query(DailyNutritionRollupModel).filter_by(day=date(2025, 1, 7)).update({"kcal": 0.0})
+    session.commit()
+    assert NutritionRollupRepo(session).rebuild(date(2025, 1, 2), date(2025, 1, 7)) == 2
+    assert _rollup(session) == incremental
+
+
+def test_stats_service_reads_the_rollup(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])
+    MealRepo(session).create(_meal(datetime(2025, 1, 2, 23, 30, tzinfo=timezone.utc), (apple, 150)))
+    # rows written behind the repo's back are invisible until a rebuild
+    session.add(MealModel(name="raw", eaten_at=datetime(2025, 1, 1, 9), total_kcal=999.0))
+    session.commit()
+
+    dr = DataRange(
+        start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        end=datetime(2025, 1, 3, 23, 59, tzinfo=timezone.utc),
+    )
+    result = StatsService(session).daily_calories_and_macro_split(dr)
+    assert [(d.day.day, d.calories) for d in result.days] == [(1, 0.0), (2, 150.0), (3, 0.0)]
+
+    NutritionRollupRepo(session).rebuild()
+    result = StatsService(session).daily_calories_and_macro_split(dr)
+    assert [d.calories for d in result.days] == [999.0, 150.0, 0.0]
+
+
+def test_batch_split_reads_once_and_matches_single_ranges(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])
+    repo = MealRepo(session)
+    for day, grams in [(3, 100), (9, 250), (12, 80), (27, 40)]:
+        repo.create(_meal(datetime(2025, 2, day, 12, tzinfo=timezone.utc), (apple, grams)))
+
+    def utc_range(first: date, last: date) -> DataRange:
+        return DataRange(
+            start=datetime.combine(first, datetime.min.time(), tzinfo=timezone.utc),
+            end=datetime.combine(last, datetime.max.time(), tzinfo=timezone.utc),
+        )
+
+    ranges = [
+        utc_range(date(2025, 2, 10), date(2025, 2, 16)),   # this week
+        utc_range(date(2025, 2, 3), date(2025, 2, 9)),     # last week
+        utc_range(date(2025, 2, 1), date(2025, 2, 28)),    # this month
+        utc_range(date(2025, 1, 1), date(2025, 1, 31)),    # last month
+    ]
+    svc = StatsService(session)
+    with count_queries(session) as queries:
+        batch = svc.daily_calories_and_macro_split_many(ranges, macro_basis="grams")
+
+    assert len(queries) == 1
+    assert batch == [svc.daily_calories_and_macro_split(dr, macro_basis="grams") for dr in ranges]
+    assert [d.calories for d in batch[1].days] == [100.0, 0.0, 0.0, 0.0, 0.0, 0.0, 250.0]
+
+
+# ---------- Local-day bucketing ----------
+
+def test_local_days_follow_dst_switch(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])  # 100 kcal / 100 g
+    repo = MealRepo(session)
+    # Chisinau switches from +02:00 to +03:00 at 2025-03-30 00:00 UTC
+    for when, grams in [
+        (datetime(2025, 3, 29, 21, 30, tzinfo=timezone.utc), 10),   # 23:30 local, Mar 29 (+2)
+        (datetime(2025, 3, 29, 22, 30, tzinfo=timezone.utc), 20),   # 00:30 local, Mar 30 (+2)
+        (datetime(2025, 3, 30, 20, 30, tzinfo=timezone.utc), 40),   # 23:30 local, Mar 30 (+3)
+        (datetime(2025, 3, 30, 21, 30, tzinfo=timezone.utc), 80),   # 00:30 local, Mar 31 (+3)
+    ]:
+        repo.create(_meal(when, (apple, grams)))
+
+    stats = StatsRepo(session)
+    local = stats.daily_aggregate(date(2025, 3, 29), date(2025, 3, 31), ZoneInfo("Europe/Chisinau"))
+    assert [(r["day"], r["kcal"]) for r in local] == [
+        ("2025-03-29", pytest.approx(10.0)),
+        ("2025-03-30", pytest.approx(60.0)),
+        ("2025-03-31", pytest.approx(80.0)),
+    ]
+
+    # UTC days come from the rollup and bucket the same meals differently
+    utc = stats.daily_aggregate(date(2025, 3, 29), date(2025, 3, 31), ZoneInfo("UTC"))
+    assert [(r["day"], r["kcal"]) for r in utc] == [
+        ("2025-03-29", pytest.approx(30.0)),
+        ("2025-03-30", pytest.approx(120.0)),
+    ]
+
+    # west of UTC: the late meal on Mar 30 UTC is still Mar 30 in New York
+    ny = stats.daily_aggregate(date(2025, 3, 30), date(2025, 3, 30), ZoneInfo("America/New_York"))
+    assert [(r["day"], r["kcal"]) for r in ny] == [("2025-03-30", pytest.approx(120.0))]
+
+
+def test_utc_offset_segments_split_at_transitions():
+    tz = ZoneInfo("America/New_York")
+    start, end = local_day_bounds(date(2025, 1, 1), date(2025, 12, 31), tz)
+    segments = utc_offset_segments(tz, start, end)
+    assert [(s.isoformat(), o.total_seconds() / 3600) for s, o in segments] == [
+        ("2025-01-01T05:00:00+00:00", -5.0),
+        ("2025-03-09T07:00:00+00:00", -4.0),
+        ("2025-11-02T06:00:00+00:00", -5.0),
+    ]
+    assert utc_offset_segments(ZoneInfo("UTC"), start, end) == [(start, timedelta(0))]
+
+
+# ---------- Week / month / year levels ----------
+
+def _periods(session) -> dict[tuple[str, str], tuple[int, float]]:
+    session.expire_all()
+    rows = session.execute(select(PeriodNutritionRollupModel).where(PeriodNutritionRollupModel.meal_count > 0))
+    return {(r.level, r.period_start.isoformat()): (r.meal_count, pytest.approx(r.kcal)) for r in rows.scalars()}
+
+
+def test_plan_range_covers_the_range_with_aligned_buckets():
+    start, end = date(2021, 3, 17), date(2025, 8, 20)
+    plan = plan_range(start, end)
+
+    assert plan[0].start == start and plan[-1].end == end
+    assert all(a.end + timedelta(days=1) == b.start for a, b in zip(plan, plan[1:]))
+    assert all(b.start == period_start(b.level, b.start) and b.end == period_end(b.level, b.start) for b in plan)
+    assert [b.start.year for b in plan if b.level == "year"] == [2022, 2023, 2024]
+    assert len(plan) < 40   # vs ~1600 days
+
+
+def test_period_rows_follow_writes_and_match_a_rebuild(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])
+    repo = MealRepo(session)
+    meals = [
+        repo.create(_meal(datetime(2024, 12, 29 + i, 12, tzinfo=timezone.utc) + timedelta(days=9 * i), (apple, 100)))
+        for i in range(3)
+    ]
+    repo.update(meals[0].id, _meal(datetime(2025, 2, 3, 9, tzinfo=timezone.utc), (apple, 50)))
+    repo.delete(meals[1].id)
+
+    incremental = _periods(session)
+    assert incremental == {
+        ("week", "2025-01-13"): (1, 100.0),
+        ("week", "2025-02-03"): (1, 50.0),
+        ("month", "2025-01-01"): (1, 100.0),
+        ("month", "2025-02-01"): (1, 50.0),
+        ("year", "2025-01-01"): (2, 150.0),
+    }
+
+    session.query(PeriodNutritionRollupModel).delete()
+    session.commit()
+    NutritionRollupRepo(session).rebuild()
+    assert _periods(session) == incremental
+
+
+def test_period_series_reads_whole_buckets(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])  # 100 kcal / 100 g
+    repo = MealRepo(session)
+    day = date(2023, 11, 20)
+    while day <= date(2025, 2, 10):
+        repo.create(_meal(datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc), (apple, 10)))
+        day += timedelta(days=5)
+    session.expunge_all()
+
+    dr = DataRange(
+        start=datetime(2023, 12, 3, tzinfo=timezone.utc),
+        end=datetime(2025, 1, 31, 23, 59, tzinfo=timezone.utc),
+    )
+    expected = _grouped(session)
+    in_range = {d: v for d, v in expected.items() if "2023-12-03" <= d <= "2025-01-31"}
+
+    with count_queries(session) as queries:
+        series = StatsService(session).period_series(dr, "month")
+    assert len(queries) == 2   # one for daily edges, one for week / month / year rows
+    assert len(series.periods) == 14
+    assert series.periods[0].start == date(2023, 12, 3)   # clipped: days + weeks, then whole months
+    assert series.total.meal_count == sum(n for n, _ in in_range.values())
+    assert series.total.totals.kcal == pytest.approx(sum(k for _, k in in_range.values()))
+    jan_2024 = series.periods[1]
+    assert (jan_2024.start, jan_2024.end) == (date(2024, 1, 1), date(2024, 1, 31))
+    assert jan_2024.meal_count == sum(n for d, (n, _) in in_range.items() if d.startswith("2024-01"))
+
+    yearly = StatsService(session).totals_for_range(dr)
+    assert yearly.meal_count == series.total.meal_count
+
+
+# ---------- Trend ----------
+
+def test_trend_moving_averages_use_days_before_the_range(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = _ingredient(by_name["Apple"])  # 100 kcal / 100 g
+    repo = MealRepo(session)
+    # 70 kcal every day from Dec 25, 140 kcal from Jan 8
+    day = date(2024, 12, 25)
+    while day <= date(2025, 1, 14):
+        grams = 140 if day >= date(2025, 1, 8) else 70
+        repo.create(_meal(datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc), (apple, grams)))
+        day += timedelta(days=1)
+
+    dr = DataRange(
+        start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        end=datetime(2025, 1, 14, 23, 59, tzinfo=timezone.utc),
+    )
+    result = StatsService(session).trend(dr, windows=(7, 14))
+
+    assert result.days[0] == date(2025, 1, 1) and len(result.days) == 14
+    kcal = result.metrics["kcal"]
+    assert kcal.daily == [70.0] * 7 + [140.0] * 7
+    # Jan 1's 7-day window is Dec 26..Jan 1: all eaten, nothing zero-filled
+    assert kcal.moving_averages[7][0] == 70.0
+    assert kcal.moving_averages[7][-1] == 140.0
+    # Jan 1's 14-day window reaches back to Dec 19, before the first meal
+    assert kcal.moving_averages[14][0] == pytest.approx(70.0 * 8 / 14, abs=0.05)
+    assert kcal.slope_per_day > 0
+    assert result.metrics["protein_g"].daily[0] == pytest.approx(0.2, abs=0.05)
+
+
+def test_trend_rejects_bad_windows(session):
+    from src.services.errors import ValidationError
+
+    dr = DataRange(start=datetime(2025, 1, 1, tzinfo=timezone.utc), end=datetime(2025, 1, 2, tzinfo=timezone.utc))
+    with pytest.raises(ValidationError):
+        StatsService(session).trend(dr, windows=(0, 7))
@@ -0,0 +1,207 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from src.data.database_models import INGREDIENTS_FTS_TABLE, Base, IngredientModel
+from src.infrastructure.daparser import ROOT, import_catalogue, main, parse_rows
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+
+
+def _alembic_head():
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "migrations" / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _write_tsv(path, records, ids=None):
+    if ids is None:
+        lines = ["name\tnutrition_100g"]
+        lines += [f"{name}\t{json.dumps(n)}" for name, n in records]
+    else:
+        lines = ["id\tname\tnutrition_100g"]
+        lines += [f"{key}\t{name}\t{json.dumps(n)}" for key, (name, n) in zip(ids, records)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+RECORDS = [
+    ("Oats", {"calories": 389, "carbohydrates": 66.3, "total_fat": 6.9, "protein": 16.9}),
+    ("x" * 513, {"calories": 1, "carbohydrates": 1, "total_fat": 1, "protein": 1}),
+    ("Missing protein", {"calories": 10, "carbohydrates": 1, "total_fat": 1}),
+    ("Kilojoules", {"energy": "418.4 kJ", "carbs": "1,5 g", "fat": 2, "proteins": 3}),
+    ("Negative", {"calories": -5, "carbohydrates": 1, "total_fat": 1, "protein": 1}),
+] + [(f"Food {i}", {"calories": i, "carbohydrates": 1, "total_fat": 2, "protein": 3}) for i in range(40)]
+
+
+def test_parse_rows_normalizes_and_filters():
+    rows, too_long = parse_rows(
+        [name for name, _ in RECORDS[:5]],
+        [json.dumps(n) for _, n in RECORDS[:5]],
+    )
+    assert too_long == ["x" * 513]
+    assert rows[0] == ("Oats", 389.0, 66.3, 6.9, 16.9)
+    assert rows[1][0] == "Kilojoules"
+    assert rows[1][1:] == pytest.approx((100.0, 1.5, 2.0, 3.0))
+    assert len(rows) == 2
+
+
+def _import(src, db, **kw):
+    chunks = []
+    counts = import_catalogue(src, db, on_chunk=lambda batch, too_long: chunks.append((batch, too_long)), **kw)
+    return counts, chunks
+
+
+def test_parallel_import_matches_serial(tmp_path):
+    src = tmp_path / "foods.tsv"
+    _write_tsv(src, RECORDS)
+
+    serial = _import(src, tmp_path / "serial.sqlite", workers=1, chunksize=7)
+    parallel = _import(src, tmp_path / "parallel.sqlite", workers=2, chunksize=7)
+
+    assert parallel == serial
+    (inserted, skipped), chunks = parallel
+    assert (inserted, skipped) == (42, 1)
+    assert len(chunks) == 7                                  # streamed once per TSV chunk
+    ids = [row[0] for batch, _ in chunks for row in batch]
+    assert ids == list(range(1, 43))                         # ids follow input order
+
+    conn = sqlite3.connect(tmp_path / "parallel.sqlite")
+    try:
+        assert conn.execute("SELECT id, name FROM ingredients WHERE id IN (1, 42) ORDER BY id").fetchall() == [
+            (1, "Oats"), (42, "Food 39"),
+        ]
+        assert conn.execute("SELECT COUNT(*) FROM ingredient_trigrams WHERE ingredient_id = 1").fetchone()[0] > 0
+    finally:
+        conn.close()
+
+
+def test_import_builds_the_application_schema(tmp_path):
+    src = tmp_path / "foods.tsv"
+    _write_tsv(src, RECORDS)
+    db = tmp_path / "foods.sqlite"
+    import_catalogue(src, db, workers=1, chunksize=7)
+
+    engine = create_engine(f"sqlite:///{db}")
+    try:
+        # same tables, columns and indexes as the models (and so as Alembic's head)
+        with engine.connect() as conn:
+            # as migrations/alembic/env.py: the FTS tables are managed by hand-written migrations
+            skip_fts = lambda obj, name, type_, *_: not (type_ == "table" and name.startswith(INGREDIENTS_FTS_TABLE))
+            context = MigrationContext.configure(conn, opts={"include_object": skip_fts})
+            assert compare_metadata(context, Base.metadata) == []
+            assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one() == _alembic_head()
+            assert not inspect(conn).has_table("import_checkpoint")
+
+        with sessionmaker(bind=engine)() as session:
+            repo = IngredientRepo(session)
+            assert [i.name for i in repo.find_by_name("oat")] == ["Oats"]          # FTS rebuilt
+            assert [i.name for i in repo.find_similar("Food 12")][0] == "Food 12"  # trigram postings
+            session.add(IngredientModel(name="Oat milk", kcal_per_100g=40, carbs_per_100g=7, fats_per_100g=1, proteins_per_100g=1))
+            session.commit()
+            assert {i.name for i in repo.find_by_name("oat")} == {"Oats", "Oat milk"}  # FTS trigger is back
+    finally:
+        engine.dispose()
+
+
+def test_main_streams_csv_and_skip_log(tmp_path, capsys):
+    src = tmp_path / "foods.tsv"
+    _write_tsv(src, RECORDS)
+
+    main([str(src), str(tmp_path / "foods.sqlite"), "--workers", "1", "--chunksize", "5"])
+
+    with open(tmp_path / "foods.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:2] == ["id", "name"]
+    assert rows[1][:2] == ["1", "Oats"]
+    assert len(rows) == 1 + 42
+    with open(tmp_path / "foods_names_over_512.csv", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["name_over_512_chars"], ["x" * 513]]
+
+    out = capsys.readouterr().out
+    assert "Rows inserted: 42" in out
+    assert "Peak memory (RSS)" in out
+
+
+def test_resume_continues_after_last_committed_chunk(tmp_path, monkeypatch):
+    import src.infrastructure.daparser as daparser
+
+    src = tmp_path / "foods.tsv"
+    _write_tsv(src, RECORDS)
+    main([str(src), str(tmp_path / "clean.sqlite"), "--workers", "1", "--chunksize", "5"])
+
+    save = daparser._save_checkpoint
+    calls = []
+    def crash_on_fourth_chunk(conn, cp):
+        calls.append(cp)
+        if len(calls) == 4:
+            raise RuntimeError("killed")
+        save(conn, cp)
+    monkeypatch.setattr(daparser, "_save_checkpoint", crash_on_fourth_chunk)
+    with pytest.raises(RuntimeError):
+        main([str(src), str(tmp_path / "foods.sqlite"), "--workers", "1", "--chunksize", "5"])
+    monkeypatch.setattr(daparser, "_save_checkpoint", save)
+
+    assert not (tmp_path / "foods.sqlite").exists()           # only the side file was written
+    cp = daparser.read_checkpoint(str(tmp_path / "foods.sqlite.partial"))
+    assert cp["last_rowid"] == 12                              # 3 chunks committed, the 4th rolled back
+
+    main([str(src), str(tmp_path / "foods.sqlite"), "--workers", "2", "--chunksize", "5", "--resume"])
+
+    for name in ("{}.csv", "{}_names_over_512.csv"):
+        assert (tmp_path / name.format("foods")).read_bytes() == (tmp_path / name.format("clean")).read_bytes()
+    conn = sqlite3.connect(tmp_path / "foods.sqlite")
+    try:
+        assert conn.execute("SELECT COUNT(*), MAX(id) FROM ingredients").fetchone() == (42, 42)
+    finally:
+        conn.close()
+    assert not (tmp_path / "foods.sqlite.partial").exists()
+    assert daparser.read_checkpoint(str(tmp_path / "foods.sqlite")) is None   # finished: checkpoint dropped
+
+
+def test_repeated_source_ids_keep_their_first_row(tmp_path):
+    src = tmp_path / "foods.tsv"
+    _write_tsv(src, RECORDS[:1] + RECORDS[5:10], ids=["a", "b", "c", "b", "d", "a"])
+
+    main([str(src), str(tmp_path / "foods.sqlite"), "--workers", "1", "--chunksize", "2"])
+
+    with open(tmp_path / "foods.csv", newline="", encoding="utf-8") as f:
+        assert [row[:2] for row in csv.reader(f)][1:] == [["1", "Oats"], ["2", "Food 0"], ["3", "Food 1"], ["4", "Food 3"]]
+    conn = sqlite3.connect(tmp_path / "foods.sqlite")
+    try:
+        assert conn.execute("SELECT id, source_id, name FROM ingredients ORDER BY id").fetchall() == [
+            (1, "a", "Oats"), (2, "b", "Food 0"), (3, "c", "Food 1"), (4, "d", "Food 3"),
+        ]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("ids", [["a", "b", "c"], None], ids=["id column", "name fallback"])
+def test_main_sync_matches_on_the_source_key(tmp_path, capsys, ids):
+    db = tmp_path / "app.sqlite"
+    engine = create_engine(f"sqlite:///{db}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    src = tmp_path / "foods.tsv"
+    records = [("Oats", RECORDS[0][1]), ("Rye", RECORDS[5][1]), ("Spelt", RECORDS[6][1])]
+
+    _write_tsv(src, records, ids)
+    main([str(src), str(db), "--sync", "--workers", "1", "--chunksize", "2"])
+    _write_tsv(src, [records[0], ("Rye", RECORDS[7][1])], ids and ids[:2])
+    report = main([str(src), str(db), "--sync", "--workers", "1", "--chunksize", "2"])
+
+    assert (report.inserted, report.updated, report.unchanged, report.removed) == (0, 1, 1, 1)
+    conn = sqlite3.connect(db)
+    try:
+        rows = conn.execute("SELECT id, source_id, name, kcal_per_100g, removed_at IS NOT NULL FROM ingredients ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    keys = ids or ["Oats", "Rye", "Spelt"]
+    assert rows == [(1, keys[0], "Oats", 389.0, 0), (2, keys[1], "Rye", 2.0, 0), (3, keys[2], "Spelt", 1.0, 1)]
+    assert "Updated: 1" in capsys.readouterr().out
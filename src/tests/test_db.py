@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError
+
+from src.infrastructure.db import DatabaseSettings, make_engine
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_settings_come_from_the_environment():
+    settings = DatabaseSettings.from_env({
+        "DATABASE_URL": "sqlite:////tmp/other.db",
+        "DB_POOL_SIZE": "2",
+        "DB_BUSY_TIMEOUT_MS": "250",
+        "SQLITE_CACHE_SIZE_KIB": "1024",
+    })
+    assert settings.url == "sqlite:////tmp/other.db"
+    assert settings.pool_size == 2
+    assert settings.max_overflow == DatabaseSettings().max_overflow
+    assert settings.sqlite_pragmas()["busy_timeout"] == 250
+    assert settings.sqlite_pragmas()["cache_size"] == -1024
+
+
+def test_every_new_connection_gets_the_pragmas(tmp_path):
+    settings = DatabaseSettings(url = f"sqlite:///{tmp_path / 'app.db'}", busy_timeout_ms = 1234, mmap_size = 1 << 20)
+    writer, reader = make_engine(settings), make_engine(settings, read_only = True)
+    with writer.connect() as a, reader.connect() as b, reader.connect() as c:
+        for conn in (a, b, c):
+            assert _pragma(conn, "journal_mode") == "wal"
+            assert _pragma(conn, "synchronous") == 1        # NORMAL
+            assert _pragma(conn, "temp_store") == 2         # MEMORY
+            assert _pragma(conn, "busy_timeout") == 1234
+            assert _pragma(conn, "cache_size") == -settings.cache_size_kib
+            assert _pragma(conn, "mmap_size") == 1 << 20
+    writer.dispose()
+    reader.dispose()
+
+
+def test_readers_are_not_blocked_by_an_open_write(tmp_path):
+    settings = DatabaseSettings(url = f"sqlite:///{tmp_path / 'app.db'}", busy_timeout_ms = 100)
+    write_engine, read_engine = make_engine(settings), make_engine(settings, read_only = True)
+    with write_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    with write_engine.connect() as writer, read_engine.connect() as reader:
+        # on the driver connection: the engine's own transactions start with a plain BEGIN
+        raw = writer.connection.driver_connection
+        raw.execute("BEGIN EXCLUSIVE")
+        raw.execute("INSERT INTO t VALUES (2)")
+        # under the default rollback journal an exclusive writer locks readers out until it commits
+        assert reader.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        raw.execute("COMMIT")
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def test_in_memory_urls_skip_pool_sizing():
+    engine = make_engine(DatabaseSettings(url = "sqlite://"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_read_engine_is_query_only_and_sees_committed_writes(tmp_path):
+    settings = DatabaseSettings(url = f"sqlite:///{tmp_path / 'app.db'}")
+    writer, reader = make_engine(settings), make_engine(settings, read_only = True)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with reader.connect() as conn:
+        assert _pragma(conn, "query_only") == 1
+        assert _pragma(conn, "journal_mode") == "wal"
+        with pytest.raises(OperationalError, match = "readonly"):
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+    writer.dispose()
+    reader.dispose()
+
+
+def test_sqlite_writes_share_a_single_connection(tmp_path):
+    settings = DatabaseSettings(url = f"sqlite:///{tmp_path / 'app.db'}", pool_size = 4, pool_timeout = 0.1)
+    writer, reader = make_engine(settings), make_engine(settings, read_only = True)
+    assert writer.pool.size() == 1
+    assert reader.pool.size() == 4
+
+    with writer.connect():
+        # a second writer queues on the pool instead of fighting over the file lock
+        with pytest.raises(TimeoutError):
+            writer.connect()
+    writer.dispose()
+    reader.dispose()
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.api.app import app
+from src.data.database_models import Base, DailyNutritionRollupModel, FavoriteMealModel, IngredientModel, MealModel
+from src.infrastructure import db, group_commit
+from src.infrastructure.db import DatabaseSettings, make_engine
+from src.infrastructure.group_commit import GroupCommitQueue
+from src.services.favorites import FavoriteService
+from src.services.meals import MealService
+
+
+def _create(grams: float, name: str = "Lunch"):
+    def write(session):
+        return MealService(session).create(
+            name = name,
+            eaten_at = datetime(2025, 3, 1, 12, tzinfo = timezone.utc),
+            entries = [{"ingredient_id": 1, "grams": grams}],
+        )
+    return write
+
+
+@pytest.fixture
+def writer(session):
+    """The production writer engine (one connection, explicit BEGIN) on `session`'s database file."""
+    engine = make_engine(DatabaseSettings(url = session.get_bind().url.render_as_string(hide_password = False)))
+    yield engine
+    engine.dispose()
+
+
+def test_concurrent_writes_share_one_commit(session, seed_ingredients, writer):
+    queue = GroupCommitQueue(writer, max_delay = 0.2)
+    outside = sqlite3.connect(session.get_bind().url.database, check_same_thread = False)
+    visible: list[int] = []
+
+    def create_and_look(i):
+        def write(s):
+            meal = _create(100 + i, name = f"Meal {i}")(s)
+            # another connection sees nothing of the batch, earlier writes included, until it commits
+            visible.append(outside.execute("SELECT count(*) FROM history_meals").fetchone()[0])
+            return meal
+        return write
+
+    start = threading.Barrier(8)
+    futures = [None] * 8
+
+    def client(i):
+        start.wait()
+        futures[i] = queue.submit(create_and_look(i))
+
+    threads = [threading.Thread(target = client, args = (i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    meals = [f.result(timeout = 5) for f in futures]
+
+    assert visible == [0] * 8
+    assert outside.execute("SELECT count(*) FROM history_meals").fetchone()[0] == 8
+    outside.close()
+    assert sorted(m.name for m in meals) == [f"Meal {i}" for i in range(8)]
+    assert {m.name: m.compute_totals().kcal for m in meals}["Meal 3"] == pytest.approx(103.0)
+    stored = dict(session.execute(select(MealModel.name, MealModel.total_kcal)).all())
+    assert len(stored) == 8 and stored["Meal 3"] == pytest.approx(103.0)
+
+
+def test_a_failing_write_only_rolls_back_itself(session, seed_ingredients, writer):
+    queue = GroupCommitQueue(writer, max_delay = 0.2)
+
+    def half_done_then_fail(s):
+        _create(500, name = "Broken")(s)
+        raise RuntimeError("boom")
+
+    lunch = queue.run(_create(100))
+    ok = queue.submit(_create(200, name = "Dinner"))
+    broken = queue.submit(half_done_then_fail)
+    favorite = queue.submit(lambda s: FavoriteService(s).add(meal_id = lunch.id))
+
+    with pytest.raises(RuntimeError, match = "boom"):
+        broken.result(timeout = 5)
+    assert ok.result(timeout = 5).name == "Dinner"
+    assert favorite.result(timeout = 5).name == "Lunch"
+
+    names = session.execute(select(MealModel.name).order_by(MealModel.id)).scalars().all()
+    assert names == ["Lunch", "Dinner"]
+    assert session.execute(select(func.count()).select_from(FavoriteMealModel)).scalar() == 1
+    day = session.execute(select(DailyNutritionRollupModel)).scalar_one()
+    assert (day.meal_count, day.kcal) == (2, 300.0)
+
+
+# ——— Routes with the queue enabled ———
+
+@pytest.fixture
+def queued_client(tmp_path, monkeypatch):
+    """The app on a file database with the production engine shapes (one writer connection) and DB_GROUP_COMMIT_MS > 0."""
+    settings = DatabaseSettings(url = f"sqlite:///{tmp_path / 'app.db'}", pool_timeout = 3, group_commit_ms = 5)
+    writer, reader = make_engine(settings), make_engine(settings, read_only = True)
+    Base.metadata.create_all(writer)
+    with sessionmaker(bind = writer)() as s:
+        s.add(IngredientModel(name = "Rice", kcal_per_100g = 130, carbs_per_100g = 28, fats_per_100g = 0.3, proteins_per_100g = 2.7))
+        s.commit()
+
+    queue = GroupCommitQueue(writer, max_delay = settings.group_commit_ms / 1000)
+    monkeypatch.setattr(group_commit, "db_settings", settings)
+    monkeypatch.setattr(group_commit, "_queue", queue)
+
+    def sessions(engine):
+        def get():
+            with sessionmaker(bind = engine, autoflush = False)() as s:
+                yield s
+        return get
+    app.dependency_overrides[db.get_db] = sessions(writer)
+    app.dependency_overrides[db.get_read_db] = sessions(reader)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        writer.dispose()
+        reader.dispose()
+
+
+def test_queued_write_routes_do_not_deadlock_on_the_writer(queued_client):
+    assert group_commit.write_queue() is not None
+    results: dict[int, tuple] = {}
+
+    def client(i):
+        meal = queued_client.post("/meals", json = {
+            "name": f"Meal {i}", "eaten_at": "2025-03-01T12:00:00Z", "entries": [{"ingredient_id": 1, "grams": 100}],
+        })
+        entry_id = meal.json()["entries"][0]["id"]
+        patched = queued_client.patch(f"/meals/{meal.json()['id']}/entries/{entry_id}", json = {"grams": 200 + i})
+        starred = queued_client.post("/favorites", json = {"meal_id": meal.json()["id"], "name": "x"})
+        results[i] = (meal.status_code, patched.status_code, patched.json(), starred.status_code, starred.json())
+
+    threads = [threading.Thread(target = client, args = (i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout = 30)
+    assert not any(t.is_alive() for t in threads)
+
+    for i, (created, patched, entry, starred, favorite) in results.items():
+        assert (created, patched, starred) == (201, 200, 201)
+        assert entry["grams"] == 200 + i
+        assert favorite["name"] == f"Meal {i}"
+    assert len(results) == 6
+    assert len(queued_client.get("/favorites").json()) == 6
@@ -118,3 +118,80 @@ def test_delete_missing_raises(session):
     repo = IngredientRepo(session)
     with pytest.raises(IngredientNotFound):
         repo.delete(42)
+
+def test_find_by_name_matches_all_fragments(session, seed_ingredients):
+    repo = IngredientRepo(session)
+    results = repo.find_by_name("chick brea")
+    assert [r.name for r in results] == ["Chicken Breast"]
+
+def test_find_by_name_sees_created_renamed_and_deleted_rows(session, seed_ingredients):
+    repo = IngredientRepo(session)
+    created = repo.create(Ingredient(
+        name="Greek Yogurt", kcal_per_100g=59.0, carbs_per_100g=3.6, proteins_per_100g=10.0, fats_per_100g=0.4,
+    ))
+    assert [r.id for r in repo.find_by_name("yogu")] == [created.id]
+
+    repo.update(created.id, name="Skyr")
+    assert repo.find_by_name("yogu") == []
+    assert [r.id for r in repo.find_by_name("skyr")] == [created.id]
+
+    repo.delete(created.id)
+    assert repo.find_by_name("skyr") == []
+
+def test_find_by_name_treats_fts_syntax_literally(session, seed_ingredients):
+    repo = IngredientRepo(session)
+    assert repo.find_by_name('egg" OR "apple') == []
+    assert repo.find_by_name("100%") == []
+
+def _create(repo: IngredientRepo, name: str) -> Ingredient:
+    return repo.create(Ingredient(
+        name=name, kcal_per_100g=100.0, carbs_per_100g=1.0, proteins_per_100g=1.0, fats_per_100g=1.0,
+    ))
+
+def test_find_similar_tolerates_typos(session):
+    repo = IngredientRepo(session)
+    banana = _create(repo, "Banana")
+    _create(repo, "Bandana Cake")
+    _create(repo, "Apple")
+
+    results = repo.find_similar("bananna")
+    assert results[0].id == banana.id
+    assert "Apple" not in {r.name for r in results}
+
+def test_find_similar_follows_renames_and_deletes(session):
+    repo = IngredientRepo(session)
+    created = _create(repo, "Chicken Breast")
+    assert [r.id for r in repo.find_similar("chiken brest")] == [created.id]
+
+    repo.update(created.id, name="Turkey Thigh")
+    assert repo.find_similar("chiken brest") == []
+    assert [r.id for r in repo.find_similar("turky thigh")] == [created.id]
+
+    repo.delete(created.id)
+    assert repo.find_similar("turky thigh") == []
+
+def test_find_by_name_ranks_exact_prefix_word_then_substring(session):
+    repo = IngredientRepo(session)
+    for name in ["Eggplant parmesan with cheese", "Nutmeggy cookie", "Scrambled egg", "Eggnog", "Egg"]:
+        _create(repo, name)
+
+    assert [r.name for r in repo.find_by_name("egg")] == [
+        "Egg", "Eggnog", "Eggplant parmesan with cheese", "Scrambled egg", "Nutmeggy cookie",
+    ]
+    assert [r.name for r in repo.find_by_name("EGG", limit=1)] == ["Egg"]
+
+def test_find_by_name_prefers_popular_ingredients_within_a_tier(session):
+    from datetime import datetime, timezone
+    from src.domain.domain import Meal, MealEntry
+    from src.infrastructure.repositories.meal_repo import MealRepo
+    repo = IngredientRepo(session)
+    plain = _create(repo, "Rice, white")
+    popular = _create(repo, "Rice, brown")
+
+    MealRepo(session).create(Meal(
+        name="Lunch",
+        eaten_at=datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc),
+        entries=[MealEntry(ingredient=popular, quantity_g=100) for _ in range(3)],
+    ))
+
+    assert [r.id for r in repo.find_by_name("rice")] == [popular.id, plain.id]
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+from src.domain import Meal, MealEntry, Ingredient
+from src.data.database_models import IngredientModel, IngredientUsageModel, MealEntryModel
+from src.infrastructure.repositories.meal_repo import MealRepo
+from src.infrastructure.repositories.usage_repo import IngredientUsageRepo
+
+
+def to_domain_ingredient(im) -> Ingredient:
+    return Ingredient(
+        id=im.id,
+        name=im.name,
+        fats_per_100g=im.fats_per_100g,
+        proteins_per_100g=im.proteins_per_100g,
+        carbs_per_100g=im.carbs_per_100g,
+        kcal_per_100g=im.kcal_per_100g,
+    )
+
+def at(day: int, hour: int = 12) -> datetime:
+    return datetime(2025, 1, day, hour, 0, tzinfo=timezone.utc)
+
+def counts(session) -> dict[int, int]:
+    session.expire_all()
+    return {u.ingredient_id: u.use_count for u in session.query(IngredientUsageModel).all()}
+
+
+def test_create_and_update_maintain_counts(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple, banana, egg = (to_domain_ingredient(by_name[n]) for n in ("Apple", "Banana", "Egg"))
+    repo = MealRepo(session)
+
+    meal = repo.create(Meal(name="Breakfast", eaten_at=at(1), entries=[
+        MealEntry(ingredient=apple, quantity_g=100),
+        MealEntry(ingredient=apple, quantity_g=50),
+        MealEntry(ingredient=banana, quantity_g=80),
+    ]))
+    assert counts(session) == {apple.id: 2, banana.id: 1}
+
+    repo.update(meal.id, Meal(name="Breakfast", eaten_at=at(2), entries=[
+        MealEntry(ingredient=apple, quantity_g=100),
+        MealEntry(ingredient=egg, quantity_g=60),
+    ]))
+    assert counts(session) == {apple.id: 1, banana.id: 0, egg.id: 1}
+
+def test_entry_level_writes_and_delete(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple, banana = (to_domain_ingredient(by_name[n]) for n in ("Apple", "Banana"))
+    repo = MealRepo(session)
+
+    meal = repo.create(Meal(name="Snack", eaten_at=at(1), entries=[
+        MealEntry(ingredient=apple, quantity_g=100),
+        MealEntry(ingredient=banana, quantity_g=100),
+    ]))
+    first, second = session.query(MealEntryModel).filter_by(meal_id=meal.id).order_by(MealEntryModel.id).all()
+
+    repo.update_entry_ingredient(meal_id=meal.id, entry_id=first.id, ingredient_id=banana.id)
+    assert counts(session) == {apple.id: 0, banana.id: 2}
+
+    repo.delete_entry(meal_id=meal.id, entry_id=second.id)
+    assert counts(session) == {apple.id: 0, banana.id: 1}
+
+    repo.delete(meal.id)
+    assert counts(session) == {apple.id: 0, banana.id: 0}
+
+def test_most_frequent_and_most_recent(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple, banana, mango = (to_domain_ingredient(by_name[n]) for n in ("Apple", "Banana", "Mango"))
+    repo = MealRepo(session)
+
+    repo.create(Meal(name="A", eaten_at=at(1), entries=[MealEntry(ingredient=apple, quantity_g=1)]))
+    repo.create(Meal(name="B", eaten_at=at(2), entries=[MealEntry(ingredient=apple, quantity_g=1)]))
+    repo.create(Meal(name="C", eaten_at=at(3), entries=[MealEntry(ingredient=banana, quantity_g=1)]))
+    # back-dated meals must not move last_used_at backwards
+    repo.create(Meal(name="D", eaten_at=at(1, 8), entries=[MealEntry(ingredient=banana, quantity_g=1)]))
+
+    usage = IngredientUsageRepo(session)
+    frequent = usage.most_frequent(limit=10)
+    assert [(u.ingredient.name, u.use_count) for u in frequent] == [("Banana", 2), ("Apple", 2)]
+
+    recent = usage.most_recent(limit=1)
+    assert recent[0].ingredient.id == banana.id
+    assert recent[0].last_used_at == at(3)
+    assert mango.id not in {u.ingredient.id for u in frequent}
+
+    # tombstoned by a catalogue sync: no longer offered
+    session.get(IngredientModel, banana.id).removed_at = at(4)
+    session.commit()
+    assert [u.ingredient.name for u in usage.most_frequent(limit=10)] == ["Apple"]
+    assert [u.ingredient.name for u in usage.most_recent(limit=10)] == ["Apple"]
@@ -0,0 +1,122 @@
+from sqlalchemy import event
+
+from src.data.database_models import ChangeLogModel, IngredientModel
+from src.infrastructure.autocomplete import ingredient_name_index
+from src.infrastructure.invalidation import ChangeLogPoller, change_poller, log_change, prune_change_log
+from src.infrastructure.repositories.ingredient_repo import IngredientRepo, ingredient_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write_from_other_worker(session, row: IngredientModel, **changes) -> None:
+    """Simulate another process: change the row and log it, without touching our caches."""
+    for k, v in changes.items():
+        setattr(row, k, v)
+    log_change(session, "ingredient", row.id, "upsert")
+    session.commit()
+
+
+def test_poll_dispatches_new_changes_by_entity(session):
+    poller = ChangeLogPoller(min_interval=0)
+    seen = []
+    poller.subscribe("ingredient", lambda s, changes: seen.extend((c.entity_id, c.op) for c in changes))
+
+    assert poller.poll(session) == 0     # first poll only records the position
+    log_change(session, "ingredient", 7, "upsert")
+    log_change(session, "meal", 3, "delete")
+    log_change(session, "ingredient", 8, "delete")
+    session.commit()
+
+    assert poller.poll(session) == 3
+    assert seen == [(7, "upsert"), (8, "delete")]
+    assert poller.poll(session) == 0
+
+def test_poll_is_throttled():
+    clock = FakeClock()
+    poller = ChangeLogPoller(min_interval=1.0, clock=clock)
+
+    class NoSession:
+        def execute(self, *_):
+            raise AssertionError("should not query while throttled")
+
+    poller._last_poll = 0.0
+    clock.now = 0.5
+    assert poller.poll(NoSession()) == 0
+
+def test_missed_changes_reset_subscribers(session):
+    poller = ChangeLogPoller(min_interval=0)
+    resets = []
+    poller.subscribe("ingredient", lambda s, c: None, on_reset=lambda: resets.append(True))
+    poller.poll(session)
+
+    for i in range(5):
+        log_change(session, "ingredient", i, "upsert")
+    session.commit()
+    assert prune_change_log(session, keep=2) == 3
+
+    assert poller.poll(session) == 0
+    assert resets == [True]
+    assert session.query(ChangeLogModel).count() == 2
+
+def test_idle_poll_is_one_index_search(session):
+    poller = ChangeLogPoller(min_interval=0)
+    for i in range(50):
+        log_change(session, "ingredient", i, "upsert")
+    session.commit()
+    poller.poll(session)
+
+    statements = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert poller.poll(session) == 0
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    raw = session.connection().connection.driver_connection
+    plan = [row[-1] for row in raw.execute(f"EXPLAIN QUERY PLAN {statements[0]}").fetchall()]
+    assert not any(detail.startswith("SCAN change_log") for detail in plan), plan
+
+def test_prune_change_log_command(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.data.database_models import Base
+    from src.infrastructure.maintenance import main
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as s:
+        for i in range(5):
+            log_change(s, "ingredient", i, "upsert")
+        s.commit()
+
+    assert main(["--database-url", url, "prune-change-log", "--keep", "2"]) == 0
+    with sessionmaker(bind=engine)() as s:
+        assert [r.entity_id for r in s.query(ChangeLogModel).order_by(ChangeLogModel.seq)] == [3, 4]
+    engine.dispose()
+
+def test_other_worker_writes_evict_ingredient_caches(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = by_name["Apple"]
+    repo = IngredientRepo(session)
+    change_poller.poll(session, force=True)
+
+    assert repo.get_by_id(apple.id).kcal_per_100g == 100.0
+    assert [s.name for s in ingredient_name_index.search(session, "appl")] == ["Apple"]
+
+    _write_from_other_worker(session, apple, kcal_per_100g=52.0, name="Apple, raw")
+    # without polling, this worker keeps serving what it cached
+    assert ingredient_cache.get(apple.id).kcal_per_100g == 100.0
+
+    change_poller.poll(session, force=True)
+    assert repo.get_by_id(apple.id).kcal_per_100g == 52.0
+    assert [s.name for s in ingredient_name_index.search(session, "appl")] == ["Apple, raw"]
@@ -2,47 +2,11 @@ from datetime import datetime, timezone, timedelta
 import pytest
 
 from src.domain import Meal, MealEntry, Ingredient
-from src.data.database_models import MealModel, MealEntryModel, IngredientModel
+from src.data.database_models import MealModel, MealEntryModel, IngredientModel, FavoriteMealModel
 from src.domain.errors import MealNotFound
 from src.infrastructure.repositories.meal_repo import MealRepo  # adjust if needed
-
-
-# ---------- Helpers ----------
-
-def to_domain_ingredient(im: IngredientModel) -> Ingredient:
-    # Convert DB row -> domain Ingredient (enum conversion included)
-    return Ingredient(
-        id=im.id,
-        name=im.name,
-        fats_per_100g=im.fats_per_100g,
-        proteins_per_100g=im.proteins_per_100g,
-        carbs_per_100g=im.carbs_per_100g,
-        kcal_per_100g=im.kcal_per_100g,
-    )
-
-
-def make_meal(
-    name: str = "Test Meal",
-    eaten_at: datetime | None = None,
-    entries: list[MealEntry] | None = None,
-    is_favorite: bool = False,
-) -> Meal:
-    if eaten_at is None:
-        eaten_at = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)  # tz-aware (domain requires)
-    if entries is None:
-        # placeholder entry; tests usually override with seeded ingredients
-        fake_ing = Ingredient(
-            id=1, name="X", fats_per_100g=0, proteins_per_100g=0,
-            carbs_per_100g=0, kcal_per_100g=0
-        )
-        entries = [MealEntry(ingredient=fake_ing, quantity_g=100)]
-    return Meal(
-        id=None,
-        name=name,
-        eaten_at=eaten_at,
-        is_favorite=is_favorite,
-        entries=entries,
-    )
+from src.infrastructure.repositories.favorite_repo import FavoriteRepo
+from src.tests.helpers import count_queries, make_meal, to_domain_ingredient
 
 
 # ---------- Tests ----------
@@ -337,4 +301,148 @@ def test_delete_entry_wrong_meal_no_effect(session, seed_ingredients):
     cnt_after_m2 = session.query(MealEntryModel).filter_by(meal_id=m2.id).count()
     assert cnt_after_m2 == cnt_before_m2
     # and entry in m1 still exists
-    assert session.get(MealEntryModel, entry_m1.id) is not None
\ No newline at end of file
+    assert session.get(MealEntryModel, entry_m1.id) is not None
+
+# ---------- Query counts (no N+1) ----------
+
+def _meal_with_entries(session, seed_ingredients, n: int) -> Meal:
+    by_name, _ = seed_ingredients
+    ingredients = [to_domain_ingredient(m) for m in by_name.values()]
+    entries = [MealEntry(ingredient=ingredients[i % len(ingredients)], quantity_g=10 + i) for i in range(n)]
+    return MealRepo(session).create(make_meal(name=f"Meal {n}", entries=entries))
+
+
+def test_get_by_id_query_count_does_not_grow_with_entries(session, seed_ingredients):
+    repo = MealRepo(session)
+    small = _meal_with_entries(session, seed_ingredients, 1)
+    big = _meal_with_entries(session, seed_ingredients, 8)
+    session.expunge_all()
+
+    with count_queries(session) as small_queries:
+        assert len(repo.get_by_id(small.id).entries) == 1
+    session.expunge_all()
+    with count_queries(session) as big_queries:
+        assert len(repo.get_by_id(big.id).entries) == 8
+
+    assert len(small_queries) == len(big_queries) == 2
+
+
+def test_find_by_name_and_list_between_query_count_is_fixed(session, seed_ingredients):
+    repo = MealRepo(session)
+    for n in (1, 3, 6):
+        _meal_with_entries(session, seed_ingredients, n)
+    session.expunge_all()
+
+    with count_queries(session) as queries:
+        meals = repo.find_by_name("meal", limit=10)
+    assert sorted(len(m.entries) for m in meals) == [1, 3, 6]
+    assert len(queries) == 2
+
+    session.expunge_all()
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with count_queries(session) as queries:
+        meals = repo.list_between(day, day + timedelta(days=1))
+    assert len(meals) == 3
+    assert len(queries) == 2
+
+
+def test_favorite_get_query_count_is_fixed(session, seed_ingredients):
+    meal = _meal_with_entries(session, seed_ingredients, 5)
+    favorites = FavoriteRepo(session, MealRepo(session))
+    favorites.add(meal.id)
+    favorite_id = session.query(FavoriteMealModel.id).filter_by(meal_id=meal.id).scalar()
+    session.expunge_all()
+
+    with count_queries(session) as queries:
+        got = favorites.get(favorite_id)
+    assert got.id == meal.id and got.is_favorite
+    assert len(got.entries) == 5
+    assert len(queries) == 2
+
+
+# ---------- Stored macro totals ----------
+
+def _stored_totals(session, meal_id: int) -> tuple[float, float, float, float]:
+    session.expire_all()
+    m = session.get(MealModel, meal_id)
+    return (m.total_kcal, m.total_protein_g, m.total_carbs_g, m.total_fat_g)
+
+
+def _computed_totals(meal: Meal) -> tuple[float, float, float, float]:
+    t = meal.compute_totals()
+    return (t.kcal, t.proteins, t.carbs, t.fats)
+
+
+def test_totals_follow_every_meal_write(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = to_domain_ingredient(by_name["Apple"])
+    chicken = to_domain_ingredient(by_name["Chicken Breast"])
+    repo = MealRepo(session)
+
+    meal = repo.create(make_meal(entries=[MealEntry(ingredient=apple, quantity_g=200)]))
+    assert _stored_totals(session, meal.id) == pytest.approx((200.0, 0.6, 28.0, 0.4))
+
+    meal = repo.update(meal.id, make_meal(entries=[
+        MealEntry(ingredient=apple, quantity_g=100),
+        MealEntry(ingredient=chicken, quantity_g=100),
+    ]))
+    assert _stored_totals(session, meal.id) == pytest.approx(_computed_totals(meal))
+
+    apple_entry = next(e for e in meal.entries if e.ingredient.id == apple.id)
+    repo.update_entry_quantity(meal_id=meal.id, entry_id=apple_entry.id, grams=50)
+    assert _stored_totals(session, meal.id) == pytest.approx(_computed_totals(repo.get_by_id(meal.id)))
+
+    repo.update_entry_ingredient(meal_id=meal.id, entry_id=apple_entry.id, ingredient_id=chicken.id)
+    assert _stored_totals(session, meal.id) == pytest.approx(_computed_totals(repo.get_by_id(meal.id)))
+
+    repo.delete_entry(meal_id=meal.id, entry_id=apple_entry.id)
+    assert _stored_totals(session, meal.id) == pytest.approx((50.0, 31.0, 10.0, 3.6))
+
+
+def test_ingredient_macro_change_recomputes_meals_using_it(session, seed_ingredients):
+    from src.infrastructure.repositories.ingredient_repo import IngredientRepo
+
+    by_name, _ = seed_ingredients
+    apple = to_domain_ingredient(by_name["Apple"])
+    banana = to_domain_ingredient(by_name["Banana"])
+    repo = MealRepo(session)
+    with_apple = repo.create(make_meal(entries=[MealEntry(ingredient=apple, quantity_g=50)]))
+    without = repo.create(make_meal(entries=[MealEntry(ingredient=banana, quantity_g=50)]))
+
+    IngredientRepo(session).update(apple.id, kcal_per_100g=300.0)
+
+    assert _stored_totals(session, with_apple.id)[0] == pytest.approx(150.0)
+    assert _stored_totals(session, without.id)[0] == pytest.approx(80.0)
+
+
+def test_repair_totals_fixes_rows_changed_behind_the_repo(session, seed_ingredients):
+    from src.infrastructure.maintenance import repair_totals
+
+    by_name, _ = seed_ingredients
+    apple = to_domain_ingredient(by_name["Apple"])
+    repo = MealRepo(session)
+    meals = [repo.create(make_meal(entries=[MealEntry(ingredient=apple, quantity_g=100)])) for _ in range(3)]
+
+    # e.g. a catalogue reload rewrote the macros with plain SQL
+    session.query(IngredientModel).filter_by(id=apple.id).update({"kcal_per_100g": 10.0})
+    session.commit()
+    assert _stored_totals(session, meals[0].id)[0] == pytest.approx(100.0)
+
+    assert repair_totals(session, batch=2) == 3
+    assert [_stored_totals(session, m.id)[0] for m in meals] == pytest.approx([10.0] * 3)
+
+
+def test_list_summaries_between_reads_stored_totals_only(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    apple = to_domain_ingredient(by_name["Apple"])
+    repo = MealRepo(session)
+    repo.create(make_meal(name="Snack", entries=[MealEntry(ingredient=apple, quantity_g=150)]))
+    session.expunge_all()
+
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with count_queries(session) as queries:
+        (summary,) = repo.list_summaries_between(day, day + timedelta(days=1))
+    assert summary.name == "Snack"
+    assert summary.totals.kcal == pytest.approx(150.0)
+    assert len(queries) == 1
+    assert "meal_entry" not in queries[0] and "ingredients" not in queries[0]
@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import event
+
+from src.domain import Ingredient, Meal, MealEntry
+from src.infrastructure.repositories.meal_repo import MealRepo, recompute_meal_totals
+from src.infrastructure.repositories.stats_repo import StatsRepo
+
+# tables whose reads must stay index searches; a "SCAN <table>" line means a full scan
+# (of the table or of a whole index), which is what these tests guard against
+GUARDED = ("history_meals", "meal_entry")
+
+
+@contextmanager
+def query_plans(session):
+    """EXPLAIN QUERY PLAN of every SELECT / UPDATE the block runs, as (sql, [plan details])."""
+    captured: list[tuple[str, object]] = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, parameters, *args: captured.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    plans: list[tuple[str, list[str]]] = []
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    raw = session.connection().connection.driver_connection
+    for statement, parameters in captured:
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            rows = raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append((statement, [row[-1] for row in rows]))
+
+
+def _full_scans(plans) -> list[str]:
+    return [
+        f"{detail}\n  in: {statement}"
+        for statement, details in plans
+        for detail in details
+        if any(detail.startswith(f"SCAN {table}") for table in GUARDED)
+    ]
+
+
+@pytest.fixture
+def meals(session, seed_ingredients):
+    by_name, _ = seed_ingredients
+    ingredients = [
+        Ingredient(
+            id = m.id, name = m.name, kcal_per_100g = m.kcal_per_100g,
+            carbs_per_100g = m.carbs_per_100g, fats_per_100g = m.fats_per_100g, proteins_per_100g = m.proteins_per_100g,
+        )
+        for m in by_name.values()
+    ]
+    repo = MealRepo(session)
+    for day in range(1, 29):
+        entries = [MealEntry(ingredient = ingredients[(day + i) % len(ingredients)], quantity_g = 50 + i) for i in range(3)]
+        repo.create(Meal(id = None, name = f"Meal {day}", eaten_at = datetime(2025, 2, day, 12, tzinfo = timezone.utc), entries = entries))
+    return ingredients
+
+
+def test_history_queries_search_by_eaten_at(session, meals):
+    repo = MealRepo(session)
+    start, end = datetime(2025, 2, 3, tzinfo = timezone.utc), datetime(2025, 2, 9, tzinfo = timezone.utc)
+    with query_plans(session) as plans:
+        repo.list_summaries_between(start, end)
+        repo.list_between(start, end)
+
+    assert plans
+    assert _full_scans(plans) == []
+    assert any("ix_history_meals_eaten_at_totals" in d for _, details in plans for d in details)
+
+
+def test_local_day_stats_are_answered_from_the_covering_index(session, meals):
+    with query_plans(session) as plans:
+        StatsRepo(session).daily_aggregate(date(2025, 2, 3), date(2025, 2, 9), ZoneInfo("Europe/Chisinau"))
+
+    assert _full_scans(plans) == []
+    assert any("COVERING INDEX ix_history_meals_eaten_at_totals" in d for _, details in plans for d in details)
+
+
+def test_totals_recompute_uses_the_covering_entry_indexes(session, meals):
+    with query_plans(session) as plans:
+        recompute_meal_totals(session, ingredient_ids = [meals[0].id])
+
+    details = [d for _, ds in plans for d in ds]
+    assert _full_scans(plans) == []
+    assert any("COVERING INDEX ix_meal_entry_ingredient_id_meal_id" in d for d in details)
+    assert any("COVERING INDEX ix_meal_entry_meal_id_ingredient_id_grams" in d for d in details)
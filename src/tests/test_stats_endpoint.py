@@ -19,17 +19,20 @@ def app(monkeypatch):
     app.include_router(stats_router)
 
     # Override the db dependency to avoid touching a real DB  :contentReference[oaicite:19]{index=19}
-    from src.api.routers import stats as stats_module
+    from src.infrastructure.db import get_read_db
 
     def fake_db():
         yield None
 
-    app.dependency_overrides[stats_module.db_dependency] = fake_db
+    app.dependency_overrides[get_read_db] = fake_db
 
     # Monkeypatch StatsService.daily_calories_and_macro_split to return a canned result  :contentReference[oaicite:20]{index=20}
     from src.services import stats as svc_module
 
-    def fake_daily(dr, macro_basis="kcal", round_to=1):
+    calls = []
+
+    def fake_daily(dr, macro_basis="kcal", round_to=1, tz_name="UTC"):
+        calls.append(tz_name)
         return StatsResult(
             days=[
                 DayCalories(day=utc_date(2025, 8, 28), calories=600.0),
@@ -41,6 +44,7 @@ def app(monkeypatch):
         )
 
     monkeypatch.setattr(svc_module.StatsService, "daily_calories_and_macro_split", staticmethod(fake_daily))
+    app.state.tz_calls = calls
     return app
 
 
@@ -88,3 +92,49 @@ def test_date_order_validation_bubbles_up(app):
     )
     # Depending on your global exception handler for ValidationError, this will typically be 400 or 422.
     assert resp.status_code in (400, 422)
+
+
+def test_tz_is_forwarded_to_the_service(app):
+    client = TestClient(app)
+    resp = client.get(
+        "/stats/daily-and-macros",
+        params={"start_date": "2025-08-28", "end_date": "2025-08-30", "tz": "Europe/Chisinau"},
+    )
+    assert resp.status_code == 200
+    assert app.state.tz_calls == ["Europe/Chisinau"]
+
+
+def test_batch_answers_each_range_in_order(app, monkeypatch):
+    from src.services import stats as svc_module
+
+    seen = []
+
+    def fake_many(ranges, macro_basis="kcal", round_to=1, tz_name="UTC"):
+        seen.append(([(dr.start.date(), dr.end.date()) for dr in ranges], tz_name))
+        return [
+            StatsResult(
+                days=[DayCalories(day=dr.start.date(), calories=float(i))],
+                macro_pct=MacroPercentages(protein_pct=0.0, carbs_pct=0.0, fat_pct=0.0),
+                basis=macro_basis,
+            )
+            for i, dr in enumerate(ranges)
+        ]
+
+    monkeypatch.setattr(svc_module.StatsService, "daily_calories_and_macro_split_many", staticmethod(fake_many))
+    client = TestClient(app)
+    resp = client.post(
+        "/stats/daily-and-macros/batch",
+        json={
+            "ranges": [{"start": "2025-08-25", "end": "2025-08-31"}, {"start": "2025-08-18", "end": "2025-08-24"}],
+            "tz": "Europe/Chisinau",
+        },
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["days"][0]["day"] for r in results] == ["2025-08-25", "2025-08-18"]
+    assert [r["days"][0]["calories"] for r in results] == [0.0, 1.0]
+    assert seen == [([(utc_date(2025, 8, 25), utc_date(2025, 8, 31)), (utc_date(2025, 8, 18), utc_date(2025, 8, 24))], "Europe/Chisinau")]
+
+    assert client.post("/stats/daily-and-macros/batch", json={"ranges": []}).status_code == 422
+    backwards = {"ranges": [{"start": "2025-08-31", "end": "2025-08-25"}]}
+    assert client.post("/stats/daily-and-macros/batch", json=backwards).status_code == 400
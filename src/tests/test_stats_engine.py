@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.services.stats import StatsService
+from src.services.stats_engine import day_over_day, linear_slope, load_daily, rolling_mean
+from src.tests.helpers import loop_split, make_rows
+
+
+def test_load_daily_zero_fills_by_index():
+    rows = [
+        {"day": "2025-01-02", "kcal": 500.0, "protein_g": 10.0, "carbs_g": 20.0, "fat_g": 5.0},
+        {"day": "2025-01-05", "kcal": 250.0, "protein_g": 1.0, "carbs_g": 2.0, "fat_g": 3.0},
+        {"day": "2025-01-09", "kcal": 999.0, "protein_g": 9.0, "carbs_g": 9.0, "fat_g": 9.0},  # outside
+    ]
+    series = load_daily(rows, date(2025, 1, 1), date(2025, 1, 6))
+
+    assert series.days.tolist() == [date(2025, 1, 1) + timedelta(days=i) for i in range(6)]
+    assert series.kcal.tolist() == [0.0, 500.0, 0.0, 0.0, 250.0, 0.0]
+    totals = series.totals()
+    assert (totals.kcal, totals.proteins, totals.carbs, totals.fats) == (750.0, 11.0, 22.0, 8.0)
+
+
+def test_load_daily_without_rows():
+    series = load_daily([], date(2025, 1, 1), date(2025, 1, 3))
+    assert series.kcal.tolist() == [0.0, 0.0, 0.0]
+    assert series.totals().kcal == 0.0
+
+
+def test_rolling_mean_matches_naive_windows():
+    values = np.array([3.0, 0.0, 6.0, 9.0, 1.0, 4.0, 0.0, 2.0])
+    for window in (1, 3, 7, 30):
+        naive = [values[max(0, i - window + 1): i + 1].mean() for i in range(len(values))]
+        assert rolling_mean(values, window) == pytest.approx(naive)
+    with pytest.raises(ValueError):
+        rolling_mean(values, 0)
+
+
+def test_day_over_day():
+    assert day_over_day(np.array([5.0, 7.0, 4.0])).tolist() == [0.0, 2.0, -3.0]
+
+
+@pytest.mark.parametrize("basis", ["kcal", "grams"])
+def test_engine_returns_what_the_loop_returned(session, basis):
+    start, end = date(2016, 1, 1), date(2025, 12, 31)
+    rows = make_rows(start, end, fill=0.6)
+
+    result = StatsService(session)._split(load_daily(rows, start, end), macro_basis=basis, round_to=1)
+    ref_days, ref_pct = loop_split(rows, start, end, basis=basis)
+
+    assert result.days == ref_days
+    assert result.macro_pct == ref_pct
+
+
+def test_linear_slope():
+    assert linear_slope(np.array([1.0, 3.0, 5.0, 7.0])) == pytest.approx(2.0)
+    assert linear_slope(np.array([4.0, 4.0, 4.0])) == 0.0
+    assert linear_slope(np.array([9.0])) == 0.0